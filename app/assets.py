@@ -0,0 +1,145 @@
+# ABOUTME: Content-hashed static assets: fingerprinted URLs, immutable caching and precompressed variants.
+# ABOUTME: Templates call static_url("interactive.js") -> /static/interactive.<hash>.js.
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+from pathlib import Path, PurePosixPath
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    from app.pagecache import etag_matches
+except ImportError:
+    from pagecache import etag_matches
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_PREFIX = "/static/"
+# Fingerprinted URLs never change content, so browsers may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Only text formats benefit from compression; images are already compressed
+COMPRESSIBLE_TYPES = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map"}
+# Compressed variants smaller than this fraction of the original are kept
+MIN_COMPRESSION_GAIN = 0.9
+
+
+class Asset:
+    """One file under static/ with its fingerprinted name and compressed bodies."""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name  # posix path relative to static/
+        self.path = path
+        data = path.read_bytes()
+        self.mtime_ns = path.stat().st_mtime_ns
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        posix = PurePosixPath(name)
+        self.hashed_name = str(posix.with_name(f"{posix.stem}.{self.digest}{posix.suffix}"))
+        self.media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.etag = f'"{self.digest}"'  # identity body; compressed bodies add -<encoding>
+        self.variants = {}  # {content-encoding: bytes}
+        if posix.suffix in COMPRESSIBLE_TYPES:
+            self._compress(data)
+
+    def _compress(self, data: bytes):
+        candidates = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            candidates["br"] = brotli.compress(data, quality=11)
+        for encoding, body in candidates.items():
+            if len(body) < len(data) * MIN_COMPRESSION_GAIN:
+                self.variants[encoding] = body
+
+    def variant_for(self, accept_encoding: str):
+        """Best precompressed (encoding, body) the client accepts, or (None, None)."""
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                return encoding, self.variants[encoding]
+        return None, None
+
+    def etag_for(self, encoding: str = None) -> str:
+        """Strong ETag of the body sent with `encoding` (None = identity)."""
+        return self.etag if encoding is None else f'"{self.digest}-{encoding}"'
+
+
+class AssetManifest:
+    """Hashes every file under a static directory once, at startup.
+
+    With auto_reload (DEV_MODE), changed files are re-hashed when URLs are
+    generated, so edited assets get new URLs without a restart.
+    """
+
+    def __init__(self, directory: Path, auto_reload: bool = False):
+        self.directory = Path(directory)
+        self.auto_reload = auto_reload
+        self.assets = {}  # {name: Asset}
+        self._by_hashed_name = {}  # {hashed name: Asset}
+        self.scan()
+
+    def scan(self):
+        """Hash new or changed files and drop deleted ones."""
+        assets = {}
+        for path in sorted(p for p in self.directory.rglob("*") if p.is_file()):
+            name = path.relative_to(self.directory).as_posix()
+            previous = self.assets.get(name)
+            if previous is not None and previous.mtime_ns == path.stat().st_mtime_ns:
+                assets[name] = previous
+            else:
+                assets[name] = Asset(name, path)
+        self.assets = assets
+        self._by_hashed_name = {asset.hashed_name: asset for asset in assets.values()}
+
+    def static_url(self, name: str) -> str:
+        """Fingerprinted URL for a file under static/ (plain URL if it is unknown)."""
+        if self.auto_reload:
+            self.scan()
+        asset = self.assets.get(name)
+        if asset is None:
+            logger.warning(f"static_url: no such asset '{name}'")
+            return STATIC_PREFIX + name
+        return STATIC_PREFIX + asset.hashed_name
+
+    def lookup_hashed(self, hashed_name: str):
+        return self._by_hashed_name.get(hashed_name)
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles that also serves fingerprinted names with immutable caching.
+
+    Plain names (e.g. /static/og-image.png, linked from other sites) are
+    served exactly as before.
+    """
+
+    def __init__(self, manifest: AssetManifest, **kwargs):
+        super().__init__(directory=str(manifest.directory), **kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope) -> Response:
+        asset = self.manifest.lookup_hashed(Path(path).as_posix())
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding, body = asset.variant_for(request_headers.get("accept-encoding", ""))
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "ETag": asset.etag_for(encoding),
+        }
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            return Response(body, media_type=asset.media_type, headers=headers)
+        return FileResponse(asset.path, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,450 @@
+# ABOUTME: In-memory lesson catalog: parses tutorials/ and translations/ once at startup.
+# ABOUTME: Serves merged per-language lesson pages, menus and prev/next ordering via dict lookups.
+# ABOUTME: Changed files can be hot-reloaded per topic (CatalogWatcher, used in DEV_MODE).
+
+import asyncio
+import copy
+import itertools
+import json
+import logging
+from pathlib import Path
+
+try:
+    from app import grader_schemas
+    from app.grader import compile_check
+except ImportError:
+    import grader_schemas
+    from grader import compile_check
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANG = "en"
+DEFAULT_STYLE = "detective_noir"
+MENU_DESCRIPTION = "Learn through engaging narratives and interactive challenges"
+
+
+class LessonLoadError(Exception):
+    """A lesson file exists but could not be parsed; `detail` is safe to show to users."""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class CatalogError(Exception):
+    """The content root has broken lessons; raised at startup so deploys fail loudly."""
+
+    def __init__(self, problems: list[str]):
+        super().__init__("Invalid lesson content:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+def merge_translation(lesson_data: dict, trans: dict) -> dict:
+    """Merge translated strings into a copy of lesson_data."""
+    merged = copy.deepcopy(lesson_data)
+    if "tutorial" in trans:
+        merged["tutorial"] = trans["tutorial"]
+    if "technical_concept" in trans:
+        merged["technical_concept"] = trans["technical_concept"]
+    if "challenge" in trans and "challenge" in merged:
+        for key in ("task", "hint", "solution"):
+            if key in trans["challenge"]:
+                merged["challenge"][key] = trans["challenge"][key]
+    # Merge translated styles (keyed by style name)
+    if "styles" in trans:
+        for style_obj in merged.get("styles", []):
+            style_name = style_obj.get("name", "")
+            if style_name in trans["styles"]:
+                ts = trans["styles"][style_name]
+                if "title" in ts:
+                    style_obj["title"] = ts["title"]
+                if "dialogue" in ts:
+                    style_obj["dialogue"] = ts["dialogue"]
+    return merged
+
+
+def _available_styles(lesson_data: dict) -> list[dict]:
+    return [
+        {
+            "name": s.get("name", ""),
+            "display_name": s.get("name", "").replace("_", " ").title()
+        }
+        for s in lesson_data.get("styles", [])
+    ]
+
+
+def _select_style(lesson_data: dict, style: str):
+    """The style object named `style`, else the lesson's first style, else None."""
+    for s in lesson_data.get("styles", []):
+        if s.get("name") == style:
+            return s
+    if lesson_data.get("styles"):
+        return lesson_data["styles"][0]
+    return None
+
+
+def _read_json(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Unique id per built _TopicEntry, so caches of derived output (rendered
+# HTML) can tell when a topic has been rebuilt
+_generations = itertools.count(1)
+
+
+class _TopicEntry:
+    """Everything the catalog knows about one topic; replaced wholesale on reload."""
+
+    def __init__(self, topic: str, lessons: list[str]):
+        self.topic = topic
+        self.generation = next(_generations)
+        self.lessons = lessons  # lesson stems in order
+        self.data = {}          # {lesson: parsed English lesson}
+        self.errors = {}        # {lesson: LessonLoadError detail}
+        self.checks = {}        # {lesson: validated CheckLogic} for gradeable lessons
+        self.check_errors = {}  # {lesson: detail} for lessons whose check_logic is invalid
+        self.translation_errors = {}  # {(lesson, lang): detail}
+        self.merged = {}        # {(lesson, lang): merged lesson}
+        self.pages = {}         # {(lesson, lang, style|None): page context}
+        self.menus = {}         # {(lang, style|None): menu context}
+
+
+class LessonCatalog:
+    """All lessons of one content root, parsed and merged once.
+
+    Lookups are keyed by (topic, lesson, lang, style). Unknown languages fall
+    back to English and unknown styles to each lesson's first style, matching
+    what the routes always did.
+
+    reload_changed() re-parses only files whose mtime changed and swaps in
+    rebuilt topic entries, so readers see either the old or the new topic,
+    never a half-built one.
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self.languages = [DEFAULT_LANG]
+        self._entries = {}      # {topic: _TopicEntry}
+        self._mtimes = {}       # {path: mtime_ns} as of the last scan
+        self._parsed = {}       # {path: (data, error)} parse cache, dropped on change
+        self.reload_changed()
+
+    @property
+    def topics(self) -> dict[str, list[str]]:
+        """{topic: [lesson stems in order]}"""
+        return {topic: entry.lessons for topic, entry in self._entries.items()}
+
+    # --- Loading ---
+
+    def _scan(self):
+        """Current (topic names, languages, {path: mtime_ns}) on disk."""
+        tutorials_dir = self.base_dir / "tutorials"
+        translations_dir = self.base_dir / "translations"
+        topics, languages, mtimes = set(), [DEFAULT_LANG], {}
+
+        if tutorials_dir.is_dir():
+            for topic_dir in tutorials_dir.iterdir():
+                if topic_dir.is_dir():
+                    topics.add(topic_dir.name)
+                    for f in topic_dir.glob("*.json"):
+                        mtimes[f] = f.stat().st_mtime_ns
+        if translations_dir.is_dir():
+            for lang_dir in sorted(p for p in translations_dir.iterdir() if p.is_dir()):
+                languages.append(lang_dir.name)
+                for f in lang_dir.glob("*/*.json"):
+                    mtimes[f] = f.stat().st_mtime_ns
+        return topics, languages, mtimes
+
+    def reload_changed(self) -> set[str]:
+        """Re-parse changed lesson/translation files and swap in rebuilt topics.
+
+        Returns:
+            The set of topics that were rebuilt or removed.
+        """
+        topics, languages, mtimes = self._scan()
+        changed = {p for p in mtimes.keys() | self._mtimes.keys() if mtimes.get(p) != self._mtimes.get(p)}
+        for path in changed:
+            self._parsed.pop(path, None)
+
+        # A file's topic is its parent directory in both tutorials/ and translations/
+        dirty = {path.parent.name for path in changed}
+        dirty |= topics ^ set(self._entries)
+        if languages != self.languages:
+            self.languages = languages
+            dirty |= topics
+
+        for topic in sorted(dirty):
+            if topic in topics:
+                self._entries[topic] = self._build_topic(topic)
+            else:
+                self._entries.pop(topic, None)
+        self._mtimes = mtimes
+        return dirty
+
+    def _parse(self, path: Path):
+        """Parsed JSON for path, cached until the file changes. Returns (data, error)."""
+        if path not in self._parsed:
+            try:
+                self._parsed[path] = (_read_json(path), None)
+            except Exception as e:
+                self._parsed[path] = (None, e)
+        return self._parsed[path]
+
+    def _build_topic(self, topic: str) -> _TopicEntry:
+        topic_dir = self.base_dir / "tutorials" / topic
+        entry = _TopicEntry(topic, sorted(f.stem for f in topic_dir.glob("*.json")))
+        for lesson in entry.lessons:
+            self._load_lesson(entry, lesson)
+        self._build_topic_views(entry)
+        return entry
+
+    def _load_lesson(self, entry: _TopicEntry, lesson: str):
+        topic = entry.topic
+        path = self.base_dir / "tutorials" / topic / f"{lesson}.json"
+        data, error = self._parse(path)
+        if error is None and not isinstance(data, dict):
+            error = ValueError("lesson must be a JSON object")
+        if isinstance(error, json.JSONDecodeError):
+            logger.warning(f"Failed to load lesson file {path}: {error}")
+            entry.errors[lesson] = "Invalid JSON format in lesson file"
+            return
+        if error is not None:
+            logger.warning(f"Failed to load lesson file {path}: {error}")
+            entry.errors[lesson] = f"Error loading lesson: {str(error)}"
+            return
+        entry.data[lesson] = data
+        self._compile_check(entry, lesson, data)
+
+        for lang in self.languages:
+            merged = data
+            if lang != DEFAULT_LANG:
+                trans_path = self.base_dir / "translations" / lang / topic / f"{lesson}.json"
+                if trans_path.exists():
+                    trans, trans_error = self._parse(trans_path)
+                    try:
+                        if trans_error is not None:
+                            raise trans_error
+                        merged = merge_translation(data, trans)
+                    except Exception as e:
+                        logger.warning(f"Ignoring broken translation {trans_path}: {e}")
+                        entry.translation_errors[(lesson, lang)] = f"Broken translation: {e}"
+            entry.merged[(lesson, lang)] = merged
+
+    def _compile_check(self, entry: _TopicEntry, lesson: str, data: dict):
+        """Validate check_logic and compile its matcher once, so grading never re-parses it."""
+        challenge = data.get("challenge")
+        check_logic_data = challenge.get("check_logic") if isinstance(challenge, dict) else None
+        if not check_logic_data:
+            return
+        try:
+            check_logic = grader_schemas.CheckLogic(**check_logic_data)
+            compile_check(check_logic)
+        except Exception as e:
+            logger.warning(f"Invalid check_logic in {entry.topic}/{lesson}: {e}")
+            entry.check_errors[lesson] = f"Invalid check_logic format: {str(e)}"
+            return
+        entry.checks[lesson] = check_logic
+
+    # --- Precomputed views ---
+
+    def _build_topic_views(self, entry: _TopicEntry):
+        # Every style used anywhere in the topic, plus None for "unknown style"
+        style_keys = {None}
+        for data in entry.data.values():
+            style_keys.update(s.get("name") for s in data.get("styles", []))
+
+        for lang in self.languages:
+            for style in style_keys:
+                entry.menus[(lang, style)] = self._build_menu(entry, lang, style)
+            for index, lesson in enumerate(entry.lessons):
+                if lesson not in entry.data:
+                    continue
+                merged = entry.merged[(lesson, lang)]
+                lesson_styles = {s.get("name") for s in merged.get("styles", [])} | {None}
+                for style in lesson_styles:
+                    entry.pages[(lesson, lang, style)] = self._build_page(entry, index, merged, style)
+
+    def _build_page(self, entry: _TopicEntry, index: int, lesson_data: dict, style) -> dict:
+        lessons = entry.lessons
+        selected_style = _select_style(lesson_data, style)
+        return {
+            "tutorial": lesson_data.get("tutorial", ""),
+            "module": lesson_data.get("module", 1),
+            "scene": lesson_data.get("scene", 1),
+            "lesson_number": index + 1,
+            "total_lessons": len(lessons),
+            "title": selected_style.get("title", "") if selected_style else "",
+            "dialogue": selected_style.get("dialogue", []) if selected_style else [],
+            "code_example": lesson_data.get("code_example", {}),
+            "challenge": lesson_data.get("challenge", {}),
+            "technical_concept": lesson_data.get("technical_concept", ""),
+            "topic": entry.topic,
+            "lesson": lessons[index],
+            "available_styles": _available_styles(lesson_data),
+            "prev_lesson": lessons[index - 1] if index > 0 else None,
+            "next_lesson": lessons[index + 1] if index < len(lessons) - 1 else None,
+        }
+
+    def _build_menu(self, entry: _TopicEntry, lang: str, style) -> dict:
+        topic = entry.topic
+        tutorial_name = topic.title()
+        available_styles = []
+        lessons = []
+        for lesson in entry.lessons:
+            if lesson not in entry.data:
+                continue
+            lesson_data = entry.merged[(lesson, lang)]
+
+            # Collect available styles from first lesson
+            if not available_styles and lesson_data.get("styles"):
+                available_styles = _available_styles(lesson_data)
+
+            selected_style = _select_style(lesson_data, style)
+            lessons.append({
+                "filename": lesson,
+                "title": selected_style.get("title", f"Lesson {lesson}") if selected_style else f"Lesson {lesson}",
+                "technical_concept": lesson_data.get("technical_concept", ""),
+                "module": lesson_data.get("module", 1),
+                "scene": lesson_data.get("scene", 1)
+            })
+
+            # Use first lesson to set tutorial info
+            if len(lessons) == 1:
+                tutorial_name = lesson_data.get("tutorial", topic.title())
+
+        return {
+            "topic": topic,
+            "tutorial_name": tutorial_name,
+            "description": MENU_DESCRIPTION,
+            "available_styles": available_styles,
+            "lessons": lessons,
+        }
+
+    # --- Lookups ---
+
+    def has_topic(self, topic: str) -> bool:
+        return topic in self._entries
+
+    def topic_generation(self, topic: str):
+        """Changes whenever `topic` is rebuilt (or the catalog replaced); None if unknown."""
+        entry = self._entries.get(topic)
+        return entry.generation if entry else None
+
+    def has_lesson(self, topic: str, lesson: str) -> bool:
+        entry = self._entries.get(topic)
+        return entry is not None and (lesson in entry.data or lesson in entry.errors)
+
+    def lesson_count(self, topic: str) -> int:
+        entry = self._entries.get(topic)
+        return len(entry.lessons) if entry else 0
+
+    def _lang(self, lang: str) -> str:
+        return lang if lang in self.languages else DEFAULT_LANG
+
+    def lesson(self, topic: str, lesson: str):
+        """The parsed English lesson, or None if it does not exist.
+
+        Raises:
+            LessonLoadError: If the lesson file exists but is broken.
+        """
+        entry = self._entries.get(topic)
+        if entry is None:
+            return None
+        if lesson in entry.errors:
+            raise LessonLoadError(entry.errors[lesson])
+        return entry.data.get(lesson)
+
+    def check_logic(self, topic: str, lesson: str):
+        """The pre-validated CheckLogic for a lesson, or None if it has none.
+
+        Raises:
+            LessonLoadError: If the lesson file or its check_logic is broken.
+        """
+        entry = self._entries.get(topic)
+        if entry is None:
+            return None
+        if lesson in entry.errors:
+            raise LessonLoadError(entry.errors[lesson])
+        if lesson in entry.check_errors:
+            raise LessonLoadError(entry.check_errors[lesson])
+        return entry.checks.get(lesson)
+
+    def problems(self) -> list[str]:
+        """Human-readable list of every broken lesson, check_logic and translation."""
+        problems = []
+        for topic, entry in sorted(self._entries.items()):
+            for lesson, detail in sorted(entry.errors.items()):
+                problems.append(f"{topic}/{lesson}: {detail}")
+            for lesson, detail in sorted(entry.check_errors.items()):
+                problems.append(f"{topic}/{lesson}: {detail}")
+            for (lesson, lang), detail in sorted(entry.translation_errors.items()):
+                problems.append(f"{lang}/{topic}/{lesson}: {detail}")
+        return problems
+
+    def raise_for_problems(self):
+        """Raise CatalogError if any lesson content is broken."""
+        problems = self.problems()
+        if problems:
+            raise CatalogError(problems)
+
+    def lesson_page(self, topic: str, lesson: str, lang: str = DEFAULT_LANG, style: str = DEFAULT_STYLE):
+        """Template context for a lesson page, or None if the lesson does not exist.
+
+        Raises:
+            LessonLoadError: If the lesson file exists but is broken.
+        """
+        entry = self._entries.get(topic)
+        if entry is None:
+            return None
+        if lesson in entry.errors:
+            raise LessonLoadError(entry.errors[lesson])
+        if lesson not in entry.data:
+            return None
+        key_lang = self._lang(lang)
+        page = entry.pages.get((lesson, key_lang, style)) or entry.pages[(lesson, key_lang, None)]
+        return {**page, "style": style, "current_style": style, "lang": lang}
+
+    def menu(self, topic: str, lang: str = DEFAULT_LANG, style: str = DEFAULT_STYLE):
+        """Template context for a topic menu, or None if the topic does not exist."""
+        entry = self._entries.get(topic)
+        if entry is None:
+            return None
+        key_lang = self._lang(lang)
+        menu = entry.menus.get((key_lang, style)) or entry.menus[(key_lang, None)]
+        return {**menu, "current_style": style, "lang": lang}
+
+
+class CatalogWatcher:
+    """Polls the content root and hot-swaps changed topics into a catalog.
+
+    Used in DEV_MODE (or with CATALOG_WATCH=1) so lesson authors see edits in
+    tutorials/ and translations/ without restarting the server.
+    """
+
+    def __init__(self, get_catalog, interval: float = 1.0):
+        self._get_catalog = get_catalog
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                reloaded = self._get_catalog().reload_changed()
+                if reloaded:
+                    logger.info(f"Lesson catalog reloaded: {', '.join(sorted(reloaded))}")
+            except Exception as e:
+                logger.warning(f"Lesson catalog reload failed: {e}")
@@ -1,15 +1,20 @@
 # ABOUTME: Manages Docker containers for code execution in sandboxed environments.
-# ABOUTME: Handles container pooling, command building, and delegates grading to shared grader module.
+# ABOUTME: Handles container leasing, command building, and delegates grading to shared grader module.
 
+import asyncio
 import base64
 import docker
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 try:
     from app import grader_schemas as schemas
     from app.grader import evaluate
+    from app.scheduler import SchedulerBusy
 except ImportError:
     import grader_schemas as schemas
     from grader import evaluate
+    from scheduler import SchedulerBusy
 
 # Map language names to the Docker images we will build
 GRADER_IMAGES = {
@@ -21,81 +26,167 @@ GRADER_IMAGES = {
     "bash": "grader-image-bash"
 }
 POOL_SIZE = 3 # Number of warm containers to keep per language
+LEASE_TIMEOUT = 10 # Seconds to wait for an idle container before giving up
+# Threads for blocking Docker SDK calls: enough for every container to exec at once
+DOCKER_THREADS = POOL_SIZE * len(GRADER_IMAGES)
 
 class ContainerManager:
     def __init__(self):
         self.client = docker.from_env()
-        self.pool = {} # e.g. {"redis": [container1, container2]}
-        self.pool_index = {} # Track current index for round-robin: {"redis": 0, "sql": 1}
+        self.containers = {} # All live containers per language, e.g. {"redis": [c1, c2, c3]}
+        self.pool = {} # Idle containers ready to lease: {"redis": asyncio.Queue([c1, c3])}
+        # The Docker SDK is blocking; all its calls run here, never on the event loop
+        self._executor = self._new_executor()
+        self._pending_resets = set() # Background checkin tasks still running
+
+    @staticmethod
+    def _new_executor():
+        return ThreadPoolExecutor(max_workers=DOCKER_THREADS, thread_name_prefix="docker-sdk")
+
+    async def _in_thread(self, func, *args, **kwargs):
+        """Run a blocking Docker SDK call in the dedicated thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def _exec(self, container, cmd) -> tuple[int, str]:
+        """exec_run off the event loop; returns (exit_code, decoded output)."""
+        exit_code, output_bytes = await self._in_thread(container.exec_run, cmd)
+        return exit_code, output_bytes.decode("utf-8").strip()
+
+    def _env_for(self, lang: str):
+        """Environment variables passed to a language's containers."""
+        if lang == "llm":
+            llm_key = os.environ.get("LLM_API_KEY", "")
+            if llm_key:
+                return {"LLM_API_KEY": llm_key}
+        return None
+
+    def _start_container(self, lang: str):
+        """Start one warm container for a language and track it."""
+        container = self.client.containers.run(
+            GRADER_IMAGES[lang], detach=True, tty=True,
+            environment=self._env_for(lang)
+        )
+        self.containers[lang].append(container)
+        print(f"Started container {container.short_id} for {lang}")
+        return container
 
     async def startup(self):
         """Creates a pool of warm, ready-to-use containers on startup."""
         print("Starting up and warming container pools...")
-        for lang, image_name in GRADER_IMAGES.items():
-            self.pool[lang] = []
-            self.pool_index[lang] = 0  # Initialize round-robin index
-
-            # Pass API keys to containers that need them
-            env_vars = {}
-            if lang == "llm":
-                llm_key = os.environ.get("LLM_API_KEY", "")
-                if llm_key:
-                    env_vars["LLM_API_KEY"] = llm_key
-                else:
-                    print(f"  Warning: LLM_API_KEY not set. LLM API lessons will not work.")
-
-            for i in range(POOL_SIZE):
-                container = self.client.containers.run(
-                    image_name, detach=True, tty=True,
-                    environment=env_vars if env_vars else None
-                )
-                self.pool[lang].append(container)
-                print(f"Started container {container.short_id} for {lang}")
+        for lang in GRADER_IMAGES:
+            self.containers[lang] = []
+            self.pool[lang] = asyncio.Queue()
+
+            if lang == "llm" and not os.environ.get("LLM_API_KEY", ""):
+                print(f"  Warning: LLM_API_KEY not set. LLM API lessons will not work.")
+
+            started = await asyncio.gather(
+                *(self._in_thread(self._start_container, lang) for i in range(POOL_SIZE))
+            )
+            for container in started:
+                self.pool[lang].put_nowait(container)
 
     async def shutdown(self):
         """Stops and removes all containers on shutdown."""
         print("Shutting down and cleaning up containers...")
-        for lang in self.pool:
-            for container in self.pool[lang]:
+        await self.wait_for_resets()
+        for lang in self.containers:
+            for container in self.containers[lang]:
                 print(f"Stopping container {container.short_id}")
-                container.stop()
-                container.remove()
+                await self._in_thread(container.stop)
+                await self._in_thread(container.remove)
+        # Release the worker threads; a fresh (idle) executor allows a later restart
+        self._executor.shutdown(wait=False)
+        self._executor = self._new_executor()
 
-    def get_container(self, language: str):
-        """Get next available container from pool using round-robin.
+    async def checkout(self, language: str, timeout: float = LEASE_TIMEOUT):
+        """Take an idle container from the pool, waiting up to `timeout` seconds.
 
         Args:
             language: The language pool to get container from (e.g., "redis", "sql")
+            timeout: Max seconds to wait when every container is leased
 
         Returns:
-            A Docker container from the pool
+            A Docker container that no other request is using
 
         Raises:
             KeyError: If language is not supported
+            SchedulerBusy: If no container frees up within the timeout
         """
         if language not in self.pool:
             raise KeyError(f"No container pool for language: {language}")
 
-        # Initialize index if not present (for tests that create pool manually)
-        if language not in self.pool_index:
-            self.pool_index[language] = 0
+        try:
+            return await asyncio.wait_for(self.pool[language].get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise SchedulerBusy(language, "no idle container", max(1, int(timeout)))
 
-        # Get container at current index
-        containers = self.pool[language]
-        index = self.pool_index[language]
-        container = containers[index]
+    async def checkin(self, language: str, container):
+        """Reset a leased container and return it to the idle pool.
 
-        # Advance to next container (round-robin)
-        self.pool_index[language] = (index + 1) % len(containers)
+        Containers that fail the health check are removed and replaced with a
+        fresh one, so the pool never shrinks.
+        """
+        try:
+            await self._in_thread(self._reset_container, language, container)
+            healthy = await self._in_thread(self._is_healthy, container)
+        except Exception as e:
+            print(f"Container {container.short_id} for {language} failed reset: {e}")
+            healthy = False
 
-        return container
+        if not healthy:
+            container = await self._in_thread(self._replace_container, language, container)
+        if container is not None:
+            self.pool[language].put_nowait(container)
 
-    def return_container(self, language: str, container):
-        """Return container to pool after resetting its state.
+    @asynccontextmanager
+    async def lease(self, language: str):
+        """Context manager: checkout on enter, background checkin on exit.
+
+        The reset runs after the caller has its result, so it does not add to
+        user-visible latency. The container stays out of the idle pool until
+        the reset finishes.
+        """
+        container = await self.checkout(language)
+        try:
+            yield container
+        finally:
+            task = asyncio.create_task(self.checkin(language, container))
+            self._pending_resets.add(task)
+            task.add_done_callback(self._pending_resets.discard)
+
+    async def wait_for_resets(self):
+        """Wait for all background checkins to finish."""
+        if self._pending_resets:
+            await asyncio.gather(*self._pending_resets, return_exceptions=True)
+
+    def _is_healthy(self, container) -> bool:
+        """A container is healthy if Docker still reports it running."""
+        container.reload()
+        return container.status == "running"
+
+    def _replace_container(self, language: str, dead):
+        """Remove a dead container and start a replacement (None if that fails)."""
+        print(f"Replacing unhealthy container {dead.short_id} for {language}")
+        if dead in self.containers[language]:
+            self.containers[language].remove(dead)
+        try:
+            dead.remove(force=True)
+        except Exception as e:
+            print(f"  Could not remove {dead.short_id}: {e}")
+        try:
+            return self._start_container(language)
+        except Exception as e:
+            print(f"  Could not start replacement for {language}: {e}")
+            return None
+
+    def _reset_container(self, language: str, container):
+        """Reset container state after a grade.
 
         Args:
             language: The language of the container (e.g., "redis", "sql", "git")
-            container: The Docker container to return
+            container: The Docker container to reset
         """
         # Reset container state based on language
         if language == "redis":
@@ -108,8 +199,8 @@ class ContainerManager:
             # Reset git repository to clean state
             container.exec_run("sh -c \"git reset --hard && git clean -fd\"")
         elif language == "docker":
-            # Clean up any user input files
-            container.exec_run("sh -c \"rm -f /tmp/user_input\"")
+            # Clean up user input and the mock docker engine's containers/images
+            container.exec_run("sh -c \"rm -f /tmp/user_input /tmp/mock_docker_state.json\"")
         elif language == "llm":
             # Clean up user input and mode files
             container.exec_run("sh -c \"rm -f /tmp/user_input /tmp/llm_mode\"")
@@ -176,37 +267,36 @@ class ContainerManager:
             raise ValueError(f"Unsupported language: {language}")
 
     async def execute_code_in_container(
-        self, language: str, user_code: str, check_logic: schemas.CheckLogic
+        self, language: str, user_code: str, check_logic: schemas.CheckLogic, release_slot=None
     ) -> schemas.GradeResult:
-
-        # Get container from pool
-        container = self.get_container(language)
-
-        try:
+        # release_slot is unused: LLM calls run inside the leased container
+        # Lease a container no other request is using
+        async with self.lease(language) as container:
             # 1. Run setup commands if they exist
             #    Run as plain shell commands since they're trusted (from lesson JSON)
             #    and may include redirects like 'echo tokenize > /tmp/llm_mode'
             if check_logic.setup_commands:
                 for cmd in check_logic.setup_commands:
-                    container.exec_run(["sh", "-c", cmd])
+                    await self._exec(container, ["sh", "-c", cmd])
 
             # 2. Run the user's code and capture the output
             full_user_cmd = self._build_command(language, user_code)
-            exit_code, output_bytes = container.exec_run(full_user_cmd)
-            output = output_bytes.decode("utf-8").strip()
+            exit_code, output = await self._exec(container, full_user_cmd)
 
             # 3. Run the validation command (only if provided)
             validation_output = ""
             if check_logic.validation_command:
                 full_validation_cmd = self._build_command(language, check_logic.validation_command)
-                _, validation_output_bytes = container.exec_run(full_validation_cmd)
-                validation_output = validation_output_bytes.decode("utf-8").strip()
+                _, validation_output = await self._exec(container, full_validation_cmd)
 
             # 4. Grade the result using the shared grading logic
             return evaluate(check_logic, output, validation_output)
-        finally:
-            # Always return container to pool (even if error occurs)
-            self.return_container(language, container)
+
+    async def stream_code_in_container(
+        self, language: str, user_code: str, check_logic: schemas.CheckLogic, release_slot=None
+    ):
+        """Streaming interface of SubprocessManager; container output arrives as one result."""
+        yield "result", await self.execute_code_in_container(language, user_code, check_logic, release_slot)
 
 # Create a single instance of the manager to be used by the app
 manager = ContainerManager()
@@ -1,5 +1,9 @@
 # ABOUTME: Shared grading evaluation logic used by both docker_manager and subprocess_manager.
-# ABOUTME: Evaluates check_logic against user output and validation output to produce a grade result.
+# ABOUTME: Registry of validation types compiled once per check_logic into fast matcher functions.
+
+import json
+import math
+import re
 
 try:
     from app.grader_schemas import CheckLogic, GradeResult
@@ -7,84 +11,263 @@ except ImportError:
     from grader_schemas import CheckLogic, GradeResult
 
 
-def evaluate(check_logic: CheckLogic, user_output: str, validation_output: str) -> GradeResult:
-    """Evaluate user's submission against check_logic rules.
+# expected_result.type -> compiler(expected) -> matcher(user_output, validation_output) -> (is_correct, feedback)
+GRADERS = {}
 
-    Args:
-        check_logic: The validation rules from the lesson JSON.
-        user_output: The output from running the user's code.
-        validation_output: The output from running the validation command.
 
-    Returns:
-        GradeResult with output, is_correct, and feedback_message.
+def register(name: str):
+    """Decorator adding a validation type to GRADERS.
+
+    The decorated function receives expected_result.value once, does any
+    parsing up front, and returns a matcher called for every submission.
+
+    Usage:
+        @register("starts_with")
+        def _starts_with(expected):
+            prefix = str(expected)
+            def match(user_output, validation_output):
+                if validation_output.startswith(prefix):
+                    return True, "Correct!"
+                return False, f"Expected result to start with '{prefix}'."
+            return match
+    """
+    def decorator(compiler):
+        GRADERS[name] = compiler
+        return compiler
+    return decorator
+
+
+def register_text_check(name: str):
+    """Decorator registering `name` (checks validation output) and `user_output_<name>` (checks user output).
+
+    The decorated function receives expected_result.value and returns a
+    check(actual) -> (is_correct, feedback) for a single text.
     """
-    is_correct = False
-    feedback = "Grading logic not fully implemented."
-
-    if check_logic.expected_result.type == "exact_match":
-        # State-based validation: compare validation_command output to expected value
-        if validation_output == str(check_logic.expected_result.value):
-            is_correct = True
-            feedback = "Correct!"
-        else:
-            feedback = f"Incorrect. Expected a result of '{check_logic.expected_result.value}' but got '{validation_output}'."
-
-    elif check_logic.expected_result.type == "user_output_exact_match":
-        # Output-based validation: compare user's output exactly to expected value
-        expected = str(check_logic.expected_result.value).strip()
+    def decorator(compiler):
+        def on_validation_output(expected):
+            check = compiler(expected)
+            return lambda user_output, validation_output: check(validation_output)
+
+        def on_user_output(expected):
+            check = compiler(expected)
+            return lambda user_output, validation_output: check(user_output)
+
+        GRADERS[name] = on_validation_output
+        GRADERS[f"user_output_{name}"] = on_user_output
+        return compiler
+    return decorator
+
+
+@register("exact_match")
+def _exact_match(expected):
+    # State-based validation: compare validation_command output to expected value
+    expected = str(expected)
+
+    def match(user_output, validation_output):
+        if validation_output == expected:
+            return True, "Correct!"
+        return False, f"Incorrect. Expected a result of '{expected}' but got '{validation_output}'."
+    return match
+
+
+@register("user_output_exact_match")
+def _user_output_exact_match(expected):
+    # Output-based validation: compare user's output exactly to expected value
+    expected = str(expected).strip()
+
+    def match(user_output, validation_output):
         actual = user_output.strip()
         if actual == expected:
-            is_correct = True
-            feedback = "Correct!"
-        else:
-            feedback = f"Expected output:\n{expected}\n\nYour output:\n{actual}"
-
-    elif check_logic.expected_result.type == "user_output_contains":
-        # Output-based validation: check if user's output contains expected substring
-        expected_substring = str(check_logic.expected_result.value)
+            return True, "Correct!"
+        return False, f"Expected output:\n{expected}\n\nYour output:\n{actual}"
+    return match
+
+
+@register("user_output_contains")
+def _user_output_contains(expected):
+    # Output-based validation: check if user's output contains expected substring
+    expected_substring = str(expected)
+
+    def match(user_output, validation_output):
         if expected_substring in user_output:
-            is_correct = True
-            feedback = "Correct!"
-        else:
-            feedback = f"Your output should contain '{expected_substring}'"
-
-    elif check_logic.expected_result.type == "user_output_contains_all":
-        # Output-based validation: check if user's output contains all expected strings
-        expected_values = check_logic.expected_result.value
-        if not isinstance(expected_values, list):
-            expected_values = [expected_values]
-
-        missing = [str(val) for val in expected_values if str(val) not in user_output]
+            return True, "Correct!"
+        return False, f"Your output should contain '{expected_substring}'"
+    return match
+
+
+@register("user_output_contains_all")
+def _user_output_contains_all(expected):
+    # Output-based validation: check if user's output contains all expected strings
+    expected_values = [str(val) for val in (expected if isinstance(expected, list) else [expected])]
+
+    def match(user_output, validation_output):
+        missing = [val for val in expected_values if val not in user_output]
         if not missing:
-            is_correct = True
-            feedback = "Correct!"
-        else:
-            feedback = f"Your output is missing: {', '.join(missing)}"
+            return True, "Correct!"
+        return False, f"Your output is missing: {', '.join(missing)}"
+    return match
 
-    elif check_logic.expected_result.type == "integer_greater_than":
-        # Numeric validation: check if validation output is greater than threshold
+
+@register("integer_greater_than")
+def _integer_greater_than(expected):
+    # Numeric validation: check if validation output is greater than threshold
+    threshold = int(expected)
+
+    def match(user_output, validation_output):
         try:
             actual_int = int(validation_output)
-            threshold = int(check_logic.expected_result.value)
-            if actual_int > threshold:
-                is_correct = True
-                feedback = "Correct!"
-            else:
-                feedback = f"Expected value greater than {threshold}, got {actual_int}."
         except ValueError:
-            feedback = f"Expected a number but got '{validation_output}'."
+            return False, f"Expected a number but got '{validation_output}'."
+        if actual_int > threshold:
+            return True, "Correct!"
+        return False, f"Expected value greater than {threshold}, got {actual_int}."
+    return match
+
 
-    elif check_logic.expected_result.type == "set_contains":
-        # Set membership validation: check if expected member is in validation output
-        expected_member = str(check_logic.expected_result.value)
+@register("set_contains")
+def _set_contains(expected):
+    # Set membership validation: check if expected member is in validation output
+    expected_member = str(expected)
+
+    def match(user_output, validation_output):
         if expected_member in validation_output:
-            is_correct = True
-            feedback = "Correct!"
-        else:
-            feedback = f"Expected result to contain '{expected_member}'."
+            return True, "Correct!"
+        return False, f"Expected result to contain '{expected_member}'."
+    return match
+
+
+@register_text_check("regex")
+def _regex(expected):
+    # Pattern validation: output must contain a match for the regular expression
+    pattern = re.compile(str(expected), re.MULTILINE)
+
+    def check(actual):
+        if pattern.search(actual):
+            return True, "Correct!"
+        return False, f"Your output should match the pattern '{pattern.pattern}'"
+    return check
+
+
+def _normalize_whitespace(text: str) -> str:
+    return " ".join(text.split())
 
+
+@register_text_check("normalized_whitespace")
+def _normalized_whitespace(expected):
+    # Text validation: equal after collapsing runs of whitespace, so spacing and line breaks don't matter
+    expected = _normalize_whitespace(str(expected))
+
+    def check(actual):
+        if _normalize_whitespace(actual) == expected:
+            return True, "Correct!"
+        return False, f"Expected output:\n{expected}\n\nYour output:\n{_normalize_whitespace(actual)}"
+    return check
+
+
+def _line_set(text: str) -> frozenset:
+    return frozenset(line.strip() for line in text.splitlines() if line.strip())
+
+
+@register_text_check("line_set_equal")
+def _line_set_equal(expected):
+    # Set validation: same non-empty lines in any order (e.g. SMEMBERS, unordered SELECT)
+    if isinstance(expected, list):
+        expected_lines = frozenset(str(val).strip() for val in expected)
+    else:
+        expected_lines = _line_set(str(expected))
+
+    def check(actual):
+        actual_lines = _line_set(actual)
+        if actual_lines == expected_lines:
+            return True, "Correct!"
+        missing = sorted(expected_lines - actual_lines)
+        extra = sorted(actual_lines - expected_lines)
+        parts = []
+        if missing:
+            parts.append(f"missing: {', '.join(missing)}")
+        if extra:
+            parts.append(f"unexpected: {', '.join(extra)}")
+        return False, f"Your result is {'; '.join(parts)}"
+    return check
+
+
+@register_text_check("numeric_tolerance")
+def _numeric_tolerance(expected):
+    # Numeric validation: value {"target": x, "tolerance": t} accepts any number within t of x
+    if isinstance(expected, dict):
+        target = float(expected["target"])
+        tolerance = float(expected.get("tolerance", 0))
+    else:
+        target, tolerance = float(expected), 0.0
+    if tolerance < 0 or not math.isfinite(target):
+        raise ValueError(f"Invalid numeric_tolerance value: {expected!r}")
+
+    def check(actual):
+        try:
+            actual_number = float(actual.strip())
+        except ValueError:
+            return False, f"Expected a number but got '{actual.strip()}'."
+        if abs(actual_number - target) <= tolerance:
+            return True, "Correct!"
+        return False, f"Expected {target:g} (±{tolerance:g}), got {actual_number:g}."
+    return check
+
+
+@register_text_check("json_equal")
+def _json_equal(expected):
+    # Structural validation: parsed JSON must equal expected (key order and formatting ignored)
+    expected_data = json.loads(expected) if isinstance(expected, str) else expected
+    expected_text = json.dumps(expected_data, sort_keys=True)
+
+    def check(actual):
+        try:
+            actual_data = json.loads(actual)
+        except ValueError:
+            return False, f"Expected valid JSON but got '{actual.strip()}'."
+        if actual_data == expected_data:
+            return True, "Correct!"
+        return False, f"Expected JSON:\n{expected_text}\n\nYour JSON:\n{json.dumps(actual_data, sort_keys=True)}"
+    return check
+
+
+def compile_check(check_logic: CheckLogic):
+    """Return the matcher for check_logic, compiling it on first use.
+
+    The matcher is cached on the CheckLogic object, so long-lived lesson
+    checks (see catalog.py) are compiled exactly once.
+
+    Raises:
+        ValueError: If the type is unknown or expected_result.value is invalid for it.
+    """
+    if check_logic._matcher is None:
+        result_type = check_logic.expected_result.type
+        compiler = GRADERS.get(result_type)
+        if compiler is None:
+            raise ValueError(f"Unknown validation type: '{result_type}'")
+        try:
+            check_logic._matcher = compiler(check_logic.expected_result.value)
+        except (ValueError, TypeError, KeyError, re.error) as e:
+            raise ValueError(f"Invalid value for '{result_type}': {e}") from e
+    return check_logic._matcher
+
+
+def evaluate(check_logic: CheckLogic, user_output: str, validation_output: str) -> GradeResult:
+    """Evaluate user's submission against check_logic rules.
+
+    Args:
+        check_logic: The validation rules from the lesson JSON.
+        user_output: The output from running the user's code.
+        validation_output: The output from running the validation command.
+
+    Returns:
+        GradeResult with output, is_correct, and feedback_message.
+    """
+    try:
+        match = compile_check(check_logic)
+    except ValueError as e:
+        is_correct, feedback = False, str(e)
     else:
-        feedback = f"Unknown validation type: '{check_logic.expected_result.type}'"
+        is_correct, feedback = match(user_output, validation_output)
 
     return GradeResult(
         output=user_output,
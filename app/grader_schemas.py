@@ -1,7 +1,7 @@
 # ABOUTME: Defines Pydantic models for grading requests, validation logic, and results.
 # ABOUTME: Specifies the API contract between clients and the grading service.
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import List, Any, Optional
 
 class ExpectedResult(BaseModel):
@@ -12,6 +12,18 @@ class ExpectedResult(BaseModel):
     - "user_output_exact_match": Compare user's output exactly to expected value
     - "user_output_contains": Check if user's output contains expected substring
     - "user_output_contains_all": Check if user's output contains all strings in expected list
+    - "integer_greater_than": Check if validation_command output is an integer above expected value
+    - "set_contains": Check if validation_command output contains expected member
+
+    Each of these also exists as "<type>" (validation_command output) and
+    "user_output_<type>" (user's output):
+    - "regex": Output contains a match for the expected regular expression
+    - "normalized_whitespace": Output equals expected value after collapsing whitespace
+    - "line_set_equal": Output's non-empty lines equal the expected lines, in any order
+    - "numeric_tolerance": Output is a number within {"target": x, "tolerance": t}
+    - "json_equal": Output parses to JSON structurally equal to expected value
+
+    New types are added with grader.register(); see app/grader.py.
     """
     type: str
     value: Any
@@ -22,6 +34,9 @@ class CheckLogic(BaseModel):
     validation_command: Optional[str] = None
     expected_result: ExpectedResult
 
+    # Matcher compiled from expected_result by grader.compile_check()
+    _matcher: Any = PrivateAttr(default=None)
+
 class GradePayload(BaseModel):
     """The structure of an incoming grading request."""
     language: str
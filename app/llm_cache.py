@@ -0,0 +1,141 @@
+# ABOUTME: Cache of LLM provider responses keyed on the normalized request (model, messages, params).
+# ABOUTME: In-memory with TTL + LRU eviction; can also record responses to disk and replay them offline.
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# memory: cache in this process | record: also append to LLM_CACHE_FILE
+# replay: answer only from LLM_CACHE_FILE, never call the provider | off
+MODES = ("off", "memory", "record", "replay")
+DEFAULT_FILE = "llm_responses.jsonl"
+
+
+def _normalize_messages(messages):
+    if not isinstance(messages, list) or not all(isinstance(m, dict) for m in messages):
+        return messages
+    normalized = []
+    for message in messages:
+        message = dict(message)
+        if isinstance(message.get("role"), str):
+            message["role"] = message["role"].strip().lower()
+        if isinstance(message.get("content"), str):
+            message["content"] = message["content"].strip()
+        normalized.append(message)
+    return normalized
+
+
+def normalize_request(payload: dict) -> dict:
+    """The parts of a chat request that decide the answer, in canonical form.
+
+    Whitespace around message text, role case and number formatting
+    (0.7 vs 0.70) don't change the key; any other request parameters
+    (top_p, stop, ...) are kept as-is so they still do.
+    """
+    request = dict(payload)
+    request["messages"] = _normalize_messages(request.get("messages"))
+    if isinstance(request.get("temperature"), (int, float)):
+        request["temperature"] = round(float(request["temperature"]), 4)
+    if isinstance(request.get("max_tokens"), float) and request["max_tokens"].is_integer():
+        request["max_tokens"] = int(request["max_tokens"])
+    return request
+
+
+def cache_key(payload: dict) -> str:
+    canonical = json.dumps(normalize_request(payload), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Provider responses by request, LRU-bounded, each kept for `ttl` seconds.
+
+    Responses loaded from a recording never expire, and in replay mode the
+    whole recording stays in memory.
+    """
+
+    def __init__(self, mode: str = "memory", max_entries: int = 512, ttl: float = 3600,
+                 path: str = DEFAULT_FILE, clock=time.monotonic):
+        if mode not in MODES:
+            raise ValueError(f"LLM_CACHE_MODE must be one of {', '.join(MODES)}, not '{mode}'")
+        self.mode = mode
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self._entries = OrderedDict()  # {key: (expires_at, response)}
+        self.hits = 0
+        self.misses = 0
+        if mode in ("record", "replay"):
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        """Build the cache from LLM_CACHE_* at call time (after load_dotenv)."""
+        return cls(
+            mode=os.environ.get("LLM_CACHE_MODE", "memory"),
+            max_entries=int(os.environ.get("LLM_CACHE_SIZE", "512")),
+            ttl=float(os.environ.get("LLM_CACHE_TTL", "3600")),
+            path=os.environ.get("LLM_CACHE_FILE", DEFAULT_FILE),
+        )
+
+    @property
+    def replay_only(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self):
+        """Read a recording into memory; later lines win."""
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line)
+                self._entries[record["key"]] = (None, record["response"])
+            except (ValueError, KeyError) as e:
+                logger.warning(f"{self.path}:{number}: skipping bad LLM cache record: {e}")
+
+    def _record(self, key: str, payload: dict, response):
+        record = {"key": key, "request": normalize_request(payload), "response": response}
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def get(self, payload: dict):
+        """The cached response for this request, or None."""
+        if self.mode == "off":
+            return None
+        key = cache_key(payload)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at is None or self.clock() < expires_at:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return response
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, payload: dict, response):
+        """Remember a successful response (and append it to the recording in record mode)."""
+        if self.mode in ("off", "replay"):
+            return
+        key = cache_key(payload)
+        self._entries[key] = (self.clock() + self.ttl, response)
+        self._entries.move_to_end(key)
+        if self.mode == "record":
+            self._record(key, payload, response)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,261 @@
+# ABOUTME: Shared async HTTP client for the LLM lessons' provider calls (subprocess grading mode).
+# ABOUTME: Pooled keep-alive connections, bounded concurrency, jittered retries on 429/5xx, response cache.
+
+import asyncio
+import importlib.util
+import json
+import os
+import random
+from pathlib import Path
+
+import httpx
+
+try:
+    from app.llm_cache import LLMCache
+except ImportError:
+    from llm_cache import LLMCache
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CALL_LLM_SCRIPT = BASE_DIR / "docker" / "llm" / "call_llm.py"
+
+# Responses worth retrying: rate limited or a transient provider failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def load_call_llm():
+    """The grader image's call_llm.py, which owns the request/response formats.
+
+    Loaded by path (at call time, after load_dotenv) so both grading modes
+    build the same requests and show students the same output.
+    """
+    spec = importlib.util.spec_from_file_location("call_llm", CALL_LLM_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LLMClient:
+    """One pooled HTTP client for every LLM lesson call in this process.
+
+    Connections are kept alive between grades, at most `max_concurrency`
+    requests are in flight to the provider, and 429/5xx responses or failed
+    connects are retried with exponential backoff and full jitter (honouring
+    Retry-After). Read timeouts are not retried: the provider may already be
+    generating (and billing) the answer.
+
+    With a cache, successful responses are reused for identical requests;
+    in replay mode the provider is never called (and no API key is needed).
+    """
+
+    def __init__(self, chat_url: str, api_key: str, max_concurrency: int = 4,
+                 connect_timeout: float = 5, read_timeout: float = 30, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 4, transport=None, tools=None,
+                 cache: LLMCache = None):
+        self.chat_url = chat_url
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.tools = tools or load_call_llm()
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            transport=transport,
+        )
+        self.requests = 0
+        self.retries = 0
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "LLMClient":
+        """Build the client from LLM_* environment variables at call time (after load_dotenv)."""
+        tools = load_call_llm()
+        return cls(
+            tools.LLM_CHAT_URL,
+            os.environ.get("LLM_API_KEY", ""),
+            max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", "4")),
+            connect_timeout=float(os.environ.get("LLM_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.environ.get("LLM_READ_TIMEOUT", "30")),
+            max_retries=int(os.environ.get("LLM_MAX_RETRIES", "2")),
+            tools=tools,
+            cache=LLMCache.from_env(),
+            **kwargs,
+        )
+
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass  # HTTP-date form; the jittered delay will do
+        return delay
+
+    async def post(self, payload: dict) -> httpx.Response:
+        """POST a chat completion request, retrying transient failures.
+
+        Returns the final response (which may still be an error status).
+
+        Raises:
+            httpx.HTTPError: If the provider can't be reached or times out.
+        """
+        async with self._semaphore:
+            response = await self._send(payload, stream=False)
+        return response
+
+    async def _send(self, payload: dict, stream: bool) -> httpx.Response:
+        """Send with retries; the caller holds the concurrency slot (and closes streamed responses)."""
+        request = self._client.build_request(
+            "POST", self.chat_url, json=payload, headers=self.tools.request_headers(self.api_key)
+        )
+        # The slot is kept while backing off, so a throttling provider sees less traffic
+        for attempt in range(self.max_retries + 1):
+            self.requests += 1
+            try:
+                response = await self._client.send(request, stream=stream)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                delay = self._backoff(attempt, response.headers.get("retry-after"))
+                await response.aclose()
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _request(self, payload: dict, format_result) -> str:
+        if self.cache is not None:
+            cached = self.cache.get(payload)
+            if cached is not None:
+                return format_result(cached)
+            if self.cache.replay_only:
+                return "Error: No recorded LLM response for this request (LLM_CACHE_MODE=replay)"
+        try:
+            response = await self.post(payload)
+        except httpx.TimeoutException:
+            return "Error: LLM API request timed out"
+        except httpx.HTTPError as e:
+            return f"Connection Error: {e}"
+        if response.status_code != 200:
+            return self.tools.format_http_error(response.status_code, response.text, self.api_key)
+        try:
+            result = response.json()
+            output = format_result(result)
+        except Exception as e:
+            return f"Error: {str(e)}"
+        if self.cache is not None:
+            self.cache.put(payload, result)
+        return output
+
+    @property
+    def _replaying(self) -> bool:
+        return self.cache is not None and self.cache.replay_only
+
+    async def call_llm(self, user_input: str, system_prompt: str = None) -> str:
+        """Same output as call_llm.call_llm, over the shared connection pool."""
+        error = None if self._replaying else self.tools.check_api_key(self.api_key)
+        if error:
+            return error
+        return await self._request(self.tools.chat_payload(user_input, system_prompt), self.tools.format_chat_result)
+
+    async def call_llm_from_json(self, json_input: str) -> str:
+        """Same output as call_llm.call_llm_from_json, over the shared connection pool."""
+        if not self.api_key and not self._replaying:
+            return "Error: No API key configured. Please set LLM_API_KEY environment variable."
+        payload, error = self.tools.json_payload(json_input)
+        if error:
+            return error
+        return await self._request(payload, self.tools.format_json_result)
+
+    async def stream_llm(self, user_input: str, system_prompt: str = None):
+        """call_llm, streamed: yields ("token", text) as the answer is generated, then ("output", text).
+
+        The final output is exactly what call_llm would return. Retries only
+        happen before the first token; usage figures are shown when the
+        provider includes them in the stream.
+        """
+        error = None if self._replaying else self.tools.check_api_key(self.api_key)
+        if error:
+            yield "output", error
+            return
+        payload = self.tools.chat_payload(user_input, system_prompt)
+
+        if self.cache is not None:
+            cached = self.cache.get(payload)
+            if cached is not None:
+                output = self.tools.format_chat_result(cached)
+                yield "token", cached["choices"][0]["message"].get("content", "") or ""
+                yield "output", output
+                return
+            if self.cache.replay_only:
+                yield "output", "Error: No recorded LLM response for this request (LLM_CACHE_MODE=replay)"
+                return
+
+        content, reasoning, result = [], [], {"model": payload["model"]}
+        finish_reason = None
+        completed = False  # [DONE] seen: the provider finished the answer
+        try:
+            async with self._semaphore:
+                response = await self._send({**payload, "stream": True}, stream=True)
+                try:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        yield "output", self.tools.format_http_error(response.status_code, body, self.api_key)
+                        return
+                    async for data in _sse_data(response):
+                        if data == "[DONE]":
+                            completed = True
+                            break
+                        chunk = json.loads(data)
+                        result["model"] = chunk.get("model", result["model"])
+                        choice = (chunk.get("choices") or [{}])[0]
+                        usage = chunk.get("usage") or choice.get("usage")
+                        if usage:
+                            result["usage"] = usage
+                        finish_reason = choice.get("finish_reason") or finish_reason
+                        delta = choice.get("delta") or {}
+                        if delta.get("reasoning_content"):
+                            reasoning.append(delta["reasoning_content"])
+                        if delta.get("content"):
+                            content.append(delta["content"])
+                            yield "token", delta["content"]
+                finally:
+                    await response.aclose()
+        except httpx.TimeoutException:
+            yield "output", "Error: LLM API request timed out"
+            return
+        except httpx.HTTPError as e:
+            yield "output", f"Connection Error: {e}"
+            return
+        except ValueError as e:
+            yield "output", f"Error: {str(e)}"
+            return
+
+        message = {"role": "assistant", "content": "".join(content)}
+        if reasoning:
+            message["reasoning_content"] = "".join(reasoning)
+        # Same shape as a non-streamed response, so a max_tokens cut-off ("length") survives
+        result["choices"] = [{"index": 0, "message": message, "finish_reason": finish_reason}]
+        # A stream cut off before [DONE] is graded as received but never cached
+        if self.cache is not None and completed:
+            self.cache.put(payload, result)
+        yield "output", self.tools.format_chat_result(result)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+async def _sse_data(response: httpx.Response):
+    """The data fields of an OpenAI-style Server-Sent Events stream: JSON chunks, then "[DONE]".
+
+    A stream that ends without "[DONE]" was cut off by the provider or the network.
+    """
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue  # blank separators, comments, event/id fields
+        data = line[len("data:"):].strip()
+        if data:
+            yield data
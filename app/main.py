@@ -1,14 +1,12 @@
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from collections import defaultdict
-from pydantic import BaseModel
 import json
+import math
+from pydantic import BaseModel
 import os
-import time
 from dotenv import load_dotenv
 from pathlib import Path
 import logging
@@ -21,6 +19,11 @@ GRADER_MODE = os.getenv("GRADER_MODE", "docker")
 try:
     from app import grader_schemas
     from app import settings as app_settings
+    from app.scheduler import scheduler as grading_scheduler, SchedulerBusy
+    from app.ratelimit import RateLimiter
+    from app.pagecache import PageCache, page_response
+    from app.assets import AssetManifest, AssetFiles
+    from app.catalog import LessonCatalog, LessonLoadError, CatalogWatcher
     if GRADER_MODE == "subprocess":
         from app.subprocess_manager import manager as container_manager
     else:
@@ -28,6 +31,11 @@ try:
 except ImportError:
     import grader_schemas
     import settings as app_settings
+    from scheduler import scheduler as grading_scheduler, SchedulerBusy
+    from ratelimit import RateLimiter
+    from pagecache import PageCache, page_response
+    from assets import AssetManifest, AssetFiles
+    from catalog import LessonCatalog, LessonLoadError, CatalogWatcher
     if GRADER_MODE == "subprocess":
         from subprocess_manager import manager as container_manager
     else:
@@ -38,18 +46,58 @@ load_dotenv()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage startup and shutdown events."""
-    # Startup: warm up container pools
+    # Startup: parse all lessons and translations once; refuse to start on broken content
+    catalog = get_catalog()
+    catalog.raise_for_problems()
+    logger.info(f"Lesson catalog loaded: {sum(map(len, catalog.topics.values()))} lessons, "
+                f"languages {', '.join(catalog.languages)}")
+    # Dev mode: pick up lesson/translation edits without a restart
+    watcher = None
+    if os.getenv("DEV_MODE") or os.getenv("CATALOG_WATCH"):
+        watcher = CatalogWatcher(get_catalog)
+        watcher.start()
+    # Open the settings DB once; visibility is served from memory afterwards
+    app_settings.init_db()
+    # Warm up container pools
     await container_manager.startup()
     yield
     # Shutdown: cleanup containers
+    if watcher:
+        await watcher.stop()
     await container_manager.shutdown()
+    await rate_limiter.close()
+    app_settings.close_db()
 
 app = FastAPI(title="Narrative Learning Engine", lifespan=lifespan)
 
 base_dir = Path(__file__).resolve().parent.parent
-app.mount("/static", StaticFiles(directory=str(base_dir / "static")), name="static")
+# Hash static files once so templates can link fingerprinted, long-cacheable URLs
+assets = AssetManifest(base_dir / "static", auto_reload=bool(os.getenv("DEV_MODE")))
+app.mount("/static", AssetFiles(assets), name="static")
 
 templates = Jinja2Templates(directory=str(base_dir / "templates"))
+templates.env.globals["static_url"] = assets.static_url
+
+_catalog = None
+
+def get_catalog() -> LessonCatalog:
+    """Return the lesson catalog for base_dir, rebuilding it only if base_dir changed."""
+    global _catalog
+    if _catalog is None or _catalog.base_dir != base_dir:
+        _catalog = LessonCatalog(base_dir)
+    return _catalog
+
+# Rendered lesson/menu HTML. Off in DEV_MODE so template edits show up immediately.
+page_cache = PageCache(enabled=not os.getenv("DEV_MODE"))
+
+def render_cached(request: Request, key: tuple, template_name: str, context: dict):
+    """Render template_name once per key and catalog version, then serve it with ETag/304."""
+    page = page_cache.get_or_render(
+        key,
+        get_catalog().topic_generation(key[1]),
+        lambda: templates.get_template(template_name).render(context),
+    )
+    return page_response(request, page)
 
 app.add_middleware(
     CORSMiddleware,
@@ -69,34 +117,8 @@ if os.getenv("DEV_MODE"):
         return response
 
 # --- Rate Limiting ---
-# Simple in-memory rate limiter: max requests per IP per window
-RATE_LIMIT_MAX = 30          # max requests
-RATE_LIMIT_WINDOW = 60       # per 60 seconds
-_rate_limit_store = defaultdict(list)  # {ip: [timestamp, ...]}
-_rate_limit_last_cleanup = time.time()
-_RATE_LIMIT_CLEANUP_INTERVAL = 300  # clean stale IPs every 5 minutes
-
-def check_rate_limit(ip: str) -> bool:
-    """Returns True if request is allowed, False if rate limited."""
-    global _rate_limit_last_cleanup
-    now = time.time()
-
-    # Periodic cleanup: remove IPs with no recent requests
-    if now - _rate_limit_last_cleanup > _RATE_LIMIT_CLEANUP_INTERVAL:
-        stale_ips = [
-            k for k, timestamps in _rate_limit_store.items()
-            if all(now - t >= RATE_LIMIT_WINDOW for t in timestamps)
-        ]
-        for k in stale_ips:
-            del _rate_limit_store[k]
-        _rate_limit_last_cleanup = now
-
-    # Clean old entries for this IP
-    _rate_limit_store[ip] = [t for t in _rate_limit_store[ip] if now - t < RATE_LIMIT_WINDOW]
-    if len(_rate_limit_store[ip]) >= RATE_LIMIT_MAX:
-        return False
-    _rate_limit_store[ip].append(now)
-    return True
+# Per-IP budgets per route and per topic (see ratelimit.ROUTE_LIMITS / TOPIC_LIMITS)
+rate_limiter = RateLimiter.from_env()
 
 
 class CommandRequest(BaseModel):
@@ -114,6 +136,11 @@ async def health_check():
     """Health check endpoint for monitoring and fly.io."""
     return {"status": "ok", "grader_mode": GRADER_MODE}
 
+@app.get("/api/metrics/grading")
+async def grading_metrics():
+    """Per-topic grading queue depth, running grades and rejection counters."""
+    return grading_scheduler.metrics()
+
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     enabled = app_settings.get_enabled_tutorials()
@@ -130,91 +157,14 @@ async def get_tutorial_menu(request: Request, topic: str):
     if topic not in enabled:
         raise HTTPException(status_code=404, detail=f"Tutorial topic '{topic}' not found")
 
-    tutorial_dir = base_dir / f"tutorials/{topic}"
-
-    if not tutorial_dir.exists():
-        raise HTTPException(status_code=404, detail=f"Tutorial topic '{topic}' not found")
-
-    lessons = []
-    tutorial_name = topic.title()
-    description = "Learn through engaging narratives and interactive challenges"
-    available_styles = []
     current_style = request.query_params.get("style", "detective_noir")
     lang = request.query_params.get("lang", "en")
 
-    # Load all lesson files
-    for json_file in sorted(tutorial_dir.glob("*.json")):
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                lesson_data = json.load(f)
-
-            # i18n: load translation if language is specified
-            if lang != "en":
-                trans_path = base_dir / f"translations/{lang}/{topic}/{json_file.stem}.json"
-                if trans_path.exists():
-                    with open(trans_path, "r", encoding="utf-8") as f:
-                        trans = json.load(f)
-                    if "tutorial" in trans:
-                        lesson_data["tutorial"] = trans["tutorial"]
-                    if "technical_concept" in trans:
-                        lesson_data["technical_concept"] = trans["technical_concept"]
-                    # Merge translated style titles
-                    if "styles" in trans:
-                        for style_obj in lesson_data.get("styles", []):
-                            style_name = style_obj.get("name", "")
-                            if style_name in trans["styles"]:
-                                ts = trans["styles"][style_name]
-                                if "title" in ts:
-                                    style_obj["title"] = ts["title"]
-
-            # Collect available styles from first lesson
-            if not available_styles and lesson_data.get("styles"):
-                available_styles = [
-                    {
-                        "name": s.get("name", ""),
-                        "display_name": s.get("name", "").replace("_", " ").title()
-                    }
-                    for s in lesson_data.get("styles", [])
-                ]
-
-            # Find the selected style or use first style
-            selected_style = None
-            for s in lesson_data.get("styles", []):
-                if s.get("name") == current_style:
-                    selected_style = s
-                    break
-            if not selected_style and lesson_data.get("styles"):
-                selected_style = lesson_data.get("styles")[0]
-
-            lessons.append({
-                "filename": json_file.stem,
-                "title": selected_style.get("title", f"Lesson {json_file.stem}") if selected_style else f"Lesson {json_file.stem}",
-                "technical_concept": lesson_data.get("technical_concept", ""),
-                "module": lesson_data.get("module", 1),
-                "scene": lesson_data.get("scene", 1)
-            })
-
-            # Use first lesson to set tutorial info
-            if not lessons or len(lessons) == 1:
-                tutorial_name = lesson_data.get("tutorial", topic.title())
-
-        except (json.JSONDecodeError, Exception) as e:
-            logger.warning(f"Failed to load lesson file {json_file}: {e}")
-            continue
-
-    return templates.TemplateResponse(
-        request,
-        "tutorial_menu.html",
-        {
-            "topic": topic,
-            "tutorial_name": tutorial_name,
-            "description": description,
-            "available_styles": available_styles,
-            "current_style": current_style,
-            "lessons": lessons,
-            "lang": lang
-        }
-    )
+    menu = get_catalog().menu(topic, lang=lang, style=current_style)
+    if menu is None:
+        raise HTTPException(status_code=404, detail=f"Tutorial topic '{topic}' not found")
+
+    return render_cached(request, ("menu", topic, lang, current_style), "tutorial_menu.html", menu)
 
 @app.get("/tutorial/{topic}/{lesson}", response_class=HTMLResponse)
 async def get_tutorial(request: Request, topic: str, lesson: str):
@@ -223,135 +173,81 @@ async def get_tutorial(request: Request, topic: str, lesson: str):
     if topic not in enabled:
         raise HTTPException(status_code=404, detail=f"Tutorial topic '{topic}' not found")
 
-    json_path = base_dir / f"tutorials/{topic}/{lesson}.json"
+    lang = request.query_params.get("lang", "en")
+    style = request.query_params.get("style", "detective_noir")
 
-    if not json_path.exists():
+    try:
+        page = get_catalog().lesson_page(topic, lesson, lang=lang, style=style)
+    except LessonLoadError as e:
+        raise HTTPException(status_code=500, detail=e.detail)
+    if page is None:
         raise HTTPException(status_code=404, detail=f"Lesson '{lesson}' not found in topic '{topic}'")
 
-    # Calculate prev/next lesson navigation
-    topic_dir = base_dir / f"tutorials/{topic}"
-    lesson_files = sorted([f.stem for f in topic_dir.glob("*.json")])
-    current_index = lesson_files.index(lesson) if lesson in lesson_files else -1
-    prev_lesson = lesson_files[current_index - 1] if current_index > 0 else None
-    next_lesson = lesson_files[current_index + 1] if current_index < len(lesson_files) - 1 else None
+    return render_cached(
+        request,
+        ("lesson", topic, lesson, lang, style),
+        "tutorial_template.html",
+        page
+    )
 
-    try:
-        with open(json_path, "r", encoding="utf-8") as f:
-            lesson_data = json.load(f)
-
-        # i18n: load translation if language is specified
-        lang = request.query_params.get("lang", "en")
-        if lang != "en":
-            trans_path = base_dir / f"translations/{lang}/{topic}/{lesson}.json"
-            if trans_path.exists():
-                with open(trans_path, "r", encoding="utf-8") as f:
-                    trans = json.load(f)
-                # Merge translated strings into lesson data
-                if "tutorial" in trans:
-                    lesson_data["tutorial"] = trans["tutorial"]
-                if "technical_concept" in trans:
-                    lesson_data["technical_concept"] = trans["technical_concept"]
-                if "challenge" in trans:
-                    for key in ("task", "hint", "solution"):
-                        if key in trans["challenge"]:
-                            lesson_data["challenge"][key] = trans["challenge"][key]
-                # Merge translated styles (keyed by style name)
-                if "styles" in trans:
-                    for style_obj in lesson_data.get("styles", []):
-                        style_name = style_obj.get("name", "")
-                        if style_name in trans["styles"]:
-                            ts = trans["styles"][style_name]
-                            if "title" in ts:
-                                style_obj["title"] = ts["title"]
-                            if "dialogue" in ts:
-                                style_obj["dialogue"] = ts["dialogue"]
-
-        style = request.query_params.get("style", "detective_noir")
-
-        # Collect available styles
-        available_styles = [
-            {
-                "name": s.get("name", ""),
-                "display_name": s.get("name", "").replace("_", " ").title()
-            }
-            for s in lesson_data.get("styles", [])
-        ]
-
-        selected_style = None
-        for s in lesson_data.get("styles", []):
-            if s["name"] == style:
-                selected_style = s
-                break
-
-        if not selected_style and lesson_data.get("styles"):
-            selected_style = lesson_data["styles"][0]
-
-        return templates.TemplateResponse(
-            request,
-            "tutorial_template.html",
-            {
-                "tutorial": lesson_data.get("tutorial", ""),
-                "module": lesson_data.get("module", 1),
-                "scene": lesson_data.get("scene", 1),
-                "lesson_number": current_index + 1,
-                "total_lessons": len(lesson_files),
-                "title": selected_style.get("title", "") if selected_style else "",
-                "dialogue": selected_style.get("dialogue", []) if selected_style else [],
-                "code_example": lesson_data.get("code_example", {}),
-                "challenge": lesson_data.get("challenge", {}),
-                "technical_concept": lesson_data.get("technical_concept", ""),
-                "topic": topic,
-                "lesson": lesson,
-                "style": style,
-                "available_styles": available_styles,
-                "current_style": style,
-                "prev_lesson": prev_lesson,
-                "next_lesson": next_lesson,
-                "lang": lang,
-                "js_version": str(int(time.time()))
-            }
-        )
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="Invalid JSON format in lesson file")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error loading lesson: {str(e)}")
 
+async def _check_admission(request: CommandRequest, req: Request):
+    """Rate limit and lesson lookup shared by the check-answer endpoints.
 
-@app.post("/api/check-answer", response_model=CommandResponse)
-async def check_answer(request: CommandRequest, req: Request):
+    Returns:
+        (429 response or None, the lesson's pre-validated check_logic)
+    """
     # Rate limiting
     client_ip = req.client.host if req.client else "unknown"
-    if not check_rate_limit(client_ip):
+    wait = await rate_limiter.check(client_ip, "check-answer", request.topic)
+    if wait:
         return JSONResponse(
             status_code=429,
-            content={"detail": "Too many requests. Please wait a moment."}
-        )
+            content={"detail": "Too many requests. Please wait a moment."},
+            headers={"Retry-After": str(math.ceil(wait))}
+        ), None
 
-    # 1. Load the lesson JSON to get the check_logic
-    json_path = base_dir / f"tutorials/{request.topic}/{request.lesson}.json"
-    if not json_path.exists():
+    # Look up the lesson's pre-validated check_logic
+    catalog = get_catalog()
+    if not catalog.has_lesson(request.topic, request.lesson):
         raise HTTPException(status_code=404, detail="Lesson file not found")
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        lesson_data = json.load(f)
-
-    check_logic_data = lesson_data.get("challenge", {}).get("check_logic")
-    if not check_logic_data:
+    try:
+        check_logic = catalog.check_logic(request.topic, request.lesson)
+    except LessonLoadError as e:
+        raise HTTPException(status_code=500, detail=e.detail)
+    if check_logic is None:
         raise HTTPException(status_code=500, detail="Missing check_logic in lesson challenge")
+    return None, check_logic
 
-    # 2. Convert check_logic dict to Pydantic model
-    try:
-        check_logic = grader_schemas.CheckLogic(**check_logic_data)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Invalid check_logic format: {str(e)}")
 
-    # 3. Execute code directly using container manager
+BUSY_DETAIL = "The grader is busy right now. Please try again in a moment."
+
+
+def _busy_response(e: SchedulerBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": BUSY_DETAIL},
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+@app.post("/api/check-answer", response_model=CommandResponse)
+async def check_answer(request: CommandRequest, req: Request):
+    # 1. Rate limit and look up the lesson
+    limited, check_logic = await _check_admission(request, req)
+    if limited:
+        return limited
+
+    # 2. Execute code using container manager, once the scheduler admits it
     try:
-        result = await container_manager.execute_code_in_container(
-            language=request.topic,  # e.g., "redis"
-            user_code=request.command,
-            check_logic=check_logic
-        )
+        async with grading_scheduler.slot(request.topic) as slot:
+            result = await container_manager.execute_code_in_container(
+                language=request.topic,  # e.g., "redis"
+                user_code=request.command,
+                check_logic=check_logic,
+                release_slot=slot.release  # LLM provider calls wait outside the lane
+            )
 
         return CommandResponse(
             output=result.output,
@@ -359,12 +255,67 @@ async def check_answer(request: CommandRequest, req: Request):
             feedback_message=result.feedback_message
         )
 
+    except SchedulerBusy as e:
+        return _busy_response(e)
     except KeyError as e:
         raise HTTPException(status_code=400, detail=f"Unsupported topic: {request.topic}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error during grading: {str(e)}")
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/check-answer/stream")
+async def check_answer_stream(request: CommandRequest, req: Request):
+    """/api/check-answer as Server-Sent Events.
+
+    Sends `token` events ({"text"}) while an LLM answer is generated, then one
+    `result` event (a CommandResponse) or an `error` event ({"detail"}).
+    Rate limiting and lesson errors are reported with the same status codes
+    as /api/check-answer, before the stream starts. The scheduler slot is only
+    taken once the body is being sent, so a busy grader is an `error` event
+    ({"detail", "retry_after"}).
+    """
+    limited, check_logic = await _check_admission(request, req)
+    if limited:
+        return limited
+
+    async def events():
+        # Hold the scheduler slot while grading (an LLM answer gives it back
+        # before streaming); a client gone before the body starts never takes one
+        try:
+            async with grading_scheduler.slot(request.topic) as slot:
+                async for kind, value in container_manager.stream_code_in_container(
+                    language=request.topic,
+                    user_code=request.command,
+                    check_logic=check_logic,
+                    release_slot=slot.release
+                ):
+                    if kind == "token":
+                        yield _sse("token", {"text": value})
+                    else:
+                        yield _sse("result", CommandResponse(
+                            output=value.output,
+                            is_correct=value.is_correct,
+                            feedback_message=value.feedback_message
+                        ).model_dump())
+        except SchedulerBusy as e:
+            yield _sse("error", {"detail": BUSY_DETAIL, "retry_after": e.retry_after})
+        except KeyError:
+            yield _sse("error", {"detail": f"Unsupported topic: {request.topic}"})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error during grading: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxies (fly.io, nginx) must pass tokens through as they arrive
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # --- Admin Settings ---
 
 TUTORIAL_DISPLAY_NAMES = {
@@ -382,14 +333,13 @@ async def settings_page(request: Request):
         raise HTTPException(status_code=404, detail="Settings not available (no ADMIN_PASSWORD configured)")
 
     states = app_settings.get_all_tutorial_states()
+    catalog = get_catalog()
     tutorials = {}
     for topic in app_settings.ALL_TUTORIALS:
-        topic_dir = base_dir / f"tutorials/{topic}"
-        lesson_count = len(list(topic_dir.glob("*.json"))) if topic_dir.exists() else 0
         tutorials[topic] = {
             "display_name": TUTORIAL_DISPLAY_NAMES.get(topic, topic.title()),
             "enabled": states.get(topic, True),
-            "lesson_count": lesson_count,
+            "lesson_count": catalog.lesson_count(topic),
         }
     return templates.TemplateResponse(request, "settings.html", {"tutorials": tutorials})
 
@@ -412,6 +362,7 @@ async def update_tutorials(req: SettingsUpdateRequest):
     if not app_settings.check_password(req.password):
         return JSONResponse(status_code=403, content={"ok": False, "detail": "Wrong password"})
     app_settings.update_tutorial_states(req.states)
+    page_cache.clear()
     return {"ok": True}
 
 
@@ -0,0 +1,99 @@
+# ABOUTME: Cache of rendered lesson/menu HTML keyed on (page, topic, lesson, lang, style).
+# ABOUTME: Serves cached pages with ETag/Last-Modified and answers conditional requests with 304.
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+
+# Max rendered pages kept; query strings are user input, so the key space is unbounded
+MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_SIZE", "2048"))
+
+
+class CachedPage:
+    """Rendered HTML plus the validators sent with it."""
+
+    __slots__ = ("body", "etag", "last_modified", "modified_at", "version")
+
+    def __init__(self, html: str, version):
+        self.body = html.encode("utf-8")
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self.modified_at = int(time.time())
+        self.last_modified = formatdate(self.modified_at, usegmt=True)
+        self.version = version
+
+
+class PageCache:
+    """LRU cache of rendered pages.
+
+    Each entry remembers the `version` it was rendered from (the catalog's
+    topic generation); a lookup with a different version is a miss, so
+    reloaded lessons are re-rendered without explicit invalidation.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._pages = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: tuple, version, render) -> CachedPage:
+        """Return the cached page for key/version, calling render() -> str on a miss."""
+        page = self._pages.get(key) if self.enabled else None
+        if page is not None and page.version == version:
+            self.hits += 1
+            self._pages.move_to_end(key)
+            return page
+
+        self.misses += 1
+        page = CachedPage(render(), version)
+        if self.enabled:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            if len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+        return page
+
+    def clear(self):
+        self._pages.clear()
+
+    def __len__(self):
+        return len(self._pages)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header (a list, `*`, weak `W/` tags) matches `etag`."""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def _not_modified(request: Request, page: CachedPage) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, page.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return page.modified_at <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def page_response(request: Request, page: CachedPage) -> Response:
+    """HTML response for page, or an empty 304 if the client's copy is current."""
+    headers = {
+        "ETag": page.etag,
+        "Last-Modified": page.last_modified,
+        # Let browsers keep the page but check back (cheaply, via 304) on each view
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(request, page):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=page.body, headers=headers)
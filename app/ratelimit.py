@@ -0,0 +1,152 @@
+# ABOUTME: GCRA (token-bucket equivalent) rate limiting with per-route and per-topic budgets.
+# ABOUTME: State is one float per key, held in an LRU-bounded dict or shared through Redis.
+
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Max keys the in-memory backend remembers; least recently seen keys are dropped first
+MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "10000"))
+# Logical DB 15 is never given to a grader sandbox (see subprocess_manager.SANDBOX_DATABASES)
+DEFAULT_REDIS_URL = "redis://localhost:6379/15"
+
+
+class Limit:
+    """Allow `count` requests per `period` seconds, all of which may arrive as one burst."""
+
+    def __init__(self, count: int, period: float):
+        self.count = count
+        self.period = period
+        self.interval = period / count  # seconds of budget each request uses
+
+    def __repr__(self):
+        return f"Limit({self.count}, {self.period})"
+
+
+# Budget per client IP for each rate-limited route
+ROUTE_LIMITS = {
+    "check-answer": Limit(30, 60),
+}
+# Extra budget per client IP for topics that are expensive to grade
+# (LLM lessons call a paid upstream API)
+TOPIC_LIMITS = {
+    "llm": Limit(15, 60),
+}
+
+
+class MemoryBackend:
+    """Per-process GCRA state: {key: theoretical arrival time}, LRU-bounded."""
+
+    def __init__(self, max_keys: int = MAX_KEYS, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._tat = OrderedDict()
+
+    async def hit(self, key: str, limit: Limit) -> float:
+        """Spend one request from `key`'s budget.
+
+        Returns:
+            0 if allowed, otherwise seconds until the request would be allowed.
+        """
+        now = self.clock()
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + limit.interval
+        allow_at = new_tat - limit.period
+        if allow_at - now > 1e-9:  # tolerate float drift on the last request of a burst
+            return allow_at - now
+
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.max_keys:
+            self._tat.popitem(last=False)
+        return 0
+
+    def __len__(self):
+        return len(self._tat)
+
+
+# GCRA in one round trip. Uses the Redis server clock so machines with
+# skewed clocks agree; the key expires once its budget has fully refilled.
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return tostring(allow_at - now)
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return '0'
+"""
+
+
+class RedisBackend:
+    """GCRA state in Redis, shared by every app machine pointing at the same server.
+
+    Requires the optional `redis` package (pip install redis). If Redis is
+    unreachable, requests are allowed and a warning is logged.
+    """
+
+    def __init__(self, url: str = DEFAULT_REDIS_URL, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(_GCRA_SCRIPT)
+
+    async def hit(self, key: str, limit: Limit) -> float:
+        try:
+            wait = await self._script(keys=[self.prefix + key], args=[limit.interval, limit.period])
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            return 0
+        return float(wait)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class RateLimiter:
+    """Checks a request against its route budget and, if any, its topic budget."""
+
+    def __init__(self, backend=None, route_limits: dict = None, topic_limits: dict = None):
+        self.backend = MemoryBackend() if backend is None else backend
+        self.route_limits = ROUTE_LIMITS if route_limits is None else route_limits
+        self.topic_limits = TOPIC_LIMITS if topic_limits is None else topic_limits
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Build the limiter from RATE_LIMIT_BACKEND ("memory" or "redis") at call time (after load_dotenv)."""
+        if os.environ.get("RATE_LIMIT_BACKEND", "memory") == "redis":
+            return cls(RedisBackend(os.environ.get("RATE_LIMIT_REDIS_URL", DEFAULT_REDIS_URL)))
+        return cls(MemoryBackend())
+
+    async def check(self, client: str, route: str, topic: str = None) -> float:
+        """Spend one request for `client` on `route` (and `topic`).
+
+        Returns:
+            0 if allowed, otherwise seconds the client should wait (for Retry-After).
+        """
+        limit = self.route_limits.get(route)
+        if limit is not None:
+            wait = await self.backend.hit(f"{route}:{client}", limit)
+            if wait:
+                return wait
+
+        limit = self.topic_limits.get(topic)
+        if limit is not None:
+            return await self.backend.hit(f"{route}:{topic}:{client}", limit)
+        return 0
+
+    async def close(self):
+        if hasattr(self.backend, "close"):
+            await self.backend.close()
@@ -0,0 +1,551 @@
+# ABOUTME: In-process emulator for the redis tutorial's whitelisted commands (strings, lists, sets, hashes, TTL).
+# ABOUTME: One Keyspace per grading sandbox; replies are formatted like non-interactive redis-cli.
+
+import re
+import time
+
+REDIS_VERSION = "7.2.4"
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+NOT_INTEGER = "ERR value is not an integer or out of range"
+SYNTAX_ERROR = "ERR syntax error"
+
+
+class RedisError(Exception):
+    """An error reply (ERR ..., WRONGTYPE ...)."""
+
+
+class _Set(dict):
+    """Set members in insertion order (values unused), distinct from a hash."""
+
+
+def split_args(line: str) -> list:
+    """Split a command line the way redis-cli does (sdssplitargs).
+
+    Double quotes understand \\n, \\t, \\" and \\xHH escapes; single quotes
+    only \\'. A closing quote must be followed by whitespace.
+
+    Raises:
+        ValueError: On unbalanced quotes.
+    """
+    args, i, n = [], 0, len(line)
+    escapes = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "a": "\a"}
+    while True:
+        while i < n and line[i].isspace():
+            i += 1
+        if i >= n:
+            return args
+        current, quote = [], None
+        while True:
+            if i >= n:
+                if quote:
+                    raise ValueError("Invalid argument(s)")
+                break
+            c = line[i]
+            if quote == '"':
+                if c == "\\" and i + 3 < n and line[i + 1] == "x" and re.fullmatch(r"[0-9a-fA-F]{2}", line[i + 2:i + 4]):
+                    current.append(chr(int(line[i + 2:i + 4], 16)))
+                    i += 3
+                elif c == "\\" and i + 1 < n:
+                    i += 1
+                    current.append(escapes.get(line[i], line[i]))
+                elif c == '"':
+                    if i + 1 < n and not line[i + 1].isspace():
+                        raise ValueError("Invalid argument(s)")
+                    i += 1
+                    break
+                else:
+                    current.append(c)
+            elif quote == "'":
+                if c == "\\" and i + 1 < n and line[i + 1] == "'":
+                    i += 1
+                    current.append("'")
+                elif c == "'":
+                    if i + 1 < n and not line[i + 1].isspace():
+                        raise ValueError("Invalid argument(s)")
+                    i += 1
+                    break
+                else:
+                    current.append(c)
+            elif c.isspace():
+                break
+            elif c in "\"'":
+                quote = c
+            else:
+                current.append(c)
+            i += 1
+        args.append("".join(current))
+
+
+def _glob_regex(pattern: str):
+    """A Redis glob (*, ?, [a-c], [^a], \\x) as a compiled regex."""
+    out, i = [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            out.append(".*")
+        elif c == "?":
+            out.append(".")
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        elif c == "[":
+            # Parsed like stringmatchlen(): escapes and ranges inside the class,
+            # reversed ranges swapped, an unterminated class runs to the end
+            i += 1
+            negate = i < len(pattern) and pattern[i] == "^"
+            i += negate
+            items = []
+            while i < len(pattern) and pattern[i] != "]":
+                if pattern[i] == "\\" and i + 1 < len(pattern):
+                    items.append(re.escape(pattern[i + 1]))
+                    i += 2
+                elif pattern[i + 1:i + 2] == "-" and i + 2 < len(pattern):
+                    start, end = sorted((pattern[i], pattern[i + 2]))
+                    items.append(f"{re.escape(start)}-{re.escape(end)}")
+                    i += 3
+                else:
+                    items.append(re.escape(pattern[i]))
+                    i += 1
+            if items:
+                out.append("[" + ("^" if negate else "") + "".join(items) + "]")
+            else:
+                out.append("." if negate else "(?!)")
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out), re.DOTALL)
+
+
+def _int(value: str) -> int:
+    if not re.fullmatch(r"-?(0|[1-9][0-9]*)", value):
+        raise RedisError(NOT_INTEGER)
+    number = int(value)
+    if not INT64_MIN <= number <= INT64_MAX:
+        raise RedisError(NOT_INTEGER)
+    return number
+
+
+def format_reply(reply) -> str:
+    """A reply as redis-cli prints it when stdout is not a terminal (raw mode)."""
+    if reply is None:
+        return ""
+    if isinstance(reply, list):
+        return "\n".join(format_reply(item) for item in reply)
+    return str(reply)
+
+
+class Keyspace:
+    """One logical Redis database, with lazily expired keys.
+
+    Usage:
+        exit_code, output = keyspace.run('SET suspect "Valdez"')
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._data = {}     # key -> str | list | dict (hash) | _Set
+        self._expires = {}  # key -> unix time the key expires
+        self.commands = {
+            # name: (arity as in the Redis command table: n exact, -n at least n, command included)
+            "PING": (-1, self.ping), "INFO": (-1, self.info), "DBSIZE": (1, self.dbsize),
+            "FLUSHDB": (-1, self.flushdb), "FLUSHALL": (-1, self.flushdb),
+            "DEL": (-2, self.delete), "EXISTS": (-2, self.exists), "TYPE": (2, self.type),
+            "KEYS": (2, self.keys), "EXPIRE": (-3, self.expire), "TTL": (2, self.ttl),
+            "SET": (-3, self.set), "GET": (2, self.get), "SETEX": (4, self.setex),
+            "MSET": (-3, self.mset), "MGET": (-2, self.mget), "INCR": (2, self.incr), "DECR": (2, self.decr),
+            "APPEND": (3, self.append), "STRLEN": (2, self.strlen),
+            "LPUSH": (-3, self.lpush), "RPUSH": (-3, self.rpush), "LPOP": (-2, self.lpop), "RPOP": (-2, self.rpop),
+            "LRANGE": (4, self.lrange), "LLEN": (2, self.llen), "LINDEX": (3, self.lindex),
+            "SADD": (-3, self.sadd), "SREM": (-3, self.srem), "SMEMBERS": (2, self.smembers),
+            "SINTER": (-2, self.sinter), "SUNION": (-2, self.sunion), "SDIFF": (-2, self.sdiff),
+            "SCARD": (2, self.scard), "SISMEMBER": (3, self.sismember),
+            "HSET": (-4, self.hset), "HMSET": (-4, self.hmset), "HGET": (3, self.hget), "HDEL": (-3, self.hdel),
+            "HGETALL": (2, self.hgetall), "HMGET": (-3, self.hmget), "HKEYS": (2, self.hkeys),
+            "HVALS": (2, self.hvals), "HEXISTS": (3, self.hexists),
+        }
+
+    def run(self, line: str) -> tuple:
+        """Run one command line. Returns (exit_code, output) like `redis-cli <args>`."""
+        try:
+            args = split_args(line)
+        except ValueError as e:
+            return 1, str(e)
+        if not args:
+            return 0, ""
+        try:
+            return 0, format_reply(self.execute(args))
+        except RedisError as e:
+            return 1, str(e)
+
+    def execute(self, args: list):
+        """Run a command given as arguments and return its reply.
+
+        Raises:
+            RedisError: For error replies.
+        """
+        name = args[0].upper()
+        if name not in self.commands:
+            started = " ".join(f"'{a}'" for a in args[1:])
+            raise RedisError(f"ERR unknown command '{args[0]}', with args beginning with: {started}")
+        arity, handler = self.commands[name]
+        if (arity > 0 and len(args) != arity) or (arity < 0 and len(args) < -arity):
+            raise RedisError(f"ERR wrong number of arguments for '{name.lower()}' command")
+        return handler(*args[1:])
+
+    # --- Keys ---
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and self.clock() >= expires:
+            self._data.pop(key, None)
+            del self._expires[key]
+        return key in self._data
+
+    def _lookup(self, key: str, kind: type):
+        """The key's value if it exists, checking its type; None if missing."""
+        if not self._alive(key):
+            return None
+        value = self._data[key]
+        if type(value) is not kind:
+            raise RedisError(WRONGTYPE)
+        return value
+
+    def _store(self, key: str, value, keep_ttl: bool = False):
+        self._data[key] = value
+        if not keep_ttl:
+            self._expires.pop(key, None)
+
+    def _remove(self, key: str):
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+
+    def _drop_if_empty(self, key: str, value):
+        if not value:
+            self._remove(key)
+
+    def flushdb(self, *mode):
+        if mode and (len(mode) > 1 or mode[0].upper() not in ("ASYNC", "SYNC")):
+            raise RedisError(SYNTAX_ERROR)
+        self._data.clear()
+        self._expires.clear()
+        return "OK"
+
+    def dbsize(self):
+        return sum(self._alive(key) for key in list(self._data))
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def exists(self, *keys):
+        return sum(self._alive(key) for key in keys)
+
+    def type(self, key):
+        if not self._alive(key):
+            return "none"
+        return {str: "string", list: "list", dict: "hash", _Set: "set"}[type(self._data[key])]
+
+    def keys(self, pattern):
+        regex = _glob_regex(pattern)
+        return [key for key in list(self._data) if self._alive(key) and regex.fullmatch(key)]
+
+    def expire(self, key, seconds, *options):
+        seconds = _int(seconds)
+        flags = set()
+        for option in options:
+            if option.upper() not in ("NX", "XX", "GT", "LT"):
+                raise RedisError(f"ERR Unsupported option {option}")
+            flags.add(option.upper())
+        if ("NX" in flags and len(flags) > 1) or {"GT", "LT"} <= flags:
+            raise RedisError("ERR NX and XX, GT or LT options at the same time are not compatible")
+        if not self._alive(key):
+            return 0
+        current = self._expires.get(key)
+        new = self.clock() + seconds
+        if ("NX" in flags and current is not None) or ("XX" in flags and current is None) \
+                or ("GT" in flags and (current is None or new <= current)) \
+                or ("LT" in flags and current is not None and new >= current):
+            return 0
+        if seconds <= 0:
+            self._remove(key)
+        else:
+            self._expires[key] = new
+        return 1
+
+    def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires = self._expires.get(key)
+        if expires is None:
+            return -1
+        return int((expires - self.clock()) + 0.5)
+
+    def ping(self, *message):
+        if len(message) > 1:
+            raise RedisError("ERR wrong number of arguments for 'ping' command")
+        return message[0] if message else "PONG"
+
+    def info(self, *sections):
+        wanted = {s.lower() for s in sections} or {"default"}
+        expiring = sum(1 for key in list(self._expires) if self._alive(key))
+        keys = self.dbsize()
+        blocks = {
+            "server": ["# Server", f"redis_version:{REDIS_VERSION}", "redis_mode:standalone", "os:Linux",
+                       "arch_bits:64", "tcp_port:6379"],
+            "clients": ["# Clients", "connected_clients:1", "blocked_clients:0"],
+            "memory": ["# Memory", "used_memory_human:1.02M", "maxmemory_policy:noeviction"],
+            "keyspace": ["# Keyspace"] + ([f"db0:keys={keys},expires={expiring},avg_ttl=0"] if keys else []),
+        }
+        everything = wanted & {"default", "all", "everything"}
+        shown = [lines for name, lines in blocks.items() if everything or name in wanted]
+        return "\r\n\r\n".join("\r\n".join(lines) for lines in shown) + ("\r\n" if shown else "")
+
+    # --- Strings ---
+
+    def get(self, key):
+        return self._lookup(key, str)
+
+    def set(self, key, value, *options):
+        expires, keep_ttl, condition, want_old = None, False, None, False
+        options = list(options)
+        while options:
+            option = options.pop(0).upper()
+            if option in ("EX", "PX") and options and expires is None and not keep_ttl:
+                amount = _int(options.pop(0))
+                if amount <= 0:
+                    raise RedisError("ERR invalid expire time in 'set' command")
+                expires = self.clock() + (amount if option == "EX" else amount / 1000)
+            elif option in ("NX", "XX") and condition is None:
+                condition = option
+            elif option == "KEEPTTL" and expires is None:
+                keep_ttl = True
+            elif option == "GET":
+                want_old = True
+            else:
+                raise RedisError(SYNTAX_ERROR)
+        old = self._lookup(key, str) if want_old else None
+        exists = self._alive(key)
+        if (condition == "NX" and exists) or (condition == "XX" and not exists):
+            return old if want_old else None
+        self._store(key, value, keep_ttl=keep_ttl)
+        if expires is not None:
+            self._expires[key] = expires
+        return old if want_old else "OK"
+
+    def setex(self, key, seconds, value):
+        seconds = _int(seconds)
+        if seconds <= 0:
+            raise RedisError("ERR invalid expire time in 'setex' command")
+        self._store(key, value)
+        self._expires[key] = self.clock() + seconds
+        return "OK"
+
+    def mset(self, *pairs):
+        if len(pairs) % 2:
+            raise RedisError("ERR wrong number of arguments for 'mset' command")
+        for key, value in zip(pairs[::2], pairs[1::2]):
+            self._store(key, value)
+        return "OK"
+
+    def mget(self, *keys):
+        values = []
+        for key in keys:
+            value = self._data.get(key) if self._alive(key) else None
+            values.append(value if isinstance(value, str) else None)
+        return values
+
+    def _incrby(self, key, amount):
+        current = self._lookup(key, str)
+        number = 0 if current is None else _int(current)
+        if not INT64_MIN <= number + amount <= INT64_MAX:
+            raise RedisError("ERR increment or decrement would overflow")
+        self._store(key, str(number + amount), keep_ttl=True)
+        return number + amount
+
+    def incr(self, key):
+        return self._incrby(key, 1)
+
+    def decr(self, key):
+        return self._incrby(key, -1)
+
+    def append(self, key, value):
+        current = self._lookup(key, str) or ""
+        self._store(key, current + value, keep_ttl=True)
+        return len((current + value).encode("utf-8"))
+
+    def strlen(self, key):
+        return len((self._lookup(key, str) or "").encode("utf-8"))
+
+    # --- Lists ---
+
+    def _push(self, key, values, left):
+        items = self._lookup(key, list)
+        if items is None:
+            items = []
+            self._store(key, items)
+        for value in values:
+            if left:
+                items.insert(0, value)
+            else:
+                items.append(value)
+        return len(items)
+
+    def lpush(self, key, *values):
+        return self._push(key, values, left=True)
+
+    def rpush(self, key, *values):
+        return self._push(key, values, left=False)
+
+    def _pop(self, key, count, left):
+        if len(count) > 1:
+            raise RedisError(SYNTAX_ERROR)
+        n = _int(count[0]) if count else None
+        if n is not None and n < 0:
+            raise RedisError("ERR value is out of range, must be positive")
+        items = self._lookup(key, list)
+        if items is None:
+            return None
+        taken = min(len(items), 1 if n is None else n)
+        if left:
+            popped = items[:taken]
+            del items[:taken]
+        else:
+            popped = items[::-1][:taken]
+            del items[len(items) - taken:]
+        self._drop_if_empty(key, items)
+        return popped[0] if n is None else popped
+
+    def lpop(self, key, *count):
+        return self._pop(key, count, left=True)
+
+    def rpop(self, key, *count):
+        return self._pop(key, count, left=False)
+
+    def lrange(self, key, start, stop):
+        start, stop = _int(start), _int(stop)
+        items = self._lookup(key, list) or []
+        length = len(items)
+        start = max(start + length if start < 0 else start, 0)
+        stop = stop + length if stop < 0 else min(stop, length - 1)
+        return items[start:stop + 1] if start <= stop else []
+
+    def llen(self, key):
+        return len(self._lookup(key, list) or [])
+
+    def lindex(self, key, index):
+        index = _int(index)
+        items = self._lookup(key, list) or []
+        if index < 0:
+            index += len(items)
+        return items[index] if 0 <= index < len(items) else None
+
+    # --- Sets ---
+
+    @staticmethod
+    def _members(members):
+        """Reply order: small all-integer sets are sorted (intset), others keep insertion order."""
+        members = list(members)
+        if all(re.fullmatch(r"-?(0|[1-9][0-9]*)", m) for m in members):
+            return sorted(members, key=int)
+        return members
+
+    def sadd(self, key, *members):
+        current = self._lookup(key, _Set)
+        if current is None:
+            current = _Set()
+            self._store(key, current)
+        added = 0
+        for member in members:
+            if member not in current:
+                current[member] = None
+                added += 1
+        return added
+
+    def srem(self, key, *members):
+        current = self._lookup(key, _Set)
+        if current is None:
+            return 0
+        removed = sum(current.pop(member, 0) is None for member in members)
+        self._drop_if_empty(key, current)
+        return removed
+
+    def smembers(self, key):
+        return self._members(self._lookup(key, _Set) or ())
+
+    def scard(self, key):
+        return len(self._lookup(key, _Set) or ())
+
+    def sismember(self, key, member):
+        return int(member in (self._lookup(key, _Set) or ()))
+
+    def _sets(self, keys):
+        return [self._lookup(key, _Set) or _Set() for key in keys]
+
+    def sinter(self, *keys):
+        sets = self._sets(keys)
+        smallest = min(sets, key=len)
+        return self._members(m for m in smallest if all(m in s for s in sets))
+
+    def sunion(self, *keys):
+        union = _Set()
+        for current in self._sets(keys):
+            union.update(current)
+        return self._members(union)
+
+    def sdiff(self, *keys):
+        first, *rest = self._sets(keys)
+        return self._members(m for m in first if not any(m in s for s in rest))
+
+    # --- Hashes ---
+
+    def hset(self, key, *pairs):
+        if len(pairs) % 2:
+            raise RedisError("ERR wrong number of arguments for 'hset' command")
+        fields = self._lookup(key, dict)
+        if fields is None:
+            fields = {}
+            self._store(key, fields)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in fields
+            fields[field] = value
+        return added
+
+    def hmset(self, key, *pairs):
+        if len(pairs) % 2:
+            raise RedisError("ERR wrong number of arguments for 'hmset' command")
+        self.hset(key, *pairs)
+        return "OK"
+
+    def hget(self, key, field):
+        return (self._lookup(key, dict) or {}).get(field)
+
+    def hdel(self, key, *fields):
+        current = self._lookup(key, dict)
+        if current is None:
+            return 0
+        removed = sum(current.pop(field, None) is not None for field in fields)
+        self._drop_if_empty(key, current)
+        return removed
+
+    def hgetall(self, key):
+        return [item for pair in (self._lookup(key, dict) or {}).items() for item in pair]
+
+    def hmget(self, key, *fields):
+        current = self._lookup(key, dict) or {}
+        return [current.get(field) for field in fields]
+
+    def hkeys(self, key):
+        return list(self._lookup(key, dict) or {})
+
+    def hvals(self, key):
+        return list((self._lookup(key, dict) or {}).values())
+
+    def hexists(self, key, field):
+        return int(field in (self._lookup(key, dict) or {}))
@@ -0,0 +1,152 @@
+# ABOUTME: Admission control for grading: per-topic concurrency limits and bounded wait queues.
+# ABOUTME: Requests that would queue too long are rejected fast so the API can answer 503 + Retry-After.
+
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+
+# Max grades running at once per topic. LLM is bound by the upstream API,
+# bash/git by CPU and process spawns; redis/sql queries are cheap.
+TOPIC_CONCURRENCY = {
+    "redis": 4,
+    "sql": 4,
+    "git": 2,
+    "docker": 4,
+    "llm": 2,
+    "bash": 2,
+}
+DEFAULT_CONCURRENCY = 2
+
+# Max requests waiting per topic before new ones are rejected outright
+QUEUE_SIZE = int(os.environ.get("GRADER_QUEUE_SIZE", "16"))
+# Max seconds a request may wait for a slot before it is rejected
+QUEUE_TIMEOUT = float(os.environ.get("GRADER_QUEUE_TIMEOUT", "5"))
+
+# Topics outside TOPIC_CONCURRENCY share one lane so arbitrary request
+# strings cannot grow the lane table
+OTHER_LANE = "_other"
+
+
+class SchedulerBusy(Exception):
+    """Raised when a grade cannot be admitted; carries a Retry-After hint in seconds."""
+
+    def __init__(self, topic: str, reason: str, retry_after: int):
+        super().__init__(f"Grader for '{topic}' is busy ({reason})")
+        self.topic = topic
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Lane:
+    """Concurrency limit, wait queue and counters for one topic."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.avg_service_seconds = 1.0  # EWMA of grade duration
+
+    def record_service_time(self, seconds: float):
+        self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * seconds
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up for a newly arriving request."""
+        backlog = (self.waiting + 1) / self.limit
+        return max(1, math.ceil(backlog * self.avg_service_seconds))
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "queued": self.waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_service_seconds": round(self.avg_service_seconds, 3),
+        }
+
+
+class _Slot:
+    """A grade's place in a lane, held until the grade ends or gives it back."""
+
+    def __init__(self, lane: _Lane):
+        self._lane = lane
+        self._started = time.monotonic()
+        self.released = False
+
+    def release(self):
+        """Give the slot back early, e.g. before waiting on the LLM provider (idempotent)."""
+        if self.released:
+            return
+        self.released = True
+        self._lane.running -= 1
+        self._lane.record_service_time(time.monotonic() - self._started)
+        self._lane.semaphore.release()
+
+
+class GradingScheduler:
+    """Per-topic admission control in front of the grader backend.
+
+    Usage:
+        async with scheduler.slot("llm") as slot:
+            result = await container_manager.execute_code_in_container(..., release_slot=slot.release)
+    """
+
+    def __init__(self, concurrency: dict = None, queue_size: int = QUEUE_SIZE,
+                 queue_timeout: float = QUEUE_TIMEOUT, default_concurrency: int = DEFAULT_CONCURRENCY):
+        concurrency = TOPIC_CONCURRENCY if concurrency is None else concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._lanes = {topic: _Lane(limit) for topic, limit in concurrency.items()}
+        self._lanes[OTHER_LANE] = _Lane(default_concurrency)
+
+    def _lane(self, topic: str) -> _Lane:
+        return self._lanes.get(topic, self._lanes[OTHER_LANE])
+
+    @asynccontextmanager
+    async def slot(self, topic: str):
+        """Wait (bounded) for a grading slot on `topic`; yields the _Slot.
+
+        Raises:
+            SchedulerBusy: If the wait queue is full or the queue deadline passes.
+        """
+        lane = self._lane(topic)
+
+        if not lane.semaphore.locked():
+            # Free slot: take it without queueing
+            await lane.semaphore.acquire()
+        else:
+            if lane.waiting >= self.queue_size:
+                lane.rejected_full += 1
+                raise SchedulerBusy(topic, "queue full", lane.retry_after())
+
+            lane.waiting += 1
+            try:
+                await asyncio.wait_for(lane.semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                lane.rejected_timeout += 1
+                raise SchedulerBusy(topic, "queue timeout", lane.retry_after())
+            finally:
+                lane.waiting -= 1
+
+        lane.running += 1
+        lane.admitted += 1
+        slot = _Slot(lane)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def metrics(self) -> dict:
+        """Queue depth and counters per topic lane."""
+        return {topic: lane.snapshot() for topic, lane in self._lanes.items()}
+
+
+# Single scheduler shared by all requests
+scheduler = GradingScheduler()
@@ -5,6 +5,7 @@ ABOUTME: Used for progressive disclosure: enable/disable tutorials for all visit
 
 import sqlite3
 import os
+import threading
 from pathlib import Path
 
 DB_PATH = os.environ.get("SETTINGS_DB", str(Path(__file__).resolve().parent.parent / "data" / "settings.db"))
@@ -18,64 +19,99 @@ def _get_admin_password():
 ALL_TUTORIALS = ["redis", "sql", "git", "docker", "llm", "bash"]
 
 
+# One connection shared by all requests, plus the visibility table cached in
+# memory. Page views only read the cache; writes go through to SQLite and
+# invalidate it. Assumes a single app process owns the settings DB.
+_lock = threading.Lock()
+_conn = None
+_conn_path = None
+_states = None  # {topic: enabled}, None when it must be reloaded
+
+
+def init_db():
+    """Open the shared connection and create the schema. Called once at startup."""
+    global _conn, _conn_path, _states
+    with _lock:
+        if _conn is not None and _conn_path == DB_PATH:
+            return
+        if _conn is not None:
+            _conn.close()
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tutorial_visibility (
+                topic TEXT PRIMARY KEY,
+                enabled INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+        _ensure_all_topics(conn)
+        _conn, _conn_path, _states = conn, DB_PATH, None
+
+
+def close_db():
+    """Close the shared connection (app shutdown)."""
+    global _conn, _conn_path, _states
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+        _conn, _conn_path, _states = None, None, None
+
+
 def _get_db():
-    """Get a database connection, creating tables if needed."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS tutorial_visibility (
-            topic TEXT PRIMARY KEY,
-            enabled INTEGER NOT NULL DEFAULT 1
-        )
-    """)
-    conn.commit()
-    return conn
+    """Get the shared connection, opening it on first use or if DB_PATH changed."""
+    if _conn is None or _conn_path != DB_PATH:
+        init_db()
+    return _conn
 
 
 def _ensure_all_topics(conn):
     """Ensure all known tutorials have a row (default: enabled)."""
-    existing = {row[0] for row in conn.execute("SELECT topic FROM tutorial_visibility").fetchall()}
-    for topic in ALL_TUTORIALS:
-        if topic not in existing:
-            conn.execute("INSERT INTO tutorial_visibility (topic, enabled) VALUES (?, 1)", (topic,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO tutorial_visibility (topic, enabled) VALUES (?, 1)",
+        [(topic,) for topic in ALL_TUTORIALS],
+    )
     conn.commit()
 
 
+def _cached_states() -> dict[str, bool]:
+    """The visibility table, read from SQLite only after startup or a write."""
+    global _states
+    conn = _get_db()
+    states = _states
+    if states is None:
+        with _lock:
+            rows = conn.execute("SELECT topic, enabled FROM tutorial_visibility ORDER BY topic").fetchall()
+            states = _states = {row[0]: bool(row[1]) for row in rows}
+    return states
+
+
 def get_enabled_tutorials() -> list[str]:
     """Return list of enabled tutorial topic names."""
-    conn = _get_db()
-    _ensure_all_topics(conn)
-    rows = conn.execute("SELECT topic FROM tutorial_visibility WHERE enabled = 1 ORDER BY topic").fetchall()
-    conn.close()
-    return [row[0] for row in rows]
+    return [topic for topic, enabled in _cached_states().items() if enabled]
 
 
 def get_all_tutorial_states() -> dict[str, bool]:
     """Return dict of {topic: enabled} for all tutorials."""
-    conn = _get_db()
-    _ensure_all_topics(conn)
-    rows = conn.execute("SELECT topic, enabled FROM tutorial_visibility ORDER BY topic").fetchall()
-    conn.close()
-    return {row[0]: bool(row[1]) for row in rows}
+    return dict(_cached_states())
 
 
 def set_tutorial_enabled(topic: str, enabled: bool):
     """Enable or disable a tutorial."""
-    conn = _get_db()
-    _ensure_all_topics(conn)
-    conn.execute("UPDATE tutorial_visibility SET enabled = ? WHERE topic = ?", (1 if enabled else 0, topic))
-    conn.commit()
-    conn.close()
+    update_tutorial_states({topic: enabled})
 
 
 def update_tutorial_states(states: dict[str, bool]):
     """Bulk update tutorial visibility."""
+    global _states
     conn = _get_db()
-    _ensure_all_topics(conn)
-    for topic, enabled in states.items():
-        conn.execute("UPDATE tutorial_visibility SET enabled = ? WHERE topic = ?", (1 if enabled else 0, topic))
-    conn.commit()
-    conn.close()
+    with _lock:
+        with conn:
+            conn.executemany(
+                "UPDATE tutorial_visibility SET enabled = ? WHERE topic = ?",
+                [(1 if enabled else 0, topic) for topic, enabled in states.items()],
+            )
+        _states = None
 
 
 def check_password(password: str) -> bool:
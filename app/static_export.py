@@ -0,0 +1,123 @@
+# ABOUTME: Renders every lesson and menu page (topic x lesson x language x style) to a directory.
+# ABOUTME: Output plus fingerprinted assets can be served by nginx/a CDN; only /api/* stays dynamic.
+
+import argparse
+import logging
+import shutil
+import sys
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+
+try:
+    from app import settings as app_settings
+    from app.assets import AssetManifest
+    from app.catalog import DEFAULT_STYLE, LessonCatalog
+except ImportError:
+    import settings as app_settings
+    from assets import AssetManifest
+    from catalog import DEFAULT_STYLE, LessonCatalog
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+class StaticExporter:
+    """Writes the site as files, laid out so query-string variants map to paths:
+
+        index.html, promo/index.html
+        tutorial/<topic>/<lang>/<style>.html           menu  (/tutorial/<topic>?lang=&style=)
+        tutorial/<topic>/<lesson>/<lang>/<style>.html  lesson
+        tutorial/.../<lang>/index.html                 same page in the default style
+        static/<name>.<hash><ext>[.gz|.br]             fingerprinted assets (+ plain names)
+    """
+
+    def __init__(self, base_dir: Path, out_dir: Path, topics: list[str] = None):
+        self.base_dir = Path(base_dir)
+        self.out_dir = Path(out_dir)
+        self.catalog = LessonCatalog(self.base_dir)
+        self.catalog.raise_for_problems()
+        self.assets = AssetManifest(self.base_dir / "static")
+        self.templates = Jinja2Templates(directory=str(self.base_dir / "templates"))
+        self.templates.env.globals["static_url"] = self.assets.static_url
+        self.topics = [t for t in (self.catalog.topics if topics is None else topics) if self.catalog.has_topic(t)]
+        self.pages_written = 0
+
+    def _write(self, relative: str, data):
+        path = self.out_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path.write_bytes(data)
+
+    def _render(self, relative: str, template_name: str, context: dict):
+        self._write(relative, self.templates.get_template(template_name).render(context))
+        self.pages_written += 1
+
+    def _render_variants(self, prefix: str, template_name: str, context_for):
+        """Render one page per (language, style), plus <lang>/index.html in the default style."""
+        for lang in self.catalog.languages:
+            styles = [s["name"] for s in context_for(lang, DEFAULT_STYLE)["available_styles"]]
+            for style in styles:
+                self._render(f"{prefix}/{lang}/{style}.html", template_name, context_for(lang, style))
+            self._render(f"{prefix}/{lang}/index.html", template_name, context_for(lang, DEFAULT_STYLE))
+
+    def export_pages(self):
+        self._render("index.html", "index.html", {"enabled_tutorials": self.topics})
+        self._render("promo/index.html", "promo.html", {})
+        for topic in self.topics:
+            self._render_variants(
+                f"tutorial/{topic}", "tutorial_menu.html",
+                lambda lang, style: self.catalog.menu(topic, lang=lang, style=style),
+            )
+            for lesson in self.catalog.topics[topic]:
+                self._render_variants(
+                    f"tutorial/{topic}/{lesson}", "tutorial_template.html",
+                    lambda lang, style: self.catalog.lesson_page(topic, lesson, lang=lang, style=style),
+                )
+
+    def export_assets(self):
+        for asset in self.assets.assets.values():
+            (self.out_dir / "static" / asset.name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(asset.path, self.out_dir / "static" / asset.name)
+            shutil.copyfile(asset.path, self.out_dir / "static" / asset.hashed_name)
+            suffixes = {"gzip": ".gz", "br": ".br"}
+            for encoding, body in asset.variants.items():
+                self._write(f"static/{asset.hashed_name}{suffixes[encoding]}", body)
+
+    def _clear_out_dir(self):
+        """Remove a previous export; refuse to delete anything that doesn't look like one."""
+        if not self.out_dir.exists() or not any(self.out_dir.iterdir()):
+            return
+        out = self.out_dir.resolve()
+        previous_export = (out / "index.html").is_file() and (out / "tutorial").is_dir()
+        if out == self.base_dir.resolve() or out in self.base_dir.resolve().parents or not previous_export:
+            raise ValueError(f"Refusing to replace {self.out_dir}: not empty and not a previous export")
+        shutil.rmtree(out)
+
+    def export(self) -> int:
+        """Write all pages and assets. Returns the number of pages rendered."""
+        self._clear_out_dir()
+        self.export_assets()
+        self.export_pages()
+        return self.pages_written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render all lesson and menu pages to static files.")
+    parser.add_argument("--out", default="dist", help="output directory (replaced if it exists)")
+    parser.add_argument("--all-topics", action="store_true",
+                        help="include tutorials disabled on the settings page")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    topics = None if args.all_topics else app_settings.get_enabled_tutorials()
+    exporter = StaticExporter(BASE_DIR, Path(args.out), topics)
+    count = exporter.export()
+    logger.info(f"Exported {count} pages for {', '.join(exporter.topics)} to {args.out}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
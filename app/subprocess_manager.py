@@ -1,22 +1,42 @@
 # ABOUTME: Subprocess-based grader for fly.io deployment (no Docker needed).
-# ABOUTME: Runs tools directly (redis-cli, sqlite3, git, etc.) via subprocess.run().
+# ABOUTME: Runs tools directly (redis-cli, sqlite3, git, etc.) as asyncio subprocesses.
 # ABOUTME: Includes input sanitization to prevent command injection and env var leaks.
 
+import asyncio
 import base64
+import functools
+import importlib.util
+import math
 import re
+import shlex
+import signal
 import subprocess
 import os
 import shutil
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 try:
     from app import grader_schemas as schemas
     from app.grader import evaluate
+    from app.tool_pool import ToolPool
+    from app.llm_client import LLMClient
+    from app import validators
+    from app.redis_emulator import Keyspace, split_args
+    from app.scheduler import QUEUE_TIMEOUT, SchedulerBusy
 except ImportError:
     import grader_schemas as schemas
     from grader import evaluate
+    from tool_pool import ToolPool
+    from llm_client import LLMClient
+    import validators
+    from redis_emulator import Keyspace, split_args
+    from scheduler import QUEUE_TIMEOUT, SchedulerBusy
 
 TIMEOUT_SECONDS = 10
+# Seconds a scheduler-admitted grade may wait for an idle sandbox: the
+# topic lanes together admit more grades than there are sandboxes
+LEASE_TIMEOUT = QUEUE_TIMEOUT
 
 # --- Input Sanitization ---
 
@@ -100,6 +120,9 @@ def sanitize_input(language: str, code: str) -> tuple[bool, str]:
         # Allow curl for LLM topic only
         if pattern == r'\bcurl\b' and language == 'llm':
             continue
+        # `docker ps -a` runs in the mock engine, never a shell
+        if pattern == r'\bps\b\s' and language == 'docker':
+            continue
         # Allow certain patterns for bash topic
         if language == 'bash' and pattern in BASH_ALLOWED_PATTERNS:
             continue
@@ -139,75 +162,221 @@ def sanitize_input(language: str, code: str) -> tuple[bool, str]:
 # Base directory for grader data files
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Sandbox pool: each in-flight grade gets its own workspace
+SANDBOX_ROOT = os.environ.get("GRADER_SANDBOX_ROOT", "/tmp/grader-sandboxes")
+SANDBOX_COUNT = int(os.environ.get("GRADER_SANDBOXES", "4"))
+REDIS_DATABASES = 16  # redis-server default
+# One logical DB per sandbox; the last DB is kept for the rate limiter (ratelimit.DEFAULT_REDIS_URL)
+SANDBOX_DATABASES = REDIS_DATABASES - 1
+# "server": redis-cli against a local redis-server | "embedded": in-process emulator, no server
+REDIS_ENGINE = os.environ.get("GRADER_REDIS", "server")
+
+MOCK_DOCKER_SCRIPT = BASE_DIR / "docker" / "docker" / "mock_docker.py"
+_mock_docker = None
+
+
+def load_mock_docker():
+    """The docker tutorial's simulated engine (docker/docker/mock_docker.py), imported once."""
+    global _mock_docker
+    if _mock_docker is None:
+        spec = importlib.util.spec_from_file_location("mock_docker", MOCK_DOCKER_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _mock_docker = module
+    return _mock_docker
+
+# Paths that lesson JSON (written for the Docker images) refers to.
+# In subprocess mode they are rewritten to the leased sandbox's own files.
+LESSON_INPUT_PATH = "/tmp/user_input"
+LESSON_MODE_PATH = "/tmp/llm_mode"
+
+
+class Sandbox:
+    """One isolated grading workspace: git repo, DB copy, redis DB, bash dir."""
+
+    def __init__(self, slot: int, root: str = SANDBOX_ROOT):
+        self.slot = slot
+        self.root = os.path.join(root, f"slot-{slot}")
+        self.git_repo_dir = os.path.join(self.root, "git-repo")
+        self.sql_db_path = os.path.join(self.root, "company.db")
+        self.bash_workspace = os.path.join(self.root, "bash-workspace")
+        self.bash_script_path = os.path.join(self.root, "bash-script.sh")
+        self.input_path = os.path.join(self.root, "user-input")
+        self.llm_mode_path = os.path.join(self.root, "llm_mode")
+        self.redis_db = slot
+        # Keyspace for the embedded redis engine
+        self.redis = Keyspace()
+        # The text the user submitted in this grade, for validators to read from memory
+        self.user_input = None
+        # Simulated docker engine; its containers and images last for the grade
+        self.docker = None
+
+    def localize(self, cmd: str) -> str:
+        """Point lesson-level /tmp paths at this sandbox's files."""
+        return cmd.replace(LESSON_INPUT_PATH, self.input_path).replace(LESSON_MODE_PATH, self.llm_mode_path)
+
+    def env(self) -> dict:
+        """Extra environment for tool scripts that read the sandbox files."""
+        return {"LLM_INPUT_FILE": self.input_path, "LLM_MODE_FILE": self.llm_mode_path}
+
+
+class SandboxPool:
+    """Hands out sandboxes to concurrent grades via checkout/checkin.
+
+    Sandboxes are reset before they go back to the idle queue, so a lease
+    always starts from a clean workspace. With a `timeout`, a grade that
+    cannot get a sandbox in time is rejected like a full scheduler queue.
+    """
+
+    def __init__(self, sandboxes: list, reset, timeout: float = None):
+        self._sandboxes = sandboxes
+        self._reset = reset
+        self._timeout = timeout
+        self._idle = asyncio.Queue()
+        for sandbox in sandboxes:
+            self._idle.put_nowait(sandbox)
+
+    def __len__(self):
+        return len(self._sandboxes)
+
+    @property
+    def available(self) -> int:
+        return self._idle.qsize()
+
+    async def checkout(self, language: str = None) -> Sandbox:
+        """Wait for an idle sandbox and take it.
+
+        Raises:
+            SchedulerBusy: If no sandbox frees up within the pool's timeout
+        """
+        if self._timeout is None:
+            return await self._idle.get()
+        try:
+            return await asyncio.wait_for(self._idle.get(), timeout=self._timeout)
+        except asyncio.TimeoutError:
+            raise SchedulerBusy(language or "sandbox", "no idle sandbox", max(1, math.ceil(self._timeout)))
+
+    async def checkin(self, sandbox: Sandbox, language: str):
+        """Reset the sandbox state touched by `language` and make it idle again."""
+        try:
+            await self._reset(language, sandbox)
+        finally:
+            self._idle.put_nowait(sandbox)
+
+    @asynccontextmanager
+    async def lease(self, language: str):
+        """Context manager: checkout on enter, reset + checkin on exit."""
+        sandbox = await self.checkout(language)
+        try:
+            yield sandbox
+        finally:
+            await asyncio.shield(self.checkin(sandbox, language))
+
 
 class SubprocessManager:
     """Executes grading commands via subprocess instead of Docker containers.
 
     Designed for fly.io deployment where Docker-in-Docker is not available.
     Tools (redis-cli, sqlite3, git, etc.) are installed directly in the image.
+    Every grade runs in a leased Sandbox so concurrent requests never share state.
     """
 
-    def __init__(self):
+    def __init__(self, sandbox_count: int = SANDBOX_COUNT, sandbox_root: str = SANDBOX_ROOT,
+                 redis_engine: str = REDIS_ENGINE):
         self._redis_process = None
-        self._git_repo_dir = "/tmp/grader-git-repo"
-        self._sql_db_path = "/tmp/grader-company.db"
         self._sql_db_source = str(BASE_DIR / "docker" / "sql" / "company.db")
-        self._tmp_input = "/tmp/grader-user-input"
-        self._bash_workspace = "/tmp/grader-bash-workspace"
+        self.redis_engine = redis_engine
+        # redis-server has one logical DB per sandbox; embedded keyspaces have no such limit
+        if redis_engine != "embedded":
+            sandbox_count = min(sandbox_count, SANDBOX_DATABASES)
+        self._sandbox_count = max(1, sandbox_count)
+        self._sandbox_root = sandbox_root
+        self.sandboxes = None
+        # Warm Python workers for the LLM tools instead of one interpreter per call
+        self.tools = ToolPool(env={"EMBEDDINGS_FILE": str(BASE_DIR / "docker" / "llm" / "embeddings.npy")})
+        # Provider calls share one pooled HTTP client; created on first use, after load_dotenv
+        self._llm = None
+
+    @property
+    def llm(self) -> LLMClient:
+        if self._llm is None:
+            self._llm = LLMClient.from_env()
+        return self._llm
 
     async def startup(self):
-        """Start background services (e.g., redis-server)."""
+        """Start background services (e.g., redis-server) and build the sandbox pool."""
         print("Subprocess manager starting up...")
 
         # Start redis-server in background
-        try:
-            self._redis_process = subprocess.Popen(
-                ["redis-server", "--daemonize", "no", "--loglevel", "warning"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-            print("  Redis server started (PID: {})".format(self._redis_process.pid))
-        except FileNotFoundError:
-            print("  Warning: redis-server not found. Redis lessons will not work.")
-
-        # Initialize git repo
-        self._init_git_repo()
-
-        # Copy SQL database
-        self._reset_sql_db()
-
-        # Initialize bash workspace
-        self._init_bash_workspace()
+        if self.redis_engine == "embedded":
+            print("  Redis lessons use the embedded emulator")
+        else:
+            try:
+                self._redis_process = subprocess.Popen(
+                    ["redis-server", "--daemonize", "no", "--loglevel", "warning",
+                     "--databases", str(REDIS_DATABASES)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+                print("  Redis server started (PID: {})".format(self._redis_process.pid))
+            except FileNotFoundError:
+                print("  Warning: redis-server not found. Redis lessons will not work.")
+
+        # Prepare one workspace per sandbox slot
+        sandboxes = [Sandbox(slot, self._sandbox_root) for slot in range(self._sandbox_count)]
+        for sandbox in sandboxes:
+            await self._init_sandbox(sandbox)
+        self.sandboxes = SandboxPool(sandboxes, self._reset_state, LEASE_TIMEOUT)
+        print(f"  {len(sandboxes)} grading sandboxes ready in {self._sandbox_root}")
+
+        self.tools.start()
+        print(f"  {self.tools.workers} LLM tool workers warming up")
+        validators.warm_up()
 
         print("Subprocess manager ready.")
 
     async def shutdown(self):
         """Stop background services."""
         print("Subprocess manager shutting down...")
+        self.tools.shutdown()
+        if self._llm is not None:
+            await self._llm.aclose()
+            self._llm = None
         if self._redis_process:
             self._redis_process.terminate()
             self._redis_process.wait(timeout=5)
             print("  Redis server stopped.")
 
-    def _init_git_repo(self):
+    async def _init_sandbox(self, sandbox: Sandbox):
+        """Create a sandbox's directory and all per-topic state."""
+        await asyncio.to_thread(os.makedirs, sandbox.root, exist_ok=True)
+        await self._init_git_repo(sandbox.git_repo_dir)
+        await asyncio.to_thread(self._reset_sql_db, sandbox.sql_db_path)
+        await asyncio.to_thread(self._init_bash_workspace, sandbox.bash_workspace)
+        await asyncio.to_thread(self._remove_files, sandbox.input_path, sandbox.llm_mode_path, sandbox.bash_script_path)
+
+    @staticmethod
+    def _recreate_dir(path: str):
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+
+    async def _init_git_repo(self, repo_dir: str):
         """Create a fresh git repository for git lessons."""
-        if os.path.exists(self._git_repo_dir):
-            shutil.rmtree(self._git_repo_dir)
-        os.makedirs(self._git_repo_dir)
-        self._run_cmd(["git", "init"], cwd=self._git_repo_dir)
-        self._run_cmd(["git", "config", "user.email", "test@test.com"], cwd=self._git_repo_dir)
-        self._run_cmd(["git", "config", "user.name", "Test"], cwd=self._git_repo_dir)
-
-    def _reset_sql_db(self):
+        await asyncio.to_thread(self._recreate_dir, repo_dir)
+        await self._run_cmd(["git", "init"], cwd=repo_dir)
+        await self._run_cmd(["git", "config", "user.email", "test@test.com"], cwd=repo_dir)
+        await self._run_cmd(["git", "config", "user.name", "Test"], cwd=repo_dir)
+
+    def _reset_sql_db(self, db_path: str):
         """Copy fresh database for SQL lessons."""
         if os.path.exists(self._sql_db_source):
-            shutil.copy2(self._sql_db_source, self._sql_db_path)
+            shutil.copy2(self._sql_db_source, db_path)
         else:
             print(f"  Warning: SQL database not found at {self._sql_db_source}")
 
-    def _init_bash_workspace(self):
+    def _init_bash_workspace(self, ws: str):
         """Create bash workspace with sample files for lessons."""
-        ws = self._bash_workspace
         if os.path.exists(ws):
             shutil.rmtree(ws)
         os.makedirs(os.path.join(ws, "subdir"), exist_ok=True)
@@ -240,147 +409,247 @@ class SubprocessManager:
             Path(os.path.join(ws, name)).touch()
         Path(os.path.join(ws, "subdir", "junk3.tmp")).touch()
 
-    def _reset_bash_workspace(self):
-        """Reset bash workspace to original state."""
-        self._init_bash_workspace()
+    @staticmethod
+    def _remove_files(*paths):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def _run_cmd(self, cmd, cwd=None, input_data=None, timeout=TIMEOUT_SECONDS, env=None):
+        """Run a command without blocking the event loop and return (exit_code, output).
 
-    def _run_cmd(self, cmd, cwd=None, input_data=None, timeout=TIMEOUT_SECONDS):
-        """Run a command and return (exit_code, output)."""
+        The child is started in its own session so that on timeout (or when the
+        request is cancelled) the whole process group is killed, including any
+        grandchildren spawned by `sh -c` pipelines.
+        """
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.PIPE if input_data is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 cwd=cwd,
-                input=input_data,
-                env={**os.environ}
+                env={**os.environ, **(env or {})},
+                start_new_session=True,
             )
-            output = result.stdout.strip()
-            if result.returncode != 0 and result.stderr.strip():
-                output = output + "\n" + result.stderr.strip() if output else result.stderr.strip()
-            return result.returncode, output
-        except subprocess.TimeoutExpired:
-            return 1, "Error: command timed out"
         except FileNotFoundError as e:
             return 1, f"Error: command not found - {e}"
 
-    def _execute_redis(self, code: str):
-        """Execute a redis-cli command."""
-        # redis-cli accepts the command as arguments
-        args = ["redis-cli"] + code.split()
-        return self._run_cmd(args)
-
-    def _execute_sql(self, code: str):
+        stdin_bytes = input_data.encode("utf-8") if input_data is not None else None
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(stdin_bytes), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._kill_process_group(proc)
+            return 1, "Error: command timed out"
+        except asyncio.CancelledError:
+            await self._kill_process_group(proc)
+            raise
+
+        output = stdout.decode("utf-8", errors="replace").strip()
+        error_output = stderr.decode("utf-8", errors="replace").strip()
+        if proc.returncode != 0 and error_output:
+            output = output + "\n" + error_output if output else error_output
+        return proc.returncode, output
+
+    @staticmethod
+    async def _kill_process_group(proc):
+        """SIGKILL the process group led by proc and reap it."""
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+
+    async def _execute_redis(self, code: str, sandbox: Sandbox):
+        """Execute a redis command against the sandbox's logical DB (or embedded keyspace)."""
+        if self.redis_engine == "embedded":
+            exit_code, output = sandbox.redis.run(code)
+            return exit_code, output.strip()
+        # redis-cli accepts the command as arguments, quoted as in its prompt
+        try:
+            args = split_args(code)
+        except ValueError as e:
+            return 1, str(e)
+        # FLUSHALL would wipe every sandbox's DB; scope it to this one
+        if args and args[0].upper() == "FLUSHALL":
+            args[0] = "FLUSHDB"
+        return await self._run_cmd(["redis-cli", "-n", str(sandbox.redis_db)] + args)
+
+    async def _execute_sql(self, code: str, sandbox: Sandbox):
         """Execute SQL via sqlite3."""
-        return self._run_cmd(["sqlite3", self._sql_db_path], input_data=code)
+        return await self._run_cmd(["sqlite3", sandbox.sql_db_path], input_data=code)
 
-    def _execute_git(self, code: str):
+    async def _execute_git(self, code: str, sandbox: Sandbox):
         """Execute a git/shell command in the git repo."""
-        return self._run_cmd(["sh", "-c", code], cwd=self._git_repo_dir)
+        return await self._run_cmd(["sh", "-c", code], cwd=sandbox.git_repo_dir)
 
-    def _execute_docker(self, code: str):
+    async def _execute_docker(self, code: str, sandbox: Sandbox):
         """Execute docker tutorial commands (mock CLI + validators)."""
         stripped = code.strip()
-        scripts_dir = str(BASE_DIR / "docker" / "docker")
 
         if stripped.startswith("docker"):
-            # Mock docker CLI
-            mock_script = os.path.join(scripts_dir, "mock_docker.sh")
-            return self._run_cmd(["sh", mock_script] + stripped.split()[1:])
-        elif stripped.startswith("validate-dockerfile"):
-            return self._run_cmd(
-                ["python", os.path.join(scripts_dir, "validate_dockerfile.py"), self._tmp_input]
-            )
-        elif stripped.startswith("validate-compose"):
-            return self._run_cmd(
-                ["python", os.path.join(scripts_dir, "validate_compose.py"), self._tmp_input]
-            )
+            return self._run_docker(stripped, sandbox)
+        elif stripped.startswith(("validate-dockerfile", "validate-compose")):
+            command = stripped.split()[0]
+            return validators.run(command, self._tool_args(stripped, sandbox), self._user_input(sandbox))
         else:
-            # User content (Dockerfile/Compose) — save to tmp file
-            with open(self._tmp_input, "w") as f:
-                f.write(code)
+            # User content (Dockerfile/Compose) — kept in memory for the validation command
+            sandbox.user_input = code
             return 0, code
 
-    def _execute_llm(self, code: str):
-        """Execute LLM tutorial commands."""
+    def _run_docker(self, command_line: str, sandbox: Sandbox):
+        """Run docker commands (one per line, or joined with &&) in the sandbox's mock engine."""
+        if sandbox.docker is None:
+            # `docker build` reads the Dockerfile the user submitted, if any
+            sandbox.docker = load_mock_docker().MockDocker(read_dockerfile=lambda path: sandbox.user_input)
+        outputs = []
+        for command in re.split(r"\n|&&", command_line):
+            try:
+                argv = shlex.split(command)
+            except ValueError as e:
+                return 1, f"docker: {e}"
+            if not argv:
+                continue
+            if argv[0] != "docker":
+                outputs.append(f"Command not allowed: {argv[0]}. Only docker commands can be chained.")
+                return 1, "\n".join(outputs)
+            exit_code, output = sandbox.docker.execute(argv[1:])
+            if output:
+                outputs.append(output)
+            if exit_code:
+                return exit_code, "\n".join(outputs)
+        return 0, "\n".join(outputs)
+
+    async def _call_tool(self, module: str, func: str, *args, timeout: float = TIMEOUT_SECONDS):
+        """Call a docker/llm tool function in a warm worker. Returns (exit_code, output)."""
+        try:
+            result = await self.tools.call(module, func, *args, timeout=timeout)
+        except asyncio.TimeoutError:
+            return 1, "Error: command timed out"
+        except Exception as e:
+            return 1, f"Error: {e}"
+        if isinstance(result, tuple):
+            exit_code, output = result
+        else:
+            exit_code, output = 0, result
+        return exit_code, str(output).strip()
+
+    def _user_input(self, sandbox: Sandbox):
+        """The user's text for this grade: from memory, else the input file a setup command wrote."""
+        if sandbox.user_input is not None:
+            return sandbox.user_input
+        return self._read_file(sandbox.input_path)
+
+    @staticmethod
+    def _read_file(path: str):
+        try:
+            with open(path) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def _execute_llm(self, code: str, sandbox: Sandbox):
+        """Execute LLM tutorial commands via the warm tool workers."""
         stripped = code.strip()
-        scripts_dir = str(BASE_DIR / "docker" / "llm")
 
         if stripped.startswith("validate-api-request"):
-            return self._run_cmd(
-                ["python", os.path.join(scripts_dir, "validate_api_request.py"), self._tmp_input]
-            )
-        elif stripped.startswith("tokenize-text"):
-            return self._run_cmd(
-                ["python", os.path.join(scripts_dir, "tokenize_text.py"), self._tmp_input]
-            )
-        elif stripped.startswith("compute-similarity"):
-            return self._run_cmd(
-                ["python", os.path.join(scripts_dir, "compute_similarity.py"), self._tmp_input]
-            )
-        elif stripped.startswith("call-llm"):
-            return self._run_cmd(
-                ["python", os.path.join(scripts_dir, "call_llm.py"), self._tmp_input],
-                timeout=30  # LLM API calls can be slow
-            )
-        else:
-            # User input — save to tmp file, run dispatcher
-            with open(self._tmp_input, "w") as f:
-                f.write(code)
-            return self._run_cmd(
-                ["python", os.path.join(scripts_dir, "llm_dispatch.py")],
-                timeout=30
-            )
-
-    def _execute_bash(self, code: str):
+            return validators.run("validate-api-request", self._tool_args(stripped, sandbox), self._user_input(sandbox))
+
+        # The remaining tools read the (stripped) sandbox input
+        if stripped.startswith(("tokenize-text", "compute-similarity", "call-llm")):
+            content = self._user_input(sandbox)
+            if content is None:
+                return 1, f"Error: No input. Missing {LESSON_INPUT_PATH}"
+            text = content.strip()
+            if stripped.startswith("tokenize-text"):
+                return await self._call_tool("tokenize_text", "tokenize", text)
+            if stripped.startswith("compute-similarity"):
+                return await self._call_tool("compute_similarity", "compute", text)
+            if stripped.startswith("call-llm-json"):
+                return 0, (await self.llm.call_llm_from_json(text)).strip()
+            return 0, (await self.llm.call_llm(text)).strip()
+
+        # User input — save to the sandbox input file, run dispatcher
+        sandbox.user_input = code
+        with open(sandbox.input_path, "w") as f:
+            f.write(code)
+        mode = self._read_file(sandbox.llm_mode_path)
+        if mode is None:
+            return 1, f"Error: No mode set. Missing {LESSON_MODE_PATH}"
+        if mode.strip() == "call-llm":
+            return 0, (await self.llm.call_llm(code.strip())).strip()
+        return await self._call_tool("llm_dispatch", "run", mode.strip(), code.strip(), timeout=30)
+
+    @staticmethod
+    def _tool_args(command: str, sandbox: Sandbox) -> list:
+        """Arguments after `<tool> <input_file>` in a lesson validation command."""
+        parts = command.split()[1:]
+        if parts and parts[0] in (LESSON_INPUT_PATH, sandbox.input_path):
+            parts = parts[1:]
+        return parts
+
+    async def _execute_bash(self, code: str, sandbox: Sandbox):
         """Execute bash commands in the bash workspace."""
         stripped = code.strip()
         if stripped.startswith("#!/bin/bash") or '\n' in stripped:
             # Multi-line script — save to file and execute
-            script_path = "/tmp/grader-bash-script.sh"
-            with open(script_path, "w") as f:
+            with open(sandbox.bash_script_path, "w") as f:
                 f.write(code)
-            return self._run_cmd(["bash", script_path], cwd=self._bash_workspace)
+            return await self._run_cmd(["bash", sandbox.bash_script_path], cwd=sandbox.bash_workspace)
         else:
             # Single command — execute directly
-            return self._run_cmd(["sh", "-c", code], cwd=self._bash_workspace)
+            return await self._run_cmd(["sh", "-c", code], cwd=sandbox.bash_workspace)
 
-    def _execute(self, language: str, code: str):
+    async def _execute(self, language: str, code: str, sandbox: Sandbox):
         """Route execution to the right handler."""
         if language == "redis":
-            return self._execute_redis(code)
+            return await self._execute_redis(code, sandbox)
         elif language == "sql":
-            return self._execute_sql(code)
+            return await self._execute_sql(code, sandbox)
         elif language == "git":
-            return self._execute_git(code)
+            return await self._execute_git(code, sandbox)
         elif language == "docker":
-            return self._execute_docker(code)
+            return await self._execute_docker(code, sandbox)
         elif language == "llm":
-            return self._execute_llm(code)
+            return await self._execute_llm(code, sandbox)
         elif language == "bash":
-            return self._execute_bash(code)
+            return await self._execute_bash(code, sandbox)
         else:
             return 1, f"Unsupported language: {language}"
 
-    def _reset_state(self, language: str):
-        """Reset state after each grading request."""
+    async def _reset_state(self, language: str, sandbox: Sandbox):
+        """Reset the sandbox state a grading request may have touched.
+
+        File work runs in a thread, so a large workspace reset doesn't stall
+        other requests.
+        """
         if language == "redis":
-            self._run_cmd(["redis-cli", "FLUSHALL"])
+            if self.redis_engine == "embedded":
+                sandbox.redis.flushdb()
+            else:
+                await self._run_cmd(["redis-cli", "-n", str(sandbox.redis_db), "FLUSHDB"])
         elif language == "sql":
-            self._reset_sql_db()
+            await asyncio.to_thread(self._reset_sql_db, sandbox.sql_db_path)
         elif language == "git":
-            self._run_cmd(["sh", "-c", "git reset --hard && git clean -fd"], cwd=self._git_repo_dir)
+            await self._init_git_repo(sandbox.git_repo_dir)
         elif language in ("docker", "llm"):
-            if os.path.exists(self._tmp_input):
-                os.remove(self._tmp_input)
+            sandbox.user_input = None
+            sandbox.docker = None
+            await asyncio.to_thread(self._remove_files, sandbox.input_path, sandbox.llm_mode_path)
         elif language == "bash":
-            self._reset_bash_workspace()
+            await asyncio.to_thread(self._init_bash_workspace, sandbox.bash_workspace)
+            await asyncio.to_thread(self._remove_files, sandbox.bash_script_path)
 
     async def execute_code_in_container(
-        self, language: str, user_code: str, check_logic: schemas.CheckLogic
+        self, language: str, user_code: str, check_logic: schemas.CheckLogic, release_slot=None
     ) -> schemas.GradeResult:
-        """Execute and grade code. Same interface as ContainerManager."""
+        """Execute and grade code. Same interface as ContainerManager.
+
+        When a grade ends with an LLM provider call, the sandbox is returned
+        first and `release_slot` (the scheduler slot's release) is called: the
+        call only needs the user's text, and LLMClient limits provider
+        concurrency on its own.
+        """
 
         # Sanitize user input before execution
         is_safe, error_msg = sanitize_input(language, user_code)
@@ -391,26 +660,109 @@ class SubprocessManager:
                 feedback_message=error_msg,
             )
 
-        try:
+        async with self.sandboxes.lease(language) as sandbox:
             # 1. Run setup commands (trusted, from lesson JSON — not sanitized)
-            #    Run as shell commands directly since they may include redirects
-            #    like 'echo tokenize > /tmp/llm_mode' that don't fit topic handlers.
-            if check_logic.setup_commands:
-                for cmd in check_logic.setup_commands:
-                    self._run_cmd(["sh", "-c", cmd])
+            await self._run_setup(language, check_logic, sandbox)
 
-            # 2. Run the user's code
-            exit_code, output = self._execute(language, user_code)
+            # 2. Run the user's code, unless it is the grade's final LLM call
+            validation = check_logic.validation_command and sandbox.localize(check_logic.validation_command)
+            provider_call = None if validation else self._provider_call(language, user_code, sandbox)
+            if provider_call is None:
+                exit_code, output = await self._execute(language, user_code, sandbox)
 
-            # 3. Run validation command (if provided)
+            # 3. Run validation command (if provided), unless it is an LLM call
             validation_output = ""
-            if check_logic.validation_command:
-                _, validation_output = self._execute(language, check_logic.validation_command)
+            if validation:
+                provider_call = self._provider_call(language, validation, sandbox)
+                if provider_call is None:
+                    _, validation_output = await self._execute(language, validation, sandbox)
+
+            if provider_call is None:
+                # 4. Grade the result using the shared grading logic
+                return evaluate(check_logic, output, validation_output)
+
+        # The sandbox is back in the pool; wait on the provider outside the grading lane
+        if release_slot is not None:
+            release_slot()
+        provider_output = (await provider_call()).strip()
+        if validation:
+            return evaluate(check_logic, output, provider_output)
+        return evaluate(check_logic, provider_output, "")
+
+    def _provider_call(self, language: str, code: str, sandbox: Sandbox):
+        """The LLM provider request running `code` in this sandbox would make, or None.
+
+        Returns a coroutine function bound to the user's text, which it reads
+        now so the call can run after the sandbox is reset.
+        """
+        if language != "llm":
+            return None
+        stripped = code.strip()
+        if stripped.startswith("call-llm"):
+            content = self._user_input(sandbox)
+            if content is None:
+                return None  # _execute_llm reports the missing input
+            call = self.llm.call_llm_from_json if stripped.startswith("call-llm-json") else self.llm.call_llm
+            return functools.partial(call, content.strip())
+        if stripped.startswith(("validate-api-request", "tokenize-text", "compute-similarity")):
+            return None
+        mode = self._read_file(sandbox.llm_mode_path)
+        if mode is not None and mode.strip() == "call-llm":
+            return functools.partial(self.llm.call_llm, stripped)
+        return None
+
+    async def _run_setup(self, language: str, check_logic: schemas.CheckLogic, sandbox: Sandbox):
+        """Run a lesson's setup commands in the sandbox.
+
+        Run as shell commands directly since they may include redirects
+        like 'echo tokenize > /tmp/llm_mode' that don't fit topic handlers.
+        Commands run inside the sandbox, with lesson /tmp paths localized.
+        """
+        if check_logic.setup_commands:
+            cwd = {"git": sandbox.git_repo_dir, "bash": sandbox.bash_workspace}.get(language, sandbox.root)
+            for cmd in check_logic.setup_commands:
+                if language == "docker" and cmd.strip().startswith("docker"):
+                    # Seed the grade's mock engine (e.g. a container the lesson inspects)
+                    self._run_docker(cmd, sandbox)
+                    continue
+                await self._run_cmd(["sh", "-c", sandbox.localize(cmd)], cwd=cwd)
+
+    async def stream_code_in_container(
+        self, language: str, user_code: str, check_logic: schemas.CheckLogic, release_slot=None
+    ):
+        """Execute and grade code, streaming the output as it is produced.
+
+        Yields ("token", text) while a chat lesson's LLM answer is generated,
+        then ("result", GradeResult). Everything else runs exactly as in
+        execute_code_in_container and yields only the result.
+        """
+        if language != "llm" or check_logic.validation_command:
+            yield "result", await self.execute_code_in_container(language, user_code, check_logic, release_slot)
+            return
 
-            # 4. Grade the result using the shared grading logic
-            return evaluate(check_logic, output, validation_output)
-        finally:
-            self._reset_state(language)
+        is_safe, error_msg = sanitize_input(language, user_code)
+        if not is_safe:
+            yield "result", schemas.GradeResult(output=error_msg, is_correct=False, feedback_message=error_msg)
+            return
+
+        async with self.sandboxes.lease(language) as sandbox:
+            await self._run_setup(language, check_logic, sandbox)
+            mode = self._read_file(sandbox.llm_mode_path)
+            if mode is None or mode.strip() != "call-llm":
+                _, output = await self._execute(language, user_code, sandbox)
+                yield "result", evaluate(check_logic, output, "")
+                return
+
+        # As in execute_code_in_container: the answer streams outside the sandbox and lane
+        if release_slot is not None:
+            release_slot()
+        output = ""
+        async for kind, text in self.llm.stream_llm(user_code.strip()):
+            if kind == "token":
+                yield "token", text
+            else:
+                output = text.strip()
+        yield "result", evaluate(check_logic, output, "")
 
 
 # Create singleton instance
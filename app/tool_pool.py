@@ -0,0 +1,145 @@
+# ABOUTME: Long-lived worker processes that keep the docker/llm tool modules imported and warm.
+# ABOUTME: Subprocess-mode grading calls tokenize/similarity/dispatch as functions here.
+
+import asyncio
+import concurrent.futures
+import importlib
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LLM_TOOLS_DIR = BASE_DIR / "docker" / "llm"
+
+# Worker processes; matches the scheduler's llm concurrency so a grade never waits on the pool
+TOOL_WORKERS = int(os.environ.get("GRADER_TOOL_WORKERS", "2"))
+TOOL_TIMEOUT = 10
+# Seconds past its timeout a call that ignores the alarm may run before its worker exits
+KILL_GRACE = 2
+
+# Modules imported (and warmed) in every worker
+TOOL_MODULES = ["tokenize_text", "compute_similarity", "llm_dispatch"]
+
+
+def _init_worker(tool_dirs: list, env: dict, modules: list):
+    """Runs once per worker: make the tool modules importable and load their heavy state."""
+    sys.path[:0] = tool_dirs
+    os.environ.update(env)
+    for name in modules:
+        try:
+            module = importlib.import_module(name)
+            warm_up = getattr(module, "warm_up", None)
+            if warm_up is not None:
+                warm_up()
+        except Exception as e:
+            # The tool reports the same error to the student on first use
+            print(f"Tool worker: warm-up of {name} failed: {e}", file=sys.stderr)
+
+
+def _alarm(signum, frame):
+    raise TimeoutError("tool call timed out")
+
+
+def _call(module: str, func: str, args: tuple, deadline: float = None, kill_grace: float = KILL_GRACE):
+    """Run module.func(*args) in this worker.
+
+    With a deadline (time.time()), an alarm interrupts the call so the worker
+    stays usable; a call stuck where the alarm can't reach it (e.g. in C code)
+    ends the worker process instead, `kill_grace` seconds later.
+    """
+    if deadline is None:
+        return getattr(importlib.import_module(module), func)(*args)
+    timeout = deadline - time.time()
+    if timeout <= 0:
+        raise TimeoutError("tool call timed out")  # spent its time waiting for a worker
+    watchdog = threading.Timer(timeout + kill_grace, os._exit, (1,))
+    watchdog.daemon = True
+    watchdog.start()
+    previous = signal.signal(signal.SIGALRM, _alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return getattr(importlib.import_module(module), func)(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        watchdog.cancel()
+
+
+class ToolPool:
+    """Process pool serving the LLM tool scripts through a function-call interface.
+
+    Usage:
+        output = await pool.call("tokenize_text", "tokenize", text)
+    """
+
+    def __init__(self, workers: int = TOOL_WORKERS, tool_dirs: list = None, env: dict = None,
+                 modules: list = None, kill_grace: float = KILL_GRACE):
+        self.workers = max(1, workers)
+        self.tool_dirs = [str(d) for d in (tool_dirs or [LLM_TOOLS_DIR])]
+        self.env = env or {}
+        self.modules = TOOL_MODULES if modules is None else modules
+        self.kill_grace = kill_grace
+        self._executor = None
+
+    def start(self):
+        """Spawn the workers and have each import and warm the tools in the background."""
+        if self._executor is not None:
+            return
+        # spawn, not fork: the app process has an event loop and helper threads
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.tool_dirs, self.env, self.modules),
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_call, "os", "getpid", ())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _retire(self, executor):
+        """Stop using a broken executor; the next call starts a fresh one."""
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def call(self, module: str, func: str, *args, timeout: float = TOOL_TIMEOUT):
+        """Run module.func(*args) in a worker and return its result.
+
+        A call that times out is interrupted inside its worker, so other calls
+        running at the same time are unaffected. If the worker had to exit
+        instead, the calls it took down with it are retried once on a new pool
+        while they still have time left.
+
+        Raises:
+            asyncio.TimeoutError: If the call takes longer than timeout.
+            Exception: Whatever the tool function raised.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.time() + timeout
+        for attempt in range(2):
+            self.start()
+            executor = self._executor
+            future = loop.run_in_executor(executor, _call, module, func, args, deadline, self.kill_grace)
+            done, _ = await asyncio.wait({future}, timeout=deadline - time.time() + self.kill_grace + 1)
+            if not done:
+                # Not even the worker's watchdog answered: stop sending work there
+                self._retire(executor)
+                raise asyncio.TimeoutError()
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # A worker died (OOM, or a stuck call's watchdog); replace the pool
+                self._retire(executor)
+                if time.time() >= deadline:
+                    raise asyncio.TimeoutError()
+                if attempt:
+                    raise
@@ -0,0 +1,56 @@
+# ABOUTME: In-process access to the lesson validators (Dockerfile, Compose, LLM API request).
+# ABOUTME: Subprocess-mode grading calls them with the user's text in memory; the images keep the CLIs.
+
+import importlib.util
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Validation command -> the script that implements it (each has validate(content, checks))
+VALIDATOR_SCRIPTS = {
+    "validate-dockerfile": BASE_DIR / "docker" / "docker" / "validate_dockerfile.py",
+    "validate-compose": BASE_DIR / "docker" / "docker" / "validate_compose.py",
+    "validate-api-request": BASE_DIR / "docker" / "llm" / "validate_api_request.py",
+}
+
+_validators = {}
+
+
+def _load(command: str):
+    """validate() from the script behind a validation command, imported once."""
+    if command not in _validators:
+        path = VALIDATOR_SCRIPTS[command]
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _validators[command] = module.validate
+    return _validators[command]
+
+
+def validate(command: str, content: str, checks: str):
+    """Run a validator on in-memory text.
+
+    Returns:
+        (exit_code, message) exactly as the CLI prints and exits; a validator
+        that crashes fails the answer, as the CLI's non-zero exit did
+    """
+    if content is None:
+        return 1, "FAIL: No input provided"
+    try:
+        is_valid, message = _load(command)(content, checks)
+    except Exception as e:
+        return 1, f"FAIL: {e}"
+    return (0 if is_valid else 1), message
+
+
+def run(command: str, args: list, content: str):
+    """A validation command line (`<command> <file> <checks>`, file already dropped) on in-memory text."""
+    if not args:
+        return 1, f"Usage: {command} <file> <checks>"
+    return validate(command, content, args[0])
+
+
+def warm_up():
+    """Import every validator (and yaml) ahead of the first grade."""
+    for command in VALIDATOR_SCRIPTS:
+        _load(command)
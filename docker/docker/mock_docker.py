@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+ABOUTME: Mock Docker CLI for the docker tutorial: an argparse front end over a simulated engine.
+ABOUTME: Containers and images persist for the engine's lifetime (a grade in-process, a state file as CLI).
+
+The subprocess grader keeps one MockDocker per sandbox and calls execute()
+directly. Installed as /usr/local/bin/docker in the grader image, each
+invocation loads and saves its state in MOCK_DOCKER_STATE instead.
+
+Images come from a small built-in registry (REGISTRY); anything else fails
+to pull, as an unknown repository would. Service images (nginx, postgres,
+...) keep running until stopped; the rest run their command and exit.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+VERSION = "24.0.7"
+BUILD = "afdd53b"
+STATE_FILE = os.environ.get("MOCK_DOCKER_STATE", "/tmp/mock_docker_state.json")
+
+DAY = 86400
+
+# Images `docker pull` can find: size, age (seconds), default command, exposed ports,
+# whether it keeps running, and the log lines it prints on start
+REGISTRY = {
+    "hello-world": {"size": "13.3kB", "age": 240 * DAY, "cmd": "/hello", "ports": [], "service": False,
+                    "logs": [
+                        "",
+                        "Hello from Docker!",
+                        "This message shows that your installation appears to be working correctly.",
+                        "",
+                        "To generate this message, Docker took the following steps:",
+                        " 1. The Docker client contacted the Docker daemon.",
+                        " 2. The Docker daemon pulled the \"hello-world\" image from the Docker Hub.",
+                        " 3. The Docker daemon created a new container from that image which runs the",
+                        "    executable that produces the output you are currently reading.",
+                        " 4. The Docker daemon streamed that output to the Docker client, which sent it",
+                        "    to your terminal.",
+                        "",
+                        "For more examples and ideas, visit:",
+                        " https://docs.docker.com/get-started/",
+                        "",
+                    ]},
+    "nginx": {"size": "187MB", "age": 14 * DAY, "cmd": "/docker-entrypoint.sh nginx -g 'daemon off;'",
+              "ports": ["80/tcp"], "service": True,
+              "logs": ["/docker-entrypoint.sh: Configuration complete; ready for start up"]},
+    "httpd": {"size": "148MB", "age": 14 * DAY, "cmd": "httpd-foreground", "ports": ["80/tcp"], "service": True,
+              "logs": ["[mpm_event:notice] AH00489: Apache/2.4.58 (Unix) configured -- resuming normal operations"]},
+    "postgres": {"size": "379MB", "age": 21 * DAY, "cmd": "docker-entrypoint.sh postgres",
+                 "ports": ["5432/tcp"], "service": True, "requires_env": "POSTGRES_PASSWORD",
+                 "logs": ["LOG:  database system is ready to accept connections"]},
+    "mysql": {"size": "565MB", "age": 21 * DAY, "cmd": "docker-entrypoint.sh mysqld",
+              "ports": ["3306/tcp", "33060/tcp"], "service": True, "requires_env": "MYSQL_ROOT_PASSWORD",
+              "logs": ["[Server] /usr/sbin/mysqld: ready for connections. Version: '8.2.0'  port: 3306"]},
+    "redis": {"size": "138MB", "age": 14 * DAY, "cmd": "docker-entrypoint.sh redis-server",
+              "ports": ["6379/tcp"], "service": True, "logs": ["* Ready to accept connections tcp"]},
+    "mongo": {"size": "757MB", "age": 21 * DAY, "cmd": "docker-entrypoint.sh mongod",
+              "ports": ["27017/tcp"], "service": True, "logs": ["Waiting for connections"]},
+    "ibmcom/db2": {"size": "2.95GB", "age": 400 * DAY, "cmd": "/var/db2_setup/lib/setup_db2_instance.sh",
+                   "ports": ["50000/tcp"], "service": True, "requires_env": "DB2INST1_PASSWORD",
+                   "logs": ["(*) All databases are now active.", "(*) Setup has completed."]},
+    "alpine": {"size": "7.38MB", "age": 28 * DAY, "cmd": "/bin/sh", "ports": [], "service": False, "logs": []},
+    "busybox": {"size": "4.26MB", "age": 60 * DAY, "cmd": "sh", "ports": [], "service": False, "logs": []},
+    "ubuntu": {"size": "77.9MB", "age": 28 * DAY, "cmd": "/bin/bash", "ports": [], "service": False, "logs": []},
+    "debian": {"size": "117MB", "age": 28 * DAY, "cmd": "bash", "ports": [], "service": False, "logs": []},
+    "python": {"size": "1.02GB", "age": 14 * DAY, "cmd": "python3", "ports": [], "service": False, "logs": []},
+    "node": {"size": "1.1GB", "age": 14 * DAY, "cmd": "node", "ports": [], "service": False, "logs": []},
+    "golang": {"size": "814MB", "age": 14 * DAY, "cmd": "bash", "ports": [], "service": False, "logs": []},
+    "eclipse-temurin": {"size": "456MB", "age": 21 * DAY, "cmd": "jshell", "ports": [], "service": False,
+                        "logs": []},
+    "openjdk": {"size": "470MB", "age": 500 * DAY, "cmd": "jshell", "ports": [], "service": False, "logs": []},
+}
+
+# Built when `docker build` finds no Dockerfile (the tutorial's example app)
+DEFAULT_DOCKERFILE = 'FROM python:3.12-slim\nCOPY . /app\nCMD ["python", "app.py"]\n'
+
+NAME_ADJECTIVES = ["relaxed", "quirky", "brave", "eager", "focused", "gifted", "jolly", "nifty", "serene", "vibrant"]
+NAME_SCIENTISTS = ["pike", "hopper", "lovelace", "turing", "curie", "tesla", "ritchie", "noether", "shannon", "knuth"]
+
+COMMANDS_HELP = """Usage:  docker [OPTIONS] COMMAND
+
+A self-sufficient runtime for containers
+
+Common Commands:
+  run         Create and run a new container from an image
+  ps          List containers
+  images      List images
+  pull        Download an image from a registry
+  build       Build an image from a Dockerfile
+  logs        Fetch the logs of a container
+  start       Start one or more stopped containers
+  stop        Stop one or more running containers
+  rm          Remove one or more containers
+  rmi         Remove one or more images
+  info        Display system-wide information
+  version     Show the Docker version information"""
+
+
+class DockerError(Exception):
+    """A failed docker command: its message and exit status."""
+
+    def __init__(self, message: str, status: int = 1):
+        super().__init__(message)
+        self.status = status
+
+
+class _Parser(argparse.ArgumentParser):
+    """argparse that reports errors the way the docker CLI does, instead of exiting."""
+
+    def error(self, message):
+        raise DockerError(f"{self.prog}: {message}\nSee '{self.prog} --help'.", 125 if self.prog == "docker run" else 1)
+
+
+def _parser(command: str, description: str) -> _Parser:
+    parser = _Parser(prog=f"docker {command}", description=description, add_help=False)
+    parser.add_argument("--help", action="store_true")
+    return parser
+
+
+def _human_duration(seconds: float) -> str:
+    """Docker's coarse durations ("Less than a second", "About a minute", "3 weeks", ...)."""
+    seconds = int(seconds)
+    minutes, hours = seconds // 60, seconds // 3600
+    if seconds < 1:
+        return "Less than a second"
+    if seconds == 1:
+        return "1 second"
+    if seconds < 60:
+        return f"{seconds} seconds"
+    if minutes == 1:
+        return "About a minute"
+    if minutes < 60:
+        return f"{minutes} minutes"
+    if hours == 1:
+        return "About an hour"
+    if hours < 48:
+        return f"{hours} hours"
+    if hours < 24 * 7 * 2:
+        return f"{hours // 24} days"
+    if hours < 24 * 30 * 2:
+        return f"{hours // 24 // 7} weeks"
+    if hours < 24 * 365 * 2:
+        return f"{hours // 24 // 30} months"
+    return f"{hours // 24 // 365} years"
+
+
+def _table(headers: list, rows: list) -> list:
+    """Columns padded like docker's tabwriter (three spaces after the widest cell)."""
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    lines = []
+    for row in [headers] + rows:
+        cells = [str(cell).ljust(width + 3) for cell, width in zip(row[:-1], widths)]
+        lines.append(("".join(cells) + str(row[-1])).rstrip())
+    return lines
+
+
+def _split_ref(ref: str) -> tuple:
+    """'nginx:1.25' -> ('nginx', '1.25'); the tag defaults to latest."""
+    name, _, tag = ref.rpartition(":") if ":" in ref.split("/")[-1] else (ref, "", "latest")
+    return name, tag or "latest"
+
+
+def _parse_dockerfile(content: str) -> list:
+    """(INSTRUCTION, arguments) pairs, with comments dropped and continuations joined."""
+    instructions, pending = [], ""
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        parts = (pending + line).split(None, 1)
+        pending = ""
+        instructions.append((parts[0].upper(), parts[1] if len(parts) > 1 else ""))
+    return instructions
+
+
+def _exec_form(value: str) -> str:
+    """CMD/ENTRYPOINT as a command line, whether written in JSON or shell form."""
+    try:
+        parts = json.loads(value)
+        if isinstance(parts, list):
+            return " ".join(str(p) for p in parts)
+    except ValueError:
+        pass
+    return value
+
+
+class MockDocker:
+    """A simulated Docker engine: images, containers and the CLI commands over them.
+
+    Args:
+        clock: Returns the current time in seconds (time.time by default).
+        read_dockerfile: Called with the path `docker build` would read; returns the
+            Dockerfile text or None (then DEFAULT_DOCKERFILE is built).
+    """
+
+    def __init__(self, clock=time.time, read_dockerfile=None):
+        self.clock = clock
+        self.read_dockerfile = read_dockerfile or self._read_file
+        self.images = []       # {"repository", "tag", "id", "created", "size", "cmd", "ports", "service", "logs"}
+        self.containers = []   # {"id", "name", "image", "image_id", "command", "created", "started", "finished",
+                               #  "running", "exit_code", "ports", "env", "volumes", "logs", "auto_remove"}
+        self.counter = 0       # seeds ids, generated names and ephemeral host ports
+
+    # --- State ---
+
+    def to_dict(self) -> dict:
+        return {"images": self.images, "containers": self.containers, "counter": self.counter}
+
+    @classmethod
+    def from_dict(cls, state: dict, **kwargs) -> "MockDocker":
+        engine = cls(**kwargs)
+        engine.images = state.get("images", [])
+        engine.containers = state.get("containers", [])
+        engine.counter = state.get("counter", 0)
+        return engine
+
+    def _new_id(self, kind: str, seed: str) -> str:
+        self.counter += 1
+        return hashlib.sha256(f"{kind}:{seed}:{self.counter}".encode()).hexdigest()
+
+    @staticmethod
+    def _read_file(path: str):
+        try:
+            with open(path) as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    # --- Lookups ---
+
+    def _find_image(self, ref: str):
+        repository, tag = _split_ref(ref)
+        for image in self.images:
+            if (image["repository"], image["tag"]) == (repository, tag) or (len(ref) >= 4 and image["id"].startswith(ref)):
+                return image
+        return None
+
+    def _find_container(self, ref: str):
+        for container in self.containers:
+            if container["name"] == ref or container["id"].startswith(ref):
+                return container
+        raise DockerError(f"Error response from daemon: No such container: {ref}")
+
+    def _pull(self, ref: str, lines: list):
+        """Add an image from REGISTRY, writing docker's pull progress to lines."""
+        repository, tag = _split_ref(ref)
+        entry = REGISTRY.get(repository)
+        path = repository if "/" in repository else f"library/{repository}"
+        if entry is None:
+            raise DockerError(
+                f"Error response from daemon: pull access denied for {repository}, repository does not exist "
+                f"or may require 'docker login': denied: requested access to the resource is denied")
+        image_id = hashlib.sha256(f"image:{repository}:{tag}".encode()).hexdigest()
+        lines.append(f"{tag}: Pulling from {path}")
+        for layer in range(3):
+            lines.append(f"{hashlib.sha256(f'{image_id}:{layer}'.encode()).hexdigest()[:12]}: Pull complete")
+        lines.append(f"Digest: sha256:{hashlib.sha256(image_id.encode()).hexdigest()}")
+        lines.append(f"Status: Downloaded newer image for {repository}:{tag}")
+        image = {"repository": repository, "tag": tag, "id": image_id, "created": self.clock() - entry["age"],
+                 "size": entry["size"], "cmd": entry["cmd"], "ports": list(entry["ports"]),
+                 "service": entry["service"], "logs": list(entry["logs"]), "requires_env": entry.get("requires_env")}
+        self.images.append(image)
+        return image
+
+    # --- CLI ---
+
+    COMMANDS = ("run", "ps", "images", "pull", "build", "logs", "start", "stop", "rm", "rmi", "info", "version")
+
+    def execute(self, argv: list) -> tuple:
+        """Run one docker command line (without the leading 'docker').
+
+        Returns:
+            (exit_code, output) with stdout and stderr interleaved as a terminal shows them
+        """
+        lines = []
+        try:
+            if not argv or argv[0] in ("--help", "-h", "help"):
+                return 0, COMMANDS_HELP
+            if argv[0] in ("--version", "-v"):
+                return 0, f"Docker version {VERSION}, build {BUILD}"
+            command = "images" if argv[:2] == ["image", "ls"] else "ps" if argv[:2] == ["container", "ls"] else argv[0]
+            args = argv[2:] if command != argv[0] else argv[1:]
+            if command not in self.COMMANDS:
+                raise DockerError(f"docker: '{argv[0]}' is not a docker command.\nSee 'docker --help'")
+            status = getattr(self, f"_cmd_{command}")(args, lines)
+            return status or 0, "\n".join(lines)
+        except DockerError as e:
+            lines.append(str(e))
+            return e.status, "\n".join(lines)
+
+    @staticmethod
+    def _parse(parser: _Parser, args: list):
+        options = parser.parse_args(args)
+        if options.help:
+            raise _Help(parser.format_help())
+        return options
+
+    def _cmd_version(self, args, lines):
+        lines += [
+            "Client: Docker Engine - Community",
+            f" Version:           {VERSION}",
+            f" Git commit:        {BUILD}",
+            "",
+            "Server: Docker Engine - Community",
+            " Engine:",
+            f"  Version:          {VERSION}",
+        ]
+
+    def _cmd_info(self, args, lines):
+        running = sum(c["running"] for c in self.containers)
+        lines += [
+            "Client: Docker Engine - Community",
+            f" Version:    {VERSION}",
+            " Context:    default",
+            "",
+            "Server: Docker Engine - Community",
+            f" Containers: {len(self.containers)}",
+            f"  Running: {running}",
+            "  Paused: 0",
+            f"  Stopped: {len(self.containers) - running}",
+            f" Images: {len(self.images)}",
+            f" Server Version: {VERSION}",
+            " Storage Driver: overlay2",
+            " Operating System: Alpine Linux v3.19",
+            " Architecture: x86_64",
+        ]
+
+    def _cmd_pull(self, args, lines):
+        parser = _parser("pull", "Download an image from a registry")
+        parser.add_argument("image")
+        options = self._parse(parser, args)
+        repository, tag = _split_ref(options.image)
+        if ":" not in options.image.split("/")[-1]:
+            lines.append("Using default tag: latest")
+        if self._find_image(options.image):
+            lines.append(f"Status: Image is up to date for {repository}:{tag}")
+        else:
+            self._pull(options.image, lines)
+        prefix = "" if "/" in repository else "library/"
+        lines.append(f"docker.io/{prefix}{repository}:{tag}")
+
+    def _cmd_images(self, args, lines):
+        parser = _parser("images", "List images")
+        parser.add_argument("-a", "--all", action="store_true")
+        parser.add_argument("-q", "--quiet", action="store_true")
+        options = self._parse(parser, args)
+        images = sorted(self.images, key=lambda i: i["created"], reverse=True)
+        if options.quiet:
+            lines += [image["id"][:12] for image in images]
+            return
+        now = self.clock()
+        rows = [[i["repository"], i["tag"], i["id"][:12], _human_duration(now - i["created"]) + " ago", i["size"]]
+                for i in images]
+        lines += _table(["REPOSITORY", "TAG", "IMAGE ID", "CREATED", "SIZE"], rows)
+
+    def _cmd_run(self, args, lines):
+        parser = _parser("run", "Create and run a new container from an image")
+        parser.add_argument("-d", "--detach", action="store_true")
+        parser.add_argument("-i", "--interactive", action="store_true")
+        parser.add_argument("-t", "--tty", action="store_true")
+        parser.add_argument("--rm", action="store_true")
+        parser.add_argument("--name")
+        parser.add_argument("-p", "--publish", action="append", default=[])
+        parser.add_argument("-e", "--env", action="append", default=[])
+        parser.add_argument("-v", "--volume", action="append", default=[])
+        parser.add_argument("-w", "--workdir")
+        parser.add_argument("--network")
+        parser.add_argument("--restart")
+        parser.add_argument("image")
+        parser.add_argument("command", nargs=argparse.REMAINDER)
+        options = self._parse(parser, args)
+
+        name = options.name or f"{NAME_ADJECTIVES[self.counter % 10]}_{NAME_SCIENTISTS[self.counter * 7 % 10]}"
+        for container in self.containers:
+            if container["name"] == name:
+                raise DockerError(
+                    f'docker: Error response from daemon: Conflict. The container name "/{name}" is already in use '
+                    f'by container "{container["id"]}". You have to remove (or rename) that container to be able '
+                    f'to reuse that name.\nSee \'docker run --help\'.', 125)
+        env = dict(e.split("=", 1) if "=" in e else (e, "") for e in options.env)
+        ports = [self._parse_port(spec) for spec in options.publish]
+
+        image = self._find_image(options.image)
+        if image is None:
+            repository, tag = _split_ref(options.image)
+            lines.append(f"Unable to find image '{repository}:{tag}' locally")
+            try:
+                image = self._pull(options.image, lines)
+            except DockerError as e:
+                raise DockerError(f"docker: {e}.\nSee 'docker run --help'.", 125)
+
+        for host_ip, host_port, _ in ports:
+            for other in self.containers:
+                if other["running"] and any(p[1] == host_port for p in other["ports"]):
+                    raise DockerError(
+                        f"docker: Error response from daemon: driver failed programming external connectivity: "
+                        f"Bind for {host_ip}:{host_port} failed: port is already allocated.", 125)
+
+        now = self.clock()
+        command = " ".join(options.command) or image["cmd"]
+        container = {
+            "id": self._new_id("container", name), "name": name, "image": options.image, "image_id": image["id"],
+            "command": command, "created": now, "started": now, "finished": None, "running": True, "exit_code": 0,
+            "ports": ports, "exposed": image["ports"], "env": env, "volumes": options.volume, "logs": [],
+            "auto_remove": options.rm,
+        }
+        self.containers.append(container)
+        self._start(container, image, options.command)
+
+        if options.detach:
+            lines.append(container["id"])
+        else:
+            lines += container["logs"]
+        if container["auto_remove"] and not container["running"]:
+            self.containers.remove(container)
+        # Attached, docker run exits with the container's status
+        return 0 if options.detach else container["exit_code"]
+
+    def _start(self, container, image, command=()):
+        """Run the container's process: services stay up, everything else exits straight away."""
+        now = self.clock()
+        container.update(started=now, running=True, finished=None, exit_code=0)
+        required = image.get("requires_env")
+        if required and required not in container["env"]:
+            container["logs"] = ["Error: Database is uninitialized and superuser password is not specified.",
+                                 f"       You must specify {required} to a non-empty value for the superuser."]
+            container.update(running=False, finished=now, exit_code=1)
+        elif command and command[0] == "echo":
+            container["logs"] = [" ".join(command[1:])]
+            container.update(running=False, finished=now)
+        elif image["service"] and not command:
+            container["logs"] = list(image["logs"])
+        else:
+            container["logs"] = list(image["logs"])
+            container.update(running=False, finished=now)
+
+    def _parse_port(self, spec: str) -> list:
+        """-p [ip:][host_port:]container_port[/proto] -> [host_ip, host_port, "port/proto"]."""
+        port, _, proto = spec.partition("/")
+        parts = port.split(":")
+        container_port = parts[-1]
+        host_port = parts[-2] if len(parts) >= 2 else ""
+        host_ip = parts[-3] if len(parts) >= 3 else "0.0.0.0"
+        if not container_port.isdigit() or (host_port and not host_port.isdigit()):
+            raise DockerError(f"docker: invalid containerPort: {container_port}.\nSee 'docker run --help'.", 125)
+        if not host_port:
+            self.counter += 1
+            host_port = str(32767 + self.counter)
+        return [host_ip, host_port, f"{container_port}/{proto or 'tcp'}"]
+
+    def _cmd_ps(self, args, lines):
+        parser = _parser("ps", "List containers")
+        parser.add_argument("-a", "--all", action="store_true")
+        parser.add_argument("-q", "--quiet", action="store_true")
+        options = self._parse(parser, args)
+        containers = [c for c in reversed(self.containers) if options.all or c["running"]]
+        if options.quiet:
+            lines += [c["id"][:12] for c in containers]
+            return
+        now = self.clock()
+        rows = []
+        for c in containers:
+            command = c["command"] if len(c["command"]) <= 20 else c["command"][:19] + "…"
+            if c["running"]:
+                status = f"Up {_human_duration(now - c['started'])}"
+                ports = [f"{ip}:{host}->{port}" for ip, host, port in c["ports"]]
+                ports += [p for p in c["exposed"] if p not in {port for _, _, port in c["ports"]}]
+            else:
+                status = f"Exited ({c['exit_code']}) {_human_duration(now - c['finished'])} ago"
+                ports = []
+            rows.append([c["id"][:12], c["image"], f'"{command}"', _human_duration(now - c["created"]) + " ago",
+                         status, ", ".join(ports), c["name"]])
+        lines += _table(["CONTAINER ID", "IMAGE", "COMMAND", "CREATED", "STATUS", "PORTS", "NAMES"], rows)
+
+    def _cmd_logs(self, args, lines):
+        parser = _parser("logs", "Fetch the logs of a container")
+        parser.add_argument("-f", "--follow", action="store_true")
+        parser.add_argument("container")
+        options = self._parse(parser, args)
+        lines += self._find_container(options.container)["logs"]
+
+    def _cmd_start(self, args, lines):
+        parser = _parser("start", "Start one or more stopped containers")
+        parser.add_argument("containers", nargs="+")
+        options = self._parse(parser, args)
+        for ref in options.containers:
+            container = self._find_container(ref)
+            if not container["running"]:
+                image = next((i for i in self.images if i["id"] == container["image_id"]), None)
+                if image is not None:
+                    self._start(container, image)
+            lines.append(ref)
+
+    def _cmd_stop(self, args, lines):
+        parser = _parser("stop", "Stop one or more running containers")
+        parser.add_argument("-t", "--time", type=int, default=10)
+        parser.add_argument("containers", nargs="+")
+        options = self._parse(parser, args)
+        for ref in options.containers:
+            container = self._find_container(ref)
+            if container["running"]:
+                container.update(running=False, finished=self.clock(), exit_code=0)
+                if container["auto_remove"]:
+                    self.containers.remove(container)
+            lines.append(ref)
+
+    def _cmd_rm(self, args, lines):
+        parser = _parser("rm", "Remove one or more containers")
+        parser.add_argument("-f", "--force", action="store_true")
+        parser.add_argument("containers", nargs="+")
+        options = self._parse(parser, args)
+        for ref in options.containers:
+            container = self._find_container(ref)
+            if container["running"] and not options.force:
+                raise DockerError(
+                    f'Error response from daemon: cannot remove container "/{container["name"]}": container is '
+                    f'running: stop the container before removing or force remove')
+            self.containers.remove(container)
+            lines.append(ref)
+
+    def _cmd_rmi(self, args, lines):
+        parser = _parser("rmi", "Remove one or more images")
+        parser.add_argument("-f", "--force", action="store_true")
+        parser.add_argument("images", nargs="+")
+        options = self._parse(parser, args)
+        for ref in options.images:
+            image = self._find_image(ref)
+            if image is None:
+                raise DockerError(f"Error response from daemon: No such image: {ref}")
+            users = [c for c in self.containers if c["image_id"] == image["id"]]
+            if users and not options.force:
+                raise DockerError(
+                    f'Error response from daemon: conflict: unable to remove repository reference "{ref}" '
+                    f'(must force) - container {users[0]["id"][:12]} is using its referenced image {image["id"][:12]}')
+            self.images.remove(image)
+            if image["repository"] != "<none>":
+                lines.append(f"Untagged: {image['repository']}:{image['tag']}")
+            lines.append(f"Deleted: sha256:{image['id']}")
+
+    def _cmd_build(self, args, lines):
+        parser = _parser("build", "Build an image from a Dockerfile")
+        parser.add_argument("-t", "--tag", action="append", default=[])
+        parser.add_argument("-f", "--file")
+        parser.add_argument("--no-cache", action="store_true")
+        parser.add_argument("path")
+        options = self._parse(parser, args)
+        dockerfile = options.file or os.path.join(options.path, "Dockerfile")
+        content = self.read_dockerfile(dockerfile)
+        instructions = _parse_dockerfile(content if content is not None else DEFAULT_DOCKERFILE)
+        if not instructions or instructions[0][0] != "FROM":
+            raise DockerError("Error response from daemon: dockerfile parse error: no FROM instruction")
+
+        lines.append("Sending build context to Docker daemon  2.048kB")
+        total = len(instructions)
+        image_id = None
+        base = None
+        cmd, ports = None, []
+        for step, (instruction, value) in enumerate(instructions, 1):
+            lines.append(f"Step {step}/{total} : {instruction} {value}")
+            if instruction == "FROM":
+                base = self._find_image(value.split()[0]) or self._pull(value.split()[0], [])
+                image_id = base["id"]
+                cmd, ports = base["cmd"], list(base["ports"])
+            else:
+                image_id = hashlib.sha256(f"{image_id}:{instruction} {value}".encode()).hexdigest()
+                if instruction in ("CMD", "ENTRYPOINT"):
+                    cmd = _exec_form(value)
+                elif instruction == "EXPOSE":
+                    ports += [p if "/" in p else f"{p}/tcp" for p in value.split()]
+                if instruction == "RUN":
+                    lines.append(f" ---> Running in {hashlib.sha256(image_id.encode()).hexdigest()[:12]}")
+            lines.append(f" ---> {image_id[:12]}")
+        lines.append(f"Successfully built {image_id[:12]}")
+
+        built = {"id": image_id, "created": self.clock(), "size": base["size"], "cmd": cmd, "ports": ports,
+                 "service": bool(ports), "logs": [], "requires_env": None}
+        tags = [_split_ref(t) for t in options.tag] or [("<none>", "<none>")]
+        for repository, tag in tags:
+            self.images = [i for i in self.images if (i["repository"], i["tag"]) != (repository, tag)
+                           or repository == "<none>"]
+            self.images.append({**built, "repository": repository, "tag": tag})
+            if repository != "<none>":
+                lines.append(f"Successfully tagged {repository}:{tag}")
+
+
+class _Help(DockerError):
+    """`--help` on a command: its usage text, exit status 0."""
+
+    def __init__(self, text: str):
+        super().__init__(text.rstrip(), 0)
+
+
+def main():
+    state = None
+    try:
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        pass
+    engine = MockDocker.from_dict(state) if state else MockDocker()
+    exit_code, output = engine.execute(sys.argv[1:])
+    if output:
+        print(output)
+    with open(STATE_FILE, "w") as f:
+        json.dump(engine.to_dict(), f)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+ABOUTME: Benchmarks IVF nearest-neighbour search against brute force: recall@k vs latency per nprobe.
+ABOUTME: Development tool, not included in Docker image. Uses a synthetic corpus from generate_embeddings.
+
+Usage: python bench_similarity.py [--sentences 100000] [--dim 384] [--lists N] [--queries 200] [--k 10]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from compute_similarity import EmbeddingStore
+from generate_embeddings import generate_corpus
+from ivf_index import IVFIndex
+
+NPROBES = [1, 2, 4, 8, 16, 32, 64]
+
+
+def median_ms(func, queries):
+    """Run func(query) for every query; return (median ms, results)."""
+    samples, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(func(query))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF recall vs latency against brute force.")
+    parser.add_argument("--sentences", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--lists", type=int, help="IVF clusters (default: sqrt of the sentence count)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    # Held-out sentences from the same distribution serve as queries
+    corpus = generate_corpus(args.sentences + args.queries, args.dim)
+    store = EmbeddingStore(corpus.vectors[:args.sentences], corpus.texts[:args.sentences])
+    queries = corpus.vectors[args.sentences:]
+    size_mb = store.vectors.nbytes / 1e6
+    print(f"{len(store)} sentences x {store.dim} dims ({size_mb:.0f} MB), {len(queries)} queries, k={args.k}")
+
+    start = time.perf_counter()
+    store = store.grouped_by(IVFIndex.build(store.vectors, args.lists))
+    print(f"Index build: {time.perf_counter() - start:.1f} s, {store.index.n_lists} lists\n")
+
+    exact_ms, exact = median_ms(lambda q: store.top_k(q, args.k, exact=True), queries)
+    truth = [{i for i, _ in ranked} for ranked in exact]
+
+    print(f"{'method':>12} {'recall@' + str(args.k):>10} {'median ms':>10} {'speedup':>8} {'scanned':>8}")
+    print(f"{'brute force':>12} {1.0:>10.3f} {exact_ms:>10.3f} {1.0:>7.1f}x {1.0:>8.1%}")
+    for nprobe in NPROBES:
+        if nprobe > store.index.n_lists:
+            break
+        ms, approx = median_ms(lambda q: store.top_k(q, args.k, nprobe=nprobe), queries)
+        recall = np.mean([len(t & {i for i, _ in a}) / len(t) for t, a in zip(truth, approx)])
+        scanned = np.mean([len(store.index.search(store.vectors, q, nprobe)[0]) for q in queries[:20]]) / len(store)
+        print(f"{'nprobe=' + str(nprobe):>12} {recall:>10.3f} {ms:>10.3f} {exact_ms / ms:>7.1f}x {scanned:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+ABOUTME: Benchmarks tokenize_text.tokenize for 10- to 10k-token inputs.
+ABOUTME: Development tool, not included in Docker image. Needs the cl100k_base vocabulary.
+
+Compares the original per-call implementation (get_encoding on every request,
+one decode() per token) with the preloaded encoding, bulk decode and result cache.
+
+Usage: python bench_tokenize.py [--repeat N]
+"""
+
+import argparse
+import statistics
+import time
+
+import tiktoken
+
+import tokenize_text
+
+SIZES = [10, 100, 1000, 10000]
+SAMPLE = (
+    "Large language models read text as tokens: short, frequent words are a single token, "
+    "while rare words like antidisestablishmentarianism are split into several pieces. "
+)
+
+
+def make_text(enc, n_tokens):
+    """Text that encodes to exactly n_tokens tokens."""
+    tokens = enc.encode(SAMPLE * (n_tokens // 20 + 1))
+    text = enc.decode(tokens[:n_tokens])
+    while len(enc.encode(text)) > n_tokens:
+        text = text[:-1]
+    return text
+
+
+def tokenize_baseline(text):
+    """The implementation before preloading: new lookup and per-token decode each call."""
+    enc = tiktoken.get_encoding(tokenize_text.ENCODING_NAME)
+    tokens = enc.encode(text)
+    decoded = [enc.decode([t]) for t in tokens]
+    output = ""
+    for i, (token_id, token_text) in enumerate(zip(tokens, decoded)):
+        output += f"  [{i}] \"{token_text.replace(' ', chr(0x2581))}\" (ID: {token_id})\n"
+    return output
+
+
+def time_ms(func, text, repeat, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement (median reported)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    enc = tokenize_text.get_encoding()
+    print(f"Encoding load (once per process): {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    clear = tokenize_text._tokenize_cached.cache_clear
+    print(f"{'tokens':>7} {'baseline ms':>12} {'uncached ms':>12} {'cached ms':>10} {'speedup':>8}")
+    for n in SIZES:
+        text = make_text(enc, n)
+        baseline = time_ms(tokenize_baseline, text, args.repeat)
+        uncached = time_ms(tokenize_text.tokenize, text, args.repeat, before=clear)
+        tokenize_text.tokenize(text)
+        cached = time_ms(tokenize_text.tokenize, text, args.repeat)
+        print(f"{n:>7} {baseline:>12.3f} {uncached:>12.3f} {cached:>10.3f} {baseline / uncached:>7.1f}x")
+    print(f"\nInputs over {tokenize_text.CACHE_MAX_CHARS} characters are not cached.")
+
+
+if __name__ == "__main__":
+    main()
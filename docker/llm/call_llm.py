@@ -18,68 +18,112 @@ LLM_CHAT_URL = f"{LLM_BASE_URL}/chat/completions"
 DEFAULT_MODEL = os.environ.get("LLM_MODEL", "moonshot-v1-8k")
 
 
-def call_llm(user_input, system_prompt=None):
-    """Call Moonshot API with user input and return response text."""
-    api_key = os.environ.get("LLM_API_KEY", "")
-
+def check_api_key(api_key):
+    """Error message for a missing or malformed key, else None."""
     if not api_key:
         return "Error: No API key configured. Please set LLM_API_KEY environment variable."
 
     # Runtime key diagnostic
     if len(api_key) < 10:
         return f"Error: LLM_API_KEY looks invalid (only {len(api_key)} chars). Check your .env file or fly secrets."
+    return None
+
 
+def chat_payload(user_input, system_prompt=None):
+    """Request body for a single-turn chat completion."""
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": user_input})
 
-    payload = {
+    return {
         "model": DEFAULT_MODEL,
         "messages": messages,
         "temperature": 0.7,
         "max_tokens": 4096
     }
 
-    headers = {
+
+def json_payload(json_input):
+    """Request body from a student's full JSON request. Returns (payload, error)."""
+    try:
+        payload = json.loads(json_input)
+    except json.JSONDecodeError as e:
+        return None, f"Invalid JSON: {e}"
+    if not isinstance(payload, dict):
+        return None, "Invalid JSON: the request must be a JSON object"
+
+    # Override model if not provided
+    if "model" not in payload:
+        payload["model"] = DEFAULT_MODEL
+    return payload, None
+
+
+def request_headers(api_key):
+    return {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {api_key}"
     }
 
-    try:
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(LLM_CHAT_URL, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            message = result["choices"][0]["message"]
-            content = message.get("content", "") or ""
-            
-            # Some reasoning models (like kimi-k2.5) may put thinking in reasoning_content
-            reasoning = message.get("reasoning_content", "")
-            if reasoning and not content:
-                content = reasoning
-            
-            # Also show some metadata for educational purposes
-            usage = result.get("usage", {})
-            prompt_tokens = usage.get("prompt_tokens", "?")
-            completion_tokens = usage.get("completion_tokens", "?")
-            total_tokens = usage.get("total_tokens", "?")
-            model = result.get("model", DEFAULT_MODEL)
-            
-            output = f"{content}\n\n"
-            output += f"--- API Response Metadata ---\n"
-            output += f"Model: {model}\n"
-            output += f"Prompt tokens: {prompt_tokens}\n"
-            output += f"Response tokens: {completion_tokens}\n"
-            output += f"Total tokens: {total_tokens}"
-            return output
 
+def format_chat_result(result):
+    """Response text plus token usage, for call_llm."""
+    message = result["choices"][0]["message"]
+    content = message.get("content", "") or ""
+
+    # Some reasoning models (like kimi-k2.5) may put thinking in reasoning_content
+    reasoning = message.get("reasoning_content", "")
+    if reasoning and not content:
+        content = reasoning
+
+    # Also show some metadata for educational purposes
+    usage = result.get("usage", {})
+    prompt_tokens = usage.get("prompt_tokens", "?")
+    completion_tokens = usage.get("completion_tokens", "?")
+    total_tokens = usage.get("total_tokens", "?")
+    model = result.get("model", DEFAULT_MODEL)
+
+    output = f"{content}\n\n"
+    output += f"--- API Response Metadata ---\n"
+    output += f"Model: {model}\n"
+    output += f"Prompt tokens: {prompt_tokens}\n"
+    output += f"Response tokens: {completion_tokens}\n"
+    output += f"Total tokens: {total_tokens}"
+    return output
+
+
+def format_json_result(result):
+    """The raw response, pretty-printed, for call_llm_from_json."""
+    return json.dumps(result, indent=2)
+
+
+def format_http_error(status, error_body, api_key):
+    if status == 401:
+        masked_key = api_key[:6] + "..." + api_key[-4:] if len(api_key) > 10 else "(short)"
+        return f"API Error (401): Authentication failed. Key: {masked_key}. The key may be expired — generate a new one at platform.moonshot.cn"
+    return f"API Error ({status}): {error_body}"
+
+
+def _post(payload, api_key):
+    """POST a chat completion request with urllib. Returns the decoded JSON response."""
+    data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(LLM_CHAT_URL, data=data, headers=request_headers(api_key), method="POST")
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def call_llm(user_input, system_prompt=None):
+    """Call Moonshot API with user input and return response text."""
+    api_key = os.environ.get("LLM_API_KEY", "")
+    error = check_api_key(api_key)
+    if error:
+        return error
+
+    try:
+        return format_chat_result(_post(chat_payload(user_input, system_prompt), api_key))
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8") if e.readable() else ""
-        if e.code == 401:
-            masked_key = api_key[:6] + "..." + api_key[-4:] if len(api_key) > 10 else "(short)"
-            return f"API Error (401): Authentication failed. Key: {masked_key}. The key may be expired — generate a new one at platform.moonshot.cn"
-        return f"API Error ({e.code}): {error_body}"
+        return format_http_error(e.code, error_body, api_key)
     except urllib.error.URLError as e:
         return f"Connection Error: {e.reason}"
     except Exception as e:
@@ -93,33 +137,15 @@ def call_llm_from_json(json_input):
     if not api_key:
         return "Error: No API key configured. Please set LLM_API_KEY environment variable."
 
-    try:
-        payload = json.loads(json_input)
-    except json.JSONDecodeError as e:
-        return f"Invalid JSON: {e}"
-
-    # Override model if not provided
-    if "model" not in payload:
-        payload["model"] = DEFAULT_MODEL
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}"
-    }
+    payload, error = json_payload(json_input)
+    if error:
+        return error
 
     try:
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(LLM_CHAT_URL, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            return json.dumps(result, indent=2)
-
+        return format_json_result(_post(payload, api_key))
     except urllib.error.HTTPError as e:
         error_body = e.read().decode("utf-8") if e.readable() else ""
-        if e.code == 401:
-            masked_key = api_key[:6] + "..." + api_key[-4:] if len(api_key) > 10 else "(short)"
-            return f"API Error (401): Authentication failed. Key: {masked_key}. The key may be expired — generate a new one at platform.moonshot.cn"
-        return f"API Error ({e.code}): {error_body}"
+        return format_http_error(e.code, error_body, api_key)
     except Exception as e:
         return f"Error: {str(e)}"
 
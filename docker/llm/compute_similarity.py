@@ -5,66 +5,355 @@ ABOUTME: Used for lesson 02 — demonstrates how LLMs understand meaning through
 
 Students pick two sentences by number and see the similarity score.
 Input format: "1 5" (two sentence numbers) or "1,5"
+Also: "top 5 similar to 3", "matrix" (or "matrix 0 3 8"), "search: kitten dogs"
 """
 
 import sys
 import json
+import re
 import numpy as np
 import os
 
-EMBEDDINGS_FILE = "/data/embeddings.json"
+from ivf_index import IVFIndex
+
+# /data in the grader image; the subprocess grader points this at docker/llm/embeddings.npy
+EMBEDDINGS_FILE = os.environ.get("EMBEDDINGS_FILE", "/data/embeddings.npy")
+
+# Clusters an IVF index search visits (see bench_similarity.py for recall vs latency)
+NPROBE = int(os.environ.get("IVF_NPROBE", "8"))
+
+# Neighbours shown by "similar to N" when no count is given
+DEFAULT_TOP_K = 5
+# Largest matrix printed; bigger sets show the first MATRIX_MAX sentences
+MATRIX_MAX = 20
+# Sentences printed by "list"
+LIST_MAX = 50
+# Words that appear in almost every sentence and say nothing about its meaning
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "to", "was", "were", "with",
+}
+
+TOP_PATTERN = re.compile(r"top\s*(\d*)\s+(?:similar\s+)?(?:to\s+)?(\d+)$|(?:most\s+)?similar\s+to\s+(\d+)$")
+MATRIX_PATTERN = re.compile(r"matrix\b([\d\s,]*)$")
+SEARCH_PATTERN = re.compile(r"(?:search|find)\b\s*:?\s*(.*)$")
+
+_embeddings = None
+
+
+def sentences_path(path):
+    """The sentence index stored next to an embeddings matrix: embeddings.npy -> embeddings.sentences.json."""
+    return os.path.splitext(path)[0] + ".sentences.json"
+
+
+def index_path(path):
+    """The optional IVF index stored next to an embeddings matrix: embeddings.npy -> embeddings.ivf.npz."""
+    return os.path.splitext(path)[0] + ".ivf.npz"
+
+
+class EmbeddingStore:
+    """Sentence texts plus a float32 matrix with one unit-length row per sentence.
+
+    Rows are normalized when the store is written, so cosine similarity is a
+    plain dot product. The matrix is memory-mapped: loading is O(1) and every
+    process reading the same file shares its pages.
+
+    Large corpora also carry an IVFIndex, which top_k() uses instead of
+    scoring every sentence.
+    """
+
+    def __init__(self, vectors, texts, index=None):
+        if len(texts) != vectors.shape[0]:
+            raise ValueError(f"{vectors.shape[0]} vectors but {len(texts)} sentences")
+        self.vectors = vectors
+        self.texts = texts
+        self.index = index
+        self._words = None  # {word: ids of sentences containing it}, built on first search
+
+    def __len__(self):
+        return len(self.texts)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    @classmethod
+    def load(cls, path):
+        vectors = np.load(path, mmap_mode="r")
+        with open(sentences_path(path)) as f:
+            texts = json.load(f)["sentences"]
+        index = IVFIndex.load(index_path(path)) if os.path.exists(index_path(path)) else None
+        return cls(vectors, texts, index)
+
+    @classmethod
+    def from_vectors(cls, vectors, texts):
+        """Build a store from raw vectors, normalizing each row."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return cls(vectors / np.maximum(norms, np.finfo(np.float32).tiny), list(texts))
+
+    def save(self, path):
+        np.save(path, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(sentences_path(path), "w") as f:
+            json.dump({"dim": self.dim, "sentences": self.texts}, f, indent=2)
+        if self.index is not None:
+            self.index.save(index_path(path))
+
+    def grouped_by(self, index):
+        """A copy of this store with rows reordered so each of index's clusters is contiguous.
+
+        Sentence numbers change; the returned store carries the index.
+        """
+        order = index.ids
+        grouped = IVFIndex(index.centroids, np.arange(len(order), dtype=order.dtype), index.offsets)
+        return EmbeddingStore(self.vectors[order], [self.texts[i] for i in order], grouped)
+
+    def similarity(self, i, j):
+        """Cosine similarity between sentences i and j."""
+        return float(np.dot(self.vectors[i], self.vectors[j]))
+
+    def scores(self, query):
+        """Cosine similarity of every sentence with a unit query vector, in one matrix-vector product."""
+        return self.vectors @ np.asarray(query, dtype=np.float32)
+
+    def top_k(self, query, k, exclude=(), exact=False, nprobe=NPROBE):
+        """The k sentences most similar to a unit query vector as [(index, score)], best first.
+
+        With an index (and not exact), only the sentences in the nprobe
+        clusters nearest the query are scored, so rare true neighbours
+        elsewhere can be missed.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if self.index is None or exact:
+            ids = np.arange(len(self))
+            scores = self.scores(query)
+        else:
+            ids, scores = self.index.search(self.vectors, query, nprobe)
+        scores[np.isin(ids, list(exclude))] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def matrix(self, indices):
+        """Pairwise cosine similarities of the given sentences."""
+        rows = self.vectors[indices]
+        return rows @ rows.T
+
+    def _word_index(self):
+        if self._words is None:
+            words = {}
+            for i, text in enumerate(self.texts):
+                for word in set(text_words(text)):
+                    words.setdefault(word, []).append(i)
+            self._words = {word: np.array(ids) for word, ids in words.items()}
+        return self._words
+
+    def embed_text(self, text):
+        """Place free text in the sentences' vector space.
+
+        There is no embedding model at grading time, so each word is
+        represented by the mean vector of the sentences containing it (or a
+        word sharing its stem, e.g. rain/raining), and the text by the mean of
+        its words.
+
+        Returns:
+            (unit vector or None if no word is known, {word: matched words}, unknown words)
+        """
+        index = self._word_index()
+        known, unknown, word_vectors = {}, [], []
+        for word in dict.fromkeys(text_words(text)):
+            matches = [word] if word in index else [
+                w for w in index if min(len(w), len(word)) >= 3 and (w.startswith(word) or word.startswith(w))
+            ]
+            if not matches:
+                unknown.append(word)
+                continue
+            known[word] = matches
+            ids = np.unique(np.concatenate([index[w] for w in matches]))
+            word_vectors.append(self.vectors[ids].mean(axis=0))
+        if not word_vectors:
+            return None, known, unknown
+        vector = np.mean(word_vectors, axis=0)
+        return vector / np.linalg.norm(vector), known, unknown
+
+
+def text_words(text):
+    """Lowercase words of text, without stopwords."""
+    return [w for w in re.findall(r"[a-z0-9']+", text.lower()) if w not in STOPWORDS]
 
 
 def load_embeddings():
-    """Load pre-computed sentence embeddings."""
-    with open(EMBEDDINGS_FILE) as f:
-        return json.load(f)
+    """Open the pre-computed sentence embeddings (once per process)."""
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = EmbeddingStore.load(EMBEDDINGS_FILE)
+    return _embeddings
 
 
-def cosine_similarity(a, b):
-    """Compute cosine similarity between two vectors."""
-    a = np.array(a)
-    b = np.array(b)
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+def warm_up():
+    load_embeddings()
+
+
+def _sentence_list(sentences):
+    output = "Available sentences:\n"
+    for i, s in enumerate(sentences[:LIST_MAX]):
+        output += f"  [{i}] \"{s}\"\n"
+    if len(sentences) > LIST_MAX:
+        output += f"  ... and {len(sentences) - LIST_MAX} more\n"
+    return output
+
+
+MORE_MODES = (
+    "\n\nMore ways to explore:\n"
+    "  top 5 similar to 3   the 5 nearest neighbours of sentence 3\n"
+    "  matrix               similarity of every pair at once (or: matrix 0 3 8)\n"
+    "  search: kitten dogs  rank all sentences against your own words"
+)
+
+
+def _out_of_range(store, indices):
+    if any(i >= len(store) for i in indices):
+        return f"Error: Sentence numbers must be between 0 and {len(store)-1}"
+    return None
+
+
+def _ranking(store, ranked):
+    output = ""
+    for rank, (i, score) in enumerate(ranked, 1):
+        output += f"  {rank}. [{i}] {score:.4f}  \"{store.texts[i]}\"\n"
+    return output
+
+
+def _scoring_note(store, target):
+    if store.index is None:
+        return f"One matrix-vector product scores all {len(store)} sentences against {target} at once;\n"
+    return (f"An IVF index compares {target} with {store.index.n_lists} cluster centres and scores only\n"
+            f"the sentences in the {min(NPROBE, store.index.n_lists)} closest clusters (out of {len(store)});\n")
+
+
+def top_similar(store, idx, k):
+    """The k nearest neighbours of sentence idx."""
+    error = _out_of_range(store, [idx])
+    if error:
+        return error
+    ranked = store.top_k(store.vectors[idx], k, exclude=[idx])
+
+    output = f"Top {len(ranked)} sentences by cosine similarity to [{idx}]: \"{store.texts[idx]}\"\n\n"
+    output += _ranking(store, ranked)
+    output += f"\n--- How This Works ---\n"
+    output += _scoring_note(store, f"[{idx}]")
+    output += f"the highest scores are its nearest neighbours in vector space.\n"
+    output += f"This is the retrieval step of RAG: find the documents closest to a question."
+    return output
+
+
+def similarity_matrix(store, indices):
+    """Pairwise similarity table for the chosen sentences (default: all, up to MATRIX_MAX)."""
+    note = ""
+    if not indices:
+        indices = list(range(min(len(store), MATRIX_MAX)))
+        if len(store) > MATRIX_MAX:
+            note = f"(first {MATRIX_MAX} of {len(store)} sentences; pick others with e.g. 'matrix 0 3 8')\n"
+    indices = list(dict.fromkeys(indices))[:MATRIX_MAX]
+    error = _out_of_range(store, indices)
+    if error:
+        return error
+    matrix = store.matrix(indices)
+
+    width = max(5, len(str(max(indices))) + 1)
+    output = f"Cosine similarity matrix:\n{note}\n"
+    output += " " * width + "".join(f"{i:>{width + 1}}" for i in indices) + "\n"
+    for i, row in zip(indices, matrix):
+        output += f"{i:>{width}}" + "".join(f"{v:>{width + 1}.2f}" for v in row) + "\n"
+    output += "\n"
+    for i in indices:
+        output += f"  [{i}] \"{store.texts[i]}\"\n"
+    output += f"\n--- How This Works ---\n"
+    output += f"Every score above comes from one matrix product of the normalized vectors with themselves.\n"
+    output += f"The diagonal is 1.00 (each sentence is identical to itself); look for bright blocks of similar topics."
+    return output
+
+
+def search(store, query, k=DEFAULT_TOP_K):
+    """Rank the sentences against free text."""
+    vector, known, unknown = store.embed_text(query)
+    if vector is None:
+        output = f"None of the words in \"{query}\" appear in the sentence set, so the query can't be placed in vector space.\n"
+        output += f"Try words from the sentences, e.g.: search: python programming\n\n"
+        return output + _sentence_list(store.texts).rstrip("\n")
+
+    ranked = store.top_k(vector, k)
+    output = f"Query: \"{query}\"\n"
+    used = [w if matches == [w] else f"{w} ({'/'.join(matches)})" for w, matches in known.items()]
+    output += f"Words used: {', '.join(used)}\n"
+    if unknown:
+        output += f"Not in the sentence vocabulary (ignored): {', '.join(unknown)}\n"
+    output += f"\nTop {len(ranked)} sentences by cosine similarity:\n\n"
+    output += _ranking(store, ranked)
+    output += f"\n--- How This Works ---\n"
+    output += f"A real system embeds the query with the same model as the documents.\n"
+    output += f"Here each word's vector is the average of the sentences that contain it, and the query is the average of its words.\n"
+    output += _scoring_note(store, "the query").rstrip(";\n") + "."
+    return output
+
+
+def _command(store, user_input):
+    """Output for a "top", "matrix" or "search" line in the input, or None."""
+    for line in user_input.lower().splitlines():
+        line = line.strip()
+        match = TOP_PATTERN.match(line)
+        if match:
+            if match.group(3):
+                return top_similar(store, int(match.group(3)), DEFAULT_TOP_K)
+            k = int(match.group(1)) if match.group(1) else DEFAULT_TOP_K
+            return top_similar(store, int(match.group(2)), max(k, 1))
+        match = MATRIX_PATTERN.match(line)
+        if match:
+            return similarity_matrix(store, [int(n) for n in re.findall(r"\d+", match.group(1))])
+        match = SEARCH_PATTERN.match(line)
+        if match:
+            if not match.group(1).strip():
+                return "Please type some words to search for, e.g.: search: kitten dogs"
+            return search(store, match.group(1).strip())
+    return None
 
 
 def compute(user_input):
     """Parse user input, look up sentences, compute similarity."""
-    data = load_embeddings()
-    sentences = data["sentences"]
+    store = load_embeddings()
+    sentences = store.texts
 
     # Show available sentences if input is "list" or empty
     if not user_input or user_input.strip().lower() == "list":
-        output = "Available sentences:\n"
-        for i, s in enumerate(sentences):
-            output += f"  [{i}] \"{s['text']}\"\n"
+        output = _sentence_list(sentences)
         output += f"\nType two numbers to compare, e.g.: 0 3"
+        return output + MORE_MODES
+
+    output = _command(store, user_input)
+    if output is not None:
         return output
 
     # Parse two numbers from input
-    import re
     numbers = re.findall(r'\d+', user_input)
 
     if len(numbers) < 2:
         output = "Please enter two sentence numbers to compare.\n\n"
-        output += "Available sentences:\n"
-        for i, s in enumerate(sentences):
-            output += f"  [{i}] \"{s['text']}\"\n"
+        output += _sentence_list(sentences)
         output += f"\nExample: 0 3"
-        return output
+        return output + MORE_MODES
 
     idx_a, idx_b = int(numbers[0]), int(numbers[1])
 
     if idx_a >= len(sentences) or idx_b >= len(sentences) or idx_a < 0 or idx_b < 0:
         return f"Error: Sentence numbers must be between 0 and {len(sentences)-1}"
 
-    sent_a = sentences[idx_a]
-    sent_b = sentences[idx_b]
-
-    sim = cosine_similarity(sent_a["embedding"], sent_b["embedding"])
+    sim = store.similarity(idx_a, idx_b)
 
-    output = f"Sentence A [{idx_a}]: \"{sent_a['text']}\"\n"
-    output += f"Sentence B [{idx_b}]: \"{sent_b['text']}\"\n\n"
+    output = f"Sentence A [{idx_a}]: \"{sentences[idx_a]}\"\n"
+    output += f"Sentence B [{idx_b}]: \"{sentences[idx_b]}\"\n\n"
     output += f"Cosine similarity: {sim:.4f}\n\n"
 
     if sim > 0.85:
@@ -77,7 +366,7 @@ def compute(user_input):
         output += f"Very different meanings. These sentences are far apart in vector space.\n"
 
     output += f"\n--- How This Works ---\n"
-    output += f"Each sentence is converted to a vector of {len(sent_a['embedding'])} numbers.\n"
+    output += f"Each sentence is converted to a vector of {store.dim} numbers.\n"
     output += f"Cosine similarity measures the angle between vectors.\n"
     output += f"1.0 = identical meaning, 0.0 = completely unrelated, -1.0 = opposite.\n"
     output += f"This is how search engines and RAG systems find relevant documents."
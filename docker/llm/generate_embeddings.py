@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
 """
 ABOUTME: Generates pre-computed sentence embeddings for the similarity lesson.
-ABOUTME: Run this ONCE to create embeddings.json. Not included in Docker image.
+ABOUTME: Run this ONCE to create embeddings.npy + embeddings.sentences.json. Not included in Docker image.
 
 Uses carefully constructed vectors so that:
 - Semantically similar sentences have high cosine similarity (>0.85)
 - Related but different sentences have moderate similarity (0.4-0.7)
 - Unrelated sentences have low similarity (<0.3)
+
+With --sentences N it instead builds a synthetic corpus of N sentences at a
+realistic dimension (e.g. --sentences 100000 --dim 384) plus an IVF index
+(embeddings.ivf.npz), for trying nearest-neighbour search at scale.
 """
 
-import json
+import argparse
+
 import numpy as np
 
+from compute_similarity import EmbeddingStore, text_words
+from ivf_index import IVFIndex, _normalize
+
+OUTPUT_FILE = "embeddings.npy"
+
 # Sentences grouped by topic (similar ones near each other)
 SENTENCES = [
     # Group 0: Animals / pets
@@ -49,7 +59,7 @@ SENTENCES = [
 DIM = 64  # Embedding dimension (small for demo, real models use 768-3072)
 
 
-def generate():
+def generate(out=OUTPUT_FILE):
     np.random.seed(42)
 
     # Create base vectors for each group
@@ -79,14 +89,63 @@ def generate():
         sim = np.dot(SENTENCES[i]["embedding"], SENTENCES[j]["embedding"])
         print(f"  [{i}] vs [{j}] (diff group): {sim:.4f}")
 
-    # Save
-    output = {"sentences": [{"text": s["text"], "embedding": s["embedding"]} for s in SENTENCES]}
+    # Save: float32 matrix of unit vectors + sentence index (see compute_similarity.EmbeddingStore)
+    store = EmbeddingStore.from_vectors([s["embedding"] for s in SENTENCES], [s["text"] for s in SENTENCES])
+    store.save(out)
 
-    with open("embeddings.json", "w") as f:
-        json.dump(output, f, indent=2)
+    print(f"\nSaved {len(SENTENCES)} sentences with {DIM}-dim embeddings to {out}")
 
-    print(f"\nSaved {len(SENTENCES)} sentences with {DIM}-dim embeddings to embeddings.json")
+
+def generate_corpus(n, dim, seed=42):
+    """A synthetic store of n sentences in clusters: lesson group -> topic -> sentence.
+
+    Texts are random words from the group's lesson sentences, so "search:"
+    still works; vectors are unit length, float32.
+    """
+    rng = np.random.default_rng(seed)
+    num_groups = max(s["group"] for s in SENTENCES) + 1
+    group_words = [sorted({w for s in SENTENCES if s["group"] == g for w in text_words(s["text"])})
+                   for g in range(num_groups)]
+
+    # Noise vectors of length ~1: topics sit ~45 degrees from their group, sentences ~45 from their topic
+    num_topics = max(1, n // 100)
+    group_vectors = _normalize(rng.standard_normal((num_groups, dim)))
+    topic_groups = rng.integers(num_groups, size=num_topics)
+    topic_vectors = _normalize(group_vectors[topic_groups] + rng.standard_normal((num_topics, dim)) / np.sqrt(dim))
+    sentence_topics = rng.integers(num_topics, size=n)
+
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 10000):
+        topics = sentence_topics[start:start + 10000]
+        noise = rng.standard_normal((len(topics), dim), dtype=np.float32) * np.float32(1.0 / np.sqrt(dim))
+        vectors[start:start + len(topics)] = _normalize(topic_vectors[topics].astype(np.float32) + noise)
+
+    texts = []
+    for topic in sentence_topics:
+        words = group_words[topic_groups[topic]]
+        texts.append(" ".join(rng.choice(words, size=6)) + f" (topic {topic})")
+    return EmbeddingStore(vectors, texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sentence embeddings for compute_similarity.")
+    parser.add_argument("--sentences", type=int, help="build a synthetic corpus of this many sentences")
+    parser.add_argument("--dim", type=int, default=384, help="corpus embedding dimension (default 384)")
+    parser.add_argument("--lists", type=int, help="IVF clusters (default: sqrt of the sentence count)")
+    parser.add_argument("--out", default=OUTPUT_FILE, help=f"output .npy path (default {OUTPUT_FILE})")
+    args = parser.parse_args()
+
+    if args.sentences is None:
+        generate(args.out)
+        return
+
+    store = generate_corpus(args.sentences, args.dim)
+    print(f"Building IVF index for {len(store)} sentences...")
+    store = store.grouped_by(IVFIndex.build(store.vectors, args.lists))
+    store.save(args.out)
+    print(f"Saved {len(store)} sentences with {store.dim}-dim embeddings and "
+          f"a {store.index.n_lists}-list IVF index to {args.out}")
 
 
 if __name__ == "__main__":
-    generate()
+    main()
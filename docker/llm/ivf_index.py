@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+ABOUTME: Inverted-file (IVF) approximate nearest-neighbour index over unit vectors, in pure numpy.
+ABOUTME: Built by generate_embeddings.py for large corpora; queried by compute_similarity.
+
+Sentences are clustered with spherical k-means. A query is compared with the
+cluster centroids first, and only the sentences in the `nprobe` closest
+clusters are scored, so a search touches roughly nprobe / n_lists of the data.
+When the embedding matrix is stored grouped by cluster (see
+EmbeddingStore.grouped_by), each cluster is a contiguous slice and is scored
+without copying.
+"""
+
+import numpy as np
+
+# Rows scored per matrix product while assigning vectors, to bound temporary memory
+CHUNK = 8192
+# k-means runs on a sample of this many points per cluster (faiss uses a similar rule)
+SAMPLE_PER_LIST = 40
+KMEANS_ITERATIONS = 10
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _nearest(vectors, centroids):
+    """Index of the most similar centroid for each row, computed in chunks."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), CHUNK):
+        chunk = np.asarray(vectors[start:start + CHUNK], dtype=np.float32)
+        assign[start:start + CHUNK] = (chunk @ centroids.T).argmax(axis=1)
+    return assign
+
+
+class IVFIndex:
+    """Cluster centroids plus sentence ids grouped by cluster.
+
+    The ids of cluster c are ids[offsets[c]:offsets[c + 1]].
+    """
+
+    def __init__(self, centroids, ids, offsets):
+        self.centroids = centroids
+        self.ids = ids
+        self.offsets = offsets
+        # Rows stored in cluster order: cluster c is rows offsets[c]:offsets[c + 1]
+        self.contiguous = bool(np.array_equal(ids, np.arange(len(ids))))
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, seed=0):
+        """Cluster unit vectors (an array or memmap) into n_lists lists (default sqrt(n))."""
+        rng = np.random.default_rng(seed)
+        n = len(vectors)
+        n_lists = min(n, n_lists or max(1, int(np.sqrt(n))))
+
+        sample_ids = np.sort(rng.choice(n, min(n, n_lists * SAMPLE_PER_LIST), replace=False))
+        sample = np.asarray(vectors[sample_ids], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assign = _nearest(sample, centroids)
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=n_lists)
+            filled = np.flatnonzero(counts)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            centroids[filled] = _normalize(sums)
+            # Re-seed empty clusters with random sample points
+            empty = np.flatnonzero(counts == 0)
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+
+        assign = _nearest(vectors, centroids)
+        ids = np.argsort(assign, kind="stable").astype(np.int32)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=n_lists)))).astype(np.int64)
+        return cls(centroids, ids, offsets)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["centroids"], data["ids"], data["offsets"])
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, centroids=self.centroids, ids=self.ids, offsets=self.offsets)
+
+    def probe(self, query, nprobe):
+        """The nprobe clusters closest to a unit query vector, in storage order."""
+        nprobe = min(nprobe, self.n_lists)
+        scores = self.centroids @ query
+        return np.sort(np.argpartition(-scores, nprobe - 1)[:nprobe])
+
+    def search(self, vectors, query, nprobe):
+        """Score the sentences in the nprobe closest clusters.
+
+        Returns:
+            (sentence ids, cosine similarities) for every candidate
+        """
+        lists = self.probe(query, nprobe)
+        if self.contiguous:
+            ranges = [(self.offsets[c], self.offsets[c + 1]) for c in lists]
+            ids = np.concatenate([np.arange(start, end) for start, end in ranges])
+            scores = np.concatenate([vectors[start:end] @ query for start, end in ranges])
+            return ids, scores
+        # Sorted ids read the memory-mapped matrix front to back
+        ids = np.sort(np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in lists]))
+        return ids, vectors[ids] @ query
@@ -3,51 +3,54 @@
 ABOUTME: Dispatcher for LLM tutorial grading.
 ABOUTME: Reads /tmp/llm_mode to determine which tool to run on /tmp/user_input.
 Modes: call-llm, tokenize, similarity, echo
+The subprocess grader points LLM_MODE_FILE / LLM_INPUT_FILE at per-sandbox files,
+or calls run() directly from a warm worker (app/tool_pool.py).
 """
 
 import sys
 import os
 
-def main():
-    mode_file = "/tmp/llm_mode"
-    # Check both paths: Docker uses /tmp/user_input, subprocess uses /tmp/grader-user-input
-    input_file = "/tmp/user_input"
-    if not os.path.exists(input_file):
-        input_file = "/tmp/grader-user-input"
-
-    if not os.path.exists(mode_file):
-        print("Error: No mode set. Missing /tmp/llm_mode")
-        sys.exit(1)
-
-    if not os.path.exists(input_file):
-        print("Error: No input. Missing /tmp/user_input")
-        sys.exit(1)
-
-    mode = open(mode_file).read().strip()
-    user_input = open(input_file).read().strip()
-
+def run(mode, user_input):
+    """Run the tool selected by mode on user_input. Returns (exit_code, output)."""
     if mode == "call-llm":
         from call_llm import call_llm
-        result = call_llm(user_input)
-        print(result)
+        return 0, call_llm(user_input)
 
     elif mode == "tokenize":
         from tokenize_text import tokenize
-        result = tokenize(user_input)
-        print(result)
+        return 0, tokenize(user_input)
 
     elif mode == "similarity":
         from compute_similarity import compute
-        result = compute(user_input)
-        print(result)
+        return 0, compute(user_input)
 
     elif mode == "echo":
         # Just echo back the input (for validation-only lessons)
-        print(user_input)
+        return 0, user_input
 
     else:
-        print(f"Unknown mode: {mode}")
+        return 1, f"Unknown mode: {mode}"
+
+
+def main():
+    mode_file = os.environ.get("LLM_MODE_FILE", "/tmp/llm_mode")
+    input_file = os.environ.get("LLM_INPUT_FILE", "/tmp/user_input")
+
+    if not os.path.exists(mode_file):
+        print("Error: No mode set. Missing /tmp/llm_mode")
+        sys.exit(1)
+
+    if not os.path.exists(input_file):
+        print("Error: No input. Missing /tmp/user_input")
         sys.exit(1)
 
+    mode = open(mode_file).read().strip()
+    user_input = open(input_file).read().strip()
+
+    exit_code, output = run(mode, user_input)
+    print(output)
+    if exit_code:
+        sys.exit(exit_code)
+
 if __name__ == "__main__":
     main()
@@ -4,24 +4,57 @@ ABOUTME: Tokenizes text using tiktoken and shows splits, IDs, and count.
 ABOUTME: Used for lesson 01 — real tokenization demonstration.
 """
 
+import functools
 import sys
 import tiktoken
 
+# cl100k_base is used by GPT-4, similar to what most modern LLMs use
+ENCODING_NAME = "cl100k_base"
+# Recent inputs -> formatted output; long inputs are not cached to bound memory
+CACHE_SIZE = 128
+CACHE_MAX_CHARS = 4096
+
+_encoding = None
+
+
+def get_encoding():
+    """The tokenizer, loaded once per process."""
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding(ENCODING_NAME)
+    return _encoding
+
+
+def warm_up():
+    """Load the encoding ahead of the first request."""
+    get_encoding()
+
 
 def tokenize(text):
     """Tokenize text and return formatted output showing splits, IDs, and count."""
-    # Use cl100k_base encoding (used by GPT-4, similar to what most modern LLMs use)
-    enc = tiktoken.get_encoding("cl100k_base")
+    if len(text) <= CACHE_MAX_CHARS:
+        return _tokenize_cached(text)
+    return _tokenize(text)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _tokenize_cached(text):
+    return _tokenize(text)
+
+
+def _tokenize(text):
+    enc = get_encoding()
 
     tokens = enc.encode(text)
-    decoded = [enc.decode([t]) for t in tokens]
+    # One call for all token strings; invalid UTF-8 fragments show as U+FFFD like enc.decode([t])
+    decoded = [b.decode("utf-8", errors="replace") for b in enc.decode_tokens_bytes(tokens)]
 
-    output = f"Input text: \"{text}\"\n\n"
-    output += f"Token splits:\n"
+    lines = [f"Input text: \"{text}\"\n\n", "Token splits:\n"]
     for i, (token_id, token_text) in enumerate(zip(tokens, decoded)):
         # Show the token text with visible representation of spaces
         visible = token_text.replace(" ", "\u2581")  # Use underscore for spaces
-        output += f"  [{i}] \"{visible}\" (ID: {token_id})\n"
+        lines.append(f"  [{i}] \"{visible}\" (ID: {token_id})\n")
+    output = "".join(lines)
 
     output += f"\nTotal tokens: {len(tokens)}\n"
     output += f"Characters: {len(text)}\n"
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""Export every lesson and menu page as static HTML with fingerprinted assets.
+
+Run: python scripts/export_static.py --out dist
+See "Static Export" in README.md for serving the output with nginx.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from static_export import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,9 @@ VALID_RESULT_TYPES = [
     "integer_greater_than",
     "set_contains",
 ]
+# Types that check either validation_command output ("<type>") or the user's output ("user_output_<type>")
+for _type in ["regex", "normalized_whitespace", "line_set_equal", "numeric_tolerance", "json_equal"]:
+    VALID_RESULT_TYPES += [_type, f"user_output_{_type}"]
 
 def validate_lesson(path: Path) -> list[str]:
     """Validate a single lesson file. Returns list of errors."""
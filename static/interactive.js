@@ -31,44 +31,35 @@ document.addEventListener('DOMContentLoaded', function() {
         checkButton.disabled = true;
         checkButton.textContent = isChat ? 'Sending...' : 'Checking...';
 
+        const body = JSON.stringify({
+            command: command,
+            topic: getCurrentTopic(),
+            lesson: getCurrentLesson()
+        });
+
         try {
-            const response = await fetch('/api/check-answer', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    command: command,
-                    topic: getCurrentTopic(),
-                    lesson: getCurrentLesson()
-                })
-            });
-
-            const data = await response.json();
+            let response = null;
+            if (isChat) {
+                // Chat mode: stream the model's answer as it is generated
+                response = await postAnswer('/api/check-answer/stream', body);
+                if (response.status === 404 || response.status === 405) {
+                    response = null;  // server without the streaming endpoint
+                }
+            }
+            if (!response) {
+                response = await postAnswer('/api/check-answer', body);
+            }
 
             if (!response.ok) {
+                const data = await response.json();
                 showFeedback('Server error: ' + (data.detail || 'Unknown error'), false);
                 return;
             }
 
-            showOutput(data.output);
-
-            if (isChat) {
-                // Chat mode: no correct/incorrect, just show response
-                markLessonCompleted(getCurrentTopic(), getCurrentLesson());
+            if ((response.headers.get('Content-Type') || '').startsWith('text/event-stream')) {
+                await readAnswerStream(response);
             } else {
-                // Check mode: show grading feedback
-                showFeedback(data.feedback_message, data.is_correct);
-
-                if (data.is_correct) {
-                    commandInput.style.borderColor = '#5cb85c';
-                    setTimeout(() => {
-                        commandInput.style.borderColor = '';
-                    }, 3000);
-
-                    // Mark lesson as completed
-                    markLessonCompleted(getCurrentTopic(), getCurrentLesson());
-                }
+                showResult(await response.json());
             }
 
         } catch (error) {
@@ -79,6 +70,80 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    function postAnswer(url, body) {
+        return fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: body
+        });
+    }
+
+    // Read Server-Sent Events: tokens are appended to the console as they arrive
+    async function readAnswerStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        showOutput('');
+
+        while (true) {
+            const { value, done } = await reader.read();
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+            const events = buffer.split('\n\n');
+            buffer = done ? '' : events.pop();
+
+            for (const block of events) {
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event:')) {
+                        event = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        data += line.slice(5).trim();
+                    }
+                }
+                if (!data) {
+                    continue;
+                }
+                const payload = JSON.parse(data);
+                if (event === 'token') {
+                    consoleOutput.textContent += payload.text;
+                } else if (event === 'result') {
+                    showResult(payload);
+                } else if (event === 'error') {
+                    showFeedback('Server error: ' + (payload.detail || 'Unknown error'), false);
+                }
+            }
+
+            if (done) {
+                break;
+            }
+        }
+    }
+
+    function showResult(data) {
+        showOutput(data.output);
+
+        if (isChat) {
+            // Chat mode: no correct/incorrect, just show response
+            markLessonCompleted(getCurrentTopic(), getCurrentLesson());
+        } else {
+            // Check mode: show grading feedback
+            showFeedback(data.feedback_message, data.is_correct);
+
+            if (data.is_correct) {
+                commandInput.style.borderColor = '#5cb85c';
+                setTimeout(() => {
+                    commandInput.style.borderColor = '';
+                }, 3000);
+
+                // Mark lesson as completed
+                markLessonCompleted(getCurrentTopic(), getCurrentLesson());
+            }
+        }
+    }
+
     function showOutput(output) {
         consoleOutput.textContent = output;
         consoleOutput.classList.add('show');
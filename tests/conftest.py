@@ -26,7 +26,7 @@ def mock_container_manager():
     """Mock Docker container manager for testing."""
     with patch('main.container_manager') as mock_manager:
         # Create async mock for execute_code_in_container
-        async def mock_execute(language, user_code, check_logic):
+        async def mock_execute(language, user_code, check_logic, release_slot=None):
             return GradeResult(
                 output="PONG",
                 is_correct=True,
@@ -139,3 +139,154 @@ async def test_container_execution_error(app_client, mock_lesson_file):
 
         assert response.status_code == 500
         assert "error" in response.json()["detail"].lower()
+
+@pytest.mark.asyncio
+async def test_check_answer_grader_busy(app_client, mock_container_manager, mock_lesson_file):
+    """Test 503 with Retry-After when the grading scheduler rejects the request."""
+    from main import SchedulerBusy
+
+    class BusyScheduler:
+        def slot(self, topic):
+            raise SchedulerBusy(topic, "queue full", 7)
+
+    with patch('main.grading_scheduler', BusyScheduler()):
+        response = app_client.post("/api/check-answer", json={
+            "command": "PING",
+            "topic": "redis",
+            "lesson": "00_setup"
+        })
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    mock_container_manager.execute_code_in_container.assert_not_called()
+
+def test_check_answer_rate_limited(app_client, mock_container_manager, mock_lesson_file):
+    """Test 429 with Retry-After once the client's route budget is spent."""
+    from main import RateLimiter
+    from ratelimit import Limit
+
+    limiter = RateLimiter(route_limits={"check-answer": Limit(1, 60)})
+    payload = {"command": "PING", "topic": "redis", "lesson": "00_setup"}
+    with patch('main.rate_limiter', limiter):
+        assert app_client.post("/api/check-answer", json=payload).status_code == 200
+        response = app_client.post("/api/check-answer", json=payload)
+
+    assert response.status_code == 429
+    assert 0 < int(response.headers["retry-after"]) <= 60
+    assert mock_container_manager.execute_code_in_container.call_count == 1
+
+def _sse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_check_answer_stream(app_client, mock_container_manager, mock_lesson_file):
+    """Test the streaming endpoint sends token events, then the graded result."""
+    from grader_schemas import GradeResult
+
+    async def mock_stream(language, user_code, check_logic, release_slot=None):
+        yield "token", "PO"
+        yield "token", "NG"
+        yield "result", GradeResult(output="PONG", is_correct=True, feedback_message="Correct!")
+
+    mock_container_manager.stream_code_in_container = mock_stream
+    response = app_client.post("/api/check-answer/stream", json={
+        "command": "PING",
+        "topic": "redis",
+        "lesson": "00_setup"
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _sse_events(response.text) == [
+        ("token", {"text": "PO"}),
+        ("token", {"text": "NG"}),
+        ("result", {"output": "PONG", "is_correct": True, "feedback_message": "Correct!"}),
+    ]
+
+def test_check_answer_stream_error_event(app_client, mock_container_manager, mock_lesson_file):
+    """Test a grading failure after the stream started arrives as an error event."""
+    async def mock_stream(language, user_code, check_logic, release_slot=None):
+        yield "token", "partial"
+        raise RuntimeError("container died")
+
+    mock_container_manager.stream_code_in_container = mock_stream
+    response = app_client.post("/api/check-answer/stream", json={
+        "command": "PING",
+        "topic": "redis",
+        "lesson": "00_setup"
+    })
+
+    assert response.status_code == 200
+    assert _sse_events(response.text)[-1] == ("error", {"detail": "Error during grading: container died"})
+
+def test_check_answer_stream_grader_busy(app_client, mock_container_manager, mock_lesson_file):
+    """Test a busy scheduler arrives as an error event with the retry delay."""
+    from main import BUSY_DETAIL, SchedulerBusy
+
+    class BusyScheduler:
+        def slot(self, topic):
+            raise SchedulerBusy(topic, "queue full", 7)
+
+    with patch('main.grading_scheduler', BusyScheduler()):
+        response = app_client.post("/api/check-answer/stream", json={
+            "command": "PING",
+            "topic": "redis",
+            "lesson": "00_setup"
+        })
+
+    assert response.status_code == 200
+    assert _sse_events(response.text) == [("error", {"detail": BUSY_DETAIL, "retry_after": 7})]
+
+@pytest.mark.asyncio
+async def test_check_answer_stream_slot_is_taken_by_the_body(mock_container_manager, mock_lesson_file):
+    """Test the scheduler slot is held only while the body is sent, so an unread stream leaks nothing."""
+    from contextlib import asynccontextmanager
+    from grader_schemas import GradeResult
+    from main import CommandRequest, check_answer_stream
+
+    held = []
+
+    class TrackingScheduler:
+        @asynccontextmanager
+        async def slot(self, topic):
+            held.append(topic)
+            try:
+                yield Mock()
+            finally:
+                held.remove(topic)
+
+    async def mock_stream(language, user_code, check_logic, release_slot=None):
+        assert held == ["redis"]
+        yield "result", GradeResult(output="PONG", is_correct=True, feedback_message="Correct!")
+
+    mock_container_manager.stream_code_in_container = mock_stream
+    req = Mock()
+    req.client.host = "10.0.0.9"
+    with patch('main.grading_scheduler', TrackingScheduler()):
+        response = await check_answer_stream(CommandRequest(command="PING", topic="redis", lesson="00_setup"), req)
+        assert held == []  # nothing taken until the body is iterated
+        chunks = [chunk async for chunk in response.body_iterator]
+
+    assert held == []
+    assert _sse_events("".join(chunks))[0][0] == "result"
+
+def test_check_answer_stream_lesson_not_found(app_client, mock_lesson_file):
+    """Test lesson errors keep their status codes on the streaming endpoint."""
+    response = app_client.post("/api/check-answer/stream", json={
+        "command": "PING",
+        "topic": "redis",
+        "lesson": "nonexistent"
+    })
+    assert response.status_code == 404
+
+def test_grading_metrics(app_client):
+    """Test grading metrics expose queue depth per topic."""
+    response = app_client.get("/api/metrics/grading")
+    assert response.status_code == 200
+    data = response.json()
+    assert "llm" in data
+    assert "queued" in data["llm"]
+    assert "running" in data["llm"]
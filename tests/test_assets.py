@@ -0,0 +1,106 @@
+# ABOUTME: Tests for content-hashed static assets in app/assets.py.
+# ABOUTME: Covers fingerprinted URLs, immutable caching, precompressed variants and dev re-hashing.
+
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from assets import AssetManifest, IMMUTABLE_CACHE_CONTROL
+
+
+class TestManifest:
+
+    def test_url_changes_with_content(self, tmp_path):
+        (tmp_path / "app.js").write_text("console.log(1);")
+        first = AssetManifest(tmp_path).static_url("app.js")
+        (tmp_path / "app.js").write_text("console.log(2);")
+        second = AssetManifest(tmp_path).static_url("app.js")
+        assert first.startswith("/static/app.") and first.endswith(".js")
+        assert first != second
+
+    def test_nested_and_unknown_names(self, tmp_path):
+        (tmp_path / "img").mkdir()
+        (tmp_path / "img" / "logo.svg").write_text("<svg/>")
+        manifest = AssetManifest(tmp_path)
+        assert manifest.static_url("img/logo.svg").startswith("/static/img/logo.")
+        assert manifest.static_url("missing.css") == "/static/missing.css"
+
+    def test_auto_reload_rehashes_changed_files(self, tmp_path):
+        path = tmp_path / "app.css"
+        path.write_text("body {}")
+        manifest = AssetManifest(tmp_path, auto_reload=True)
+        before = manifest.static_url("app.css")
+        path.write_text("body { color: red; }")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert manifest.static_url("app.css") != before
+
+    def test_only_text_assets_are_compressed(self, tmp_path):
+        (tmp_path / "app.js").write_text("var x = 1;\n" * 200)
+        (tmp_path / "og.png").write_bytes(os.urandom(2048))
+        manifest = AssetManifest(tmp_path)
+        assert "gzip" in manifest.assets["app.js"].variants
+        assert manifest.assets["og.png"].variants == {}
+
+
+class TestServing:
+
+    def test_templates_link_fingerprinted_assets(self, app_client):
+        import main
+
+        response = app_client.get("/tutorial/redis/00_setup")
+        assert main.assets.static_url("interactive.js") in response.text
+        assert main.assets.static_url("styles.css") in response.text
+        assert "?v=" not in response.text
+
+    def test_hashed_asset_is_immutable_and_precompressed(self, app_client):
+        import main
+
+        url = main.assets.static_url("interactive.js")
+        response = app_client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/javascript")
+        assert response.content == (main.base_dir / "static" / "interactive.js").read_bytes()
+        raw = main.assets.assets["interactive.js"].variants["gzip"]
+        assert gzip.decompress(raw) == response.content
+
+    def test_hashed_asset_conditional_get(self, app_client):
+        import main
+
+        url = main.assets.static_url("styles.css")
+        etag = app_client.get(url).headers["etag"]
+        assert app_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_conditional_get_parses_lists_and_weak_tags(self, app_client):
+        import main
+
+        url = main.assets.static_url("styles.css")
+        identity = {"Accept-Encoding": "identity"}
+        etag = app_client.get(url, headers=identity).headers["etag"]
+        for if_none_match in (f'"stale", {etag}', f"W/{etag}", "*"):
+            response = app_client.get(url, headers={**identity, "If-None-Match": if_none_match})
+            assert response.status_code == 304
+        assert app_client.get(url, headers={**identity, "If-None-Match": '"stale"'}).status_code == 200
+
+    def test_each_encoding_has_its_own_etag(self, app_client):
+        import main
+
+        url = main.assets.static_url("interactive.js")
+        identity = app_client.get(url, headers={"Accept-Encoding": "identity"}).headers["etag"]
+        gzipped = app_client.get(url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        assert gzipped == identity[:-1] + '-gzip"'
+        # A cached gzip body does not validate the identity representation
+        response = app_client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": gzipped})
+        assert response.status_code == 200
+
+    def test_plain_names_still_served(self, app_client):
+        response = app_client.get("/static/og-image.png")
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+    def test_stale_hash_is_404(self, app_client):
+        assert app_client.get("/static/interactive.000000000000.js").status_code == 404
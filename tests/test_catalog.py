@@ -0,0 +1,205 @@
+# ABOUTME: Tests for the in-memory lesson catalog in app/catalog.py.
+# ABOUTME: Covers ordering, translation merges, style/language fallbacks and broken files.
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from catalog import CatalogError, LessonCatalog, LessonLoadError
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return LessonCatalog(BASE_DIR)
+
+
+class TestRealCatalog:
+
+    def test_all_topics_loaded(self, catalog):
+        for topic in ["redis", "sql", "git", "docker", "llm", "bash"]:
+            assert catalog.has_topic(topic)
+            on_disk = sorted(p.stem for p in (BASE_DIR / "tutorials" / topic).glob("*.json"))
+            assert catalog.topics[topic] == on_disk
+
+    def test_languages_discovered(self, catalog):
+        assert catalog.languages[0] == "en"
+        assert "sl" in catalog.languages
+
+    def test_prev_next_ordering(self, catalog):
+        lessons = catalog.topics["redis"]
+        first = catalog.lesson_page("redis", lessons[0])
+        last = catalog.lesson_page("redis", lessons[-1])
+        assert first["prev_lesson"] is None
+        assert first["next_lesson"] == lessons[1]
+        assert last["next_lesson"] is None
+        assert last["lesson_number"] == len(lessons) == last["total_lessons"]
+
+    def test_translation_merged(self, catalog):
+        page = catalog.lesson_page("redis", "00_setup", lang="sl", style="detective_noir")
+        assert page["tutorial"] == "Osnove Redis"
+        assert page["lang"] == "sl"
+        # English source is untouched by the merge
+        assert catalog.lesson("redis", "00_setup")["tutorial"] == "Redis Basics"
+
+    def test_unknown_language_falls_back_to_english(self, catalog):
+        page = catalog.lesson_page("redis", "00_setup", lang="xx")
+        assert page["tutorial"] == "Redis Basics"
+        assert page["lang"] == "xx"
+
+    def test_style_selection_and_fallback(self, catalog):
+        sci_fi = catalog.lesson_page("redis", "00_setup", style="sci_fi")
+        unknown = catalog.lesson_page("redis", "00_setup", style="no_such_style")
+        noir = catalog.lesson_page("redis", "00_setup", style="detective_noir")
+        assert sci_fi["title"] != noir["title"]
+        assert unknown["title"] == noir["title"]  # first style
+        assert unknown["current_style"] == "no_such_style"
+
+    def test_menu(self, catalog):
+        menu = catalog.menu("redis", lang="en", style="sci_fi")
+        assert menu["tutorial_name"] == "Redis Basics"
+        assert [l["filename"] for l in menu["lessons"]] == catalog.topics["redis"]
+        assert menu["current_style"] == "sci_fi"
+
+    def test_missing_lookups(self, catalog):
+        assert catalog.menu("nonexistent") is None
+        assert catalog.lesson_page("redis", "nonexistent") is None
+        assert catalog.lesson("redis", "nonexistent") is None
+
+
+class TestBrokenContent:
+
+    def test_broken_lesson_raises_but_others_load(self, tmp_path, sample_lesson_data):
+        topic_dir = tmp_path / "tutorials" / "redis"
+        topic_dir.mkdir(parents=True)
+        (topic_dir / "00_good.json").write_text(json.dumps(sample_lesson_data))
+        (topic_dir / "01_bad.json").write_text('{"tutorial": "Test", "invalid": json}')
+
+        catalog = LessonCatalog(tmp_path)
+
+        assert catalog.lesson_page("redis", "00_good")["next_lesson"] == "01_bad"
+        with pytest.raises(LessonLoadError) as exc_info:
+            catalog.lesson_page("redis", "01_bad")
+        assert "json" in exc_info.value.detail.lower()
+        assert [l["filename"] for l in catalog.menu("redis")["lessons"]] == ["00_good"]
+
+    def test_broken_translation_falls_back_to_english(self, tmp_path, sample_lesson_data):
+        topic_dir = tmp_path / "tutorials" / "redis"
+        topic_dir.mkdir(parents=True)
+        (topic_dir / "00_setup.json").write_text(json.dumps(sample_lesson_data))
+        trans_dir = tmp_path / "translations" / "sl" / "redis"
+        trans_dir.mkdir(parents=True)
+        (trans_dir / "00_setup.json").write_text("{not json")
+
+        catalog = LessonCatalog(tmp_path)
+
+        assert catalog.lesson_page("redis", "00_setup", lang="sl")["tutorial"] == "Redis Basics"
+        assert [p.split(":")[0] for p in catalog.problems()] == ["sl/redis/00_setup"]
+
+    def test_invalid_check_logic_fails_startup_check(self, tmp_path, sample_lesson_data):
+        topic_dir = tmp_path / "tutorials" / "redis"
+        topic_dir.mkdir(parents=True)
+        bad = json.loads(json.dumps(sample_lesson_data))
+        bad["challenge"]["check_logic"]["expected_result"]["type"] = "no_such_type"
+        (topic_dir / "00_setup.json").write_text(json.dumps(bad))
+        (topic_dir / "01_bad.json").write_text("{not json")
+
+        catalog = LessonCatalog(tmp_path)
+
+        with pytest.raises(LessonLoadError) as exc_info:
+            catalog.check_logic("redis", "00_setup")
+        assert "no_such_type" in exc_info.value.detail
+        with pytest.raises(CatalogError) as exc_info:
+            catalog.raise_for_problems()
+        assert [p.split(":")[0] for p in exc_info.value.problems] == ["redis/01_bad", "redis/00_setup"]
+
+
+class TestCompiledChecks:
+
+    def test_every_real_lesson_has_valid_check(self, catalog):
+        catalog.raise_for_problems()
+        for topic, lessons in catalog.topics.items():
+            for lesson in lessons:
+                assert catalog.check_logic(topic, lesson) is not None, f"{topic}/{lesson}"
+
+    def test_check_logic_is_built_once(self, catalog):
+        first = catalog.check_logic("redis", "00_setup")
+        assert catalog.check_logic("redis", "00_setup") is first
+        assert first.expected_result.type == "exact_match"
+
+    def test_unknown_lesson_has_no_check(self, catalog):
+        assert catalog.check_logic("redis", "99_missing") is None
+        assert catalog.check_logic("cobol", "00_setup") is None
+
+
+class TestHotReload:
+
+    @pytest.fixture
+    def content(self, tmp_path, sample_lesson_data):
+        topic_dir = tmp_path / "tutorials" / "redis"
+        topic_dir.mkdir(parents=True)
+        (topic_dir / "00_setup.json").write_text(json.dumps(sample_lesson_data))
+        return tmp_path
+
+    @staticmethod
+    def _touch_later(path: Path, text: str):
+        """Write text and make sure the mtime moves even on coarse filesystems."""
+        before = path.stat().st_mtime_ns if path.exists() else 0
+        path.write_text(text)
+        if path.stat().st_mtime_ns == before:
+            os.utime(path, ns=(before + 1_000_000, before + 1_000_000))
+
+    def test_no_changes_reloads_nothing(self, content):
+        catalog = LessonCatalog(content)
+        assert catalog.reload_changed() == set()
+
+    def test_edited_lesson_is_swapped_in(self, content, sample_lesson_data):
+        catalog = LessonCatalog(content)
+        old_page = catalog.lesson_page("redis", "00_setup")
+
+        sample_lesson_data["tutorial"] = "Redis Basics v2"
+        self._touch_later(content / "tutorials" / "redis" / "00_setup.json", json.dumps(sample_lesson_data))
+
+        assert catalog.reload_changed() == {"redis"}
+        assert catalog.lesson_page("redis", "00_setup")["tutorial"] == "Redis Basics v2"
+        assert old_page["tutorial"] == "Redis Basics"  # earlier readers keep a consistent view
+
+    def test_only_changed_files_are_reparsed(self, content, sample_lesson_data, monkeypatch):
+        (content / "tutorials" / "sql").mkdir()
+        (content / "tutorials" / "sql" / "00_setup.json").write_text(json.dumps(sample_lesson_data))
+        catalog = LessonCatalog(content)
+
+        import catalog as catalog_module
+        parsed = []
+        real_read = catalog_module._read_json
+        monkeypatch.setattr(catalog_module, "_read_json", lambda p: parsed.append(p) or real_read(p))
+
+        self._touch_later(content / "tutorials" / "sql" / "00_setup.json", json.dumps(sample_lesson_data))
+        assert catalog.reload_changed() == {"sql"}
+        assert parsed == [content / "tutorials" / "sql" / "00_setup.json"]
+
+    def test_new_lesson_and_translation_picked_up(self, content, sample_lesson_data):
+        catalog = LessonCatalog(content)
+
+        (content / "tutorials" / "redis" / "01_strings.json").write_text(json.dumps(sample_lesson_data))
+        trans_dir = content / "translations" / "sl" / "redis"
+        trans_dir.mkdir(parents=True)
+        (trans_dir / "00_setup.json").write_text(json.dumps({"tutorial": "Osnove Redis"}))
+
+        catalog.reload_changed()
+        assert catalog.topics["redis"] == ["00_setup", "01_strings"]
+        assert catalog.lesson_page("redis", "00_setup")["next_lesson"] == "01_strings"
+        assert catalog.lesson_page("redis", "00_setup", lang="sl")["tutorial"] == "Osnove Redis"
+
+    def test_deleted_lesson_disappears(self, content):
+        catalog = LessonCatalog(content)
+        (content / "tutorials" / "redis" / "00_setup.json").unlink()
+        catalog.reload_changed()
+        assert catalog.lesson_page("redis", "00_setup") is None
+        assert catalog.has_topic("redis")
@@ -0,0 +1,132 @@
+# ABOUTME: Tests for container leasing in the Docker grader backend (app/docker_manager.py).
+# ABOUTME: Uses mock containers — no Docker daemon required.
+
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+# Mock Docker before importing
+mock_docker = MagicMock()
+sys.modules['docker'] = mock_docker
+
+from docker_manager import ContainerManager, SchedulerBusy
+
+
+def _container(name, status="running"):
+    container = MagicMock()
+    container.short_id = name
+    container.status = status
+    return container
+
+
+@pytest.fixture
+def manager():
+    """A manager with a two-container redis pool, built without Docker."""
+    mgr = ContainerManager()
+    containers = [_container("c1"), _container("c2")]
+    mgr.containers["redis"] = list(containers)
+    mgr.pool["redis"] = asyncio.Queue()
+    for c in containers:
+        mgr.pool["redis"].put_nowait(c)
+    return mgr
+
+
+class TestContainerLeasing:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_leases_get_distinct_containers(self, manager):
+        async with manager.lease("redis") as first:
+            async with manager.lease("redis") as second:
+                assert first is not second
+        await manager.wait_for_resets()
+        assert manager.pool["redis"].qsize() == 2
+
+    @pytest.mark.asyncio
+    async def test_checkout_waits_for_checkin(self, manager):
+        a = await manager.checkout("redis")
+        b = await manager.checkout("redis")
+        waiter = asyncio.create_task(manager.checkout("redis", timeout=1))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await manager.checkin("redis", a)
+        assert await waiter is a
+        await manager.checkin("redis", b)
+
+    @pytest.mark.asyncio
+    async def test_checkout_timeout_raises_busy(self, manager):
+        await manager.checkout("redis")
+        await manager.checkout("redis")
+        with pytest.raises(SchedulerBusy):
+            await manager.checkout("redis", timeout=0.05)
+
+    @pytest.mark.asyncio
+    async def test_unknown_language_raises_key_error(self, manager):
+        with pytest.raises(KeyError):
+            await manager.checkout("cobol")
+
+    @pytest.mark.asyncio
+    async def test_checkin_resets_container(self, manager):
+        container = await manager.checkout("redis")
+        await manager.checkin("redis", container)
+        container.exec_run.assert_called_with("redis-cli FLUSHALL")
+
+    @pytest.mark.asyncio
+    async def test_dead_container_is_replaced(self, manager):
+        replacement = _container("c3")
+        manager.client.containers.run = MagicMock(return_value=replacement)
+        dead = await manager.checkout("redis")
+        dead.status = "exited"
+
+        await manager.checkin("redis", dead)
+
+        dead.remove.assert_called_once_with(force=True)
+        assert dead not in manager.containers["redis"]
+        assert replacement in manager.containers["redis"]
+        idle = [manager.pool["redis"].get_nowait() for _ in range(2)]
+        assert replacement in idle
+        assert dead not in idle
+
+    @pytest.mark.asyncio
+    async def test_container_returned_when_grading_fails(self, manager):
+        with pytest.raises(RuntimeError):
+            async with manager.lease("redis"):
+                raise RuntimeError("exec failed")
+        await manager.wait_for_resets()
+        assert manager.pool["redis"].qsize() == 2
+
+
+class TestOffLoopExecution:
+
+    @pytest.mark.asyncio
+    async def test_exec_runs_in_docker_thread(self, manager):
+        import threading
+        seen = {}
+
+        def exec_run(cmd):
+            seen["thread"] = threading.current_thread().name
+            return 0, b"PONG\n"
+
+        container = _container("c9")
+        container.exec_run.side_effect = exec_run
+        assert await manager._exec(container, "redis-cli PING") == (0, "PONG")
+        assert seen["thread"].startswith("docker-sdk")
+
+    @pytest.mark.asyncio
+    async def test_reset_happens_after_result(self, manager):
+        """The lease returns before the reset, and the container stays leased until reset ends."""
+        import threading
+        gate = threading.Event()
+        container = manager.containers["redis"][0]  # first in the idle queue
+        container.exec_run.side_effect = lambda cmd: (gate.wait(2), (0, b""))[1]
+
+        async with manager.lease("redis") as leased:
+            assert leased is container
+        assert manager.pool["redis"].qsize() == 1
+        gate.set()
+        await manager.wait_for_resets()
+        assert manager.pool["redis"].qsize() == 2
@@ -3,10 +3,12 @@
 
 import sys
 import os
+
+import pytest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
 
 from grader_schemas import CheckLogic, ExpectedResult, GradeResult
-from grader import evaluate
+from grader import GRADERS, compile_check, evaluate, register
 
 
 class TestExactMatch:
@@ -144,6 +146,129 @@ class TestUnknownType:
         assert result.is_correct is False
         assert "Unknown validation type" in result.feedback_message
 
+    def test_compile_rejects_unknown_type(self):
+        check = CheckLogic(
+            expected_result=ExpectedResult(type="fancy_check", value="x")
+        )
+        with pytest.raises(ValueError, match="fancy_check"):
+            compile_check(check)
+
+
+class TestCompiledChecks:
+    def test_matcher_compiled_once(self, monkeypatch):
+        calls = []
+
+        def compiler(expected):
+            calls.append(expected)
+            return lambda user_output, validation_output: (True, "Correct!")
+
+        monkeypatch.setitem(GRADERS, "counting", compiler)
+        check = CheckLogic(expected_result=ExpectedResult(type="counting", value="x"))
+        evaluate(check, "", "")
+        evaluate(check, "", "")
+        assert calls == ["x"]
+
+    def test_invalid_value_rejected_at_compile(self):
+        check = CheckLogic(expected_result=ExpectedResult(type="regex", value="(unclosed"))
+        with pytest.raises(ValueError, match="Invalid value for 'regex'"):
+            compile_check(check)
+
+    def test_register_custom_type(self, monkeypatch):
+        monkeypatch.setattr("grader.GRADERS", dict(GRADERS))
+
+        @register("starts_with")
+        def _starts_with(expected):
+            return lambda user_output, validation_output: (validation_output.startswith(expected), "")
+
+        check = CheckLogic(expected_result=ExpectedResult(type="starts_with", value="OK"))
+        assert evaluate(check, "", "OK done").is_correct is True
+
+
+def _check(result_type, value):
+    return CheckLogic(
+        validation_command="cmd",
+        expected_result=ExpectedResult(type=result_type, value=value)
+    )
+
+
+class TestRegex:
+    def test_matches_validation_output(self):
+        assert evaluate(_check("regex", r"^\d+ rows$"), "", "header\n42 rows").is_correct is True
+
+    def test_no_match(self):
+        result = evaluate(_check("regex", r"^\d+ rows$"), "", "no rows")
+        assert result.is_correct is False
+        assert "pattern" in result.feedback_message
+
+    def test_user_output_variant_ignores_validation_output(self):
+        check = _check("user_output_regex", r"commit [0-9a-f]{7}")
+        assert evaluate(check, "commit abc1234", "").is_correct is True
+        assert evaluate(check, "", "commit abc1234").is_correct is False
+
+
+class TestNormalizedWhitespace:
+    def test_spacing_ignored(self):
+        check = _check("user_output_normalized_whitespace", "a  b\nc")
+        assert evaluate(check, "  a b   c\n", "").is_correct is True
+
+    def test_different_words(self):
+        check = _check("normalized_whitespace", "a b c")
+        assert evaluate(check, "", "a b d").is_correct is False
+
+
+class TestLineSetEqual:
+    def test_order_ignored(self):
+        check = _check("line_set_equal", ["murphy", "chen"])
+        assert evaluate(check, "", "chen\nmurphy\n").is_correct is True
+
+    def test_string_value_split_on_lines(self):
+        check = _check("user_output_line_set_equal", "x\ny")
+        assert evaluate(check, "y\nx", "").is_correct is True
+
+    def test_reports_missing_and_extra(self):
+        result = evaluate(_check("line_set_equal", ["murphy", "chen"]), "", "murphy\nreyes")
+        assert result.is_correct is False
+        assert "missing: chen" in result.feedback_message
+        assert "unexpected: reyes" in result.feedback_message
+
+
+class TestNumericTolerance:
+    def test_within_tolerance(self):
+        check = _check("numeric_tolerance", {"target": 0.85, "tolerance": 0.05})
+        assert evaluate(check, "", "0.82").is_correct is True
+
+    def test_outside_tolerance(self):
+        check = _check("numeric_tolerance", {"target": 0.85, "tolerance": 0.05})
+        assert evaluate(check, "", "0.7").is_correct is False
+
+    def test_plain_number_is_exact(self):
+        check = _check("user_output_numeric_tolerance", 3)
+        assert evaluate(check, "3.0\n", "").is_correct is True
+
+    def test_non_numeric(self):
+        result = evaluate(_check("numeric_tolerance", 1), "", "abc")
+        assert result.is_correct is False
+        assert "number" in result.feedback_message
+
+
+class TestJsonEqual:
+    def test_key_order_and_formatting_ignored(self):
+        check = _check("user_output_json_equal", {"a": 1, "b": [1, 2]})
+        assert evaluate(check, '{ "b": [1, 2],\n  "a": 1 }', "").is_correct is True
+
+    def test_string_value_parsed(self):
+        check = _check("json_equal", '{"status": "ok"}')
+        assert evaluate(check, "", '{"status":"ok"}').is_correct is True
+
+    def test_list_order_matters(self):
+        check = _check("json_equal", [1, 2])
+        assert evaluate(check, "", "[2, 1]").is_correct is False
+
+    def test_invalid_json(self):
+        result = evaluate(_check("json_equal", {}), "", "not json")
+        assert result.is_correct is False
+        assert "valid JSON" in result.feedback_message
+
 
 class TestOutputPreserved:
     def test_user_output_in_result(self):
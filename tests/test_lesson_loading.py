@@ -1,5 +1,6 @@
 import pytest
 import json
+import os
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -245,4 +246,50 @@ def test_tutorial_menu_lesson_listing(app_client, tmp_path):
 
         # Check that all lessons are listed
         for _, title in lessons:
-            assert title in response.text
\ No newline at end of file
+            assert title in response.text
+
+
+def test_lesson_page_conditional_get(app_client, mock_lesson_file):
+    """Test that cached lesson pages carry validators and answer 304 when unchanged."""
+    first = app_client.get("/tutorial/redis/00_setup")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    second = app_client.get("/tutorial/redis/00_setup", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+    since = app_client.get("/tutorial/redis/00_setup", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+    other_style = app_client.get("/tutorial/redis/00_setup?style=sci_fi", headers={"If-None-Match": etag})
+    assert other_style.status_code == 200
+
+
+def test_menu_page_conditional_get(app_client, mock_lesson_file):
+    """Test that the tutorial menu is served from the page cache with an ETag."""
+    first = app_client.get("/tutorial/redis")
+    assert first.status_code == 200
+    response = app_client.get("/tutorial/redis", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304
+
+
+def test_page_cache_rerenders_after_catalog_reload(app_client, mock_lesson_file, sample_lesson_data):
+    """Test that an edited lesson is re-rendered once the catalog picks it up."""
+    import main
+
+    first = app_client.get("/tutorial/redis/00_setup")
+    assert "Redis Basics" in first.text
+
+    lesson_file = mock_lesson_file / "tutorials" / "redis" / "00_setup.json"
+    sample_lesson_data["tutorial"] = "Redis Revisited"
+    lesson_file.write_text(json.dumps(sample_lesson_data))
+    stat = lesson_file.stat()
+    os.utime(lesson_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    main.get_catalog().reload_changed()
+
+    response = app_client.get("/tutorial/redis/00_setup", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert "Redis Revisited" in response.text
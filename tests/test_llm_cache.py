@@ -0,0 +1,124 @@
+# ABOUTME: Tests for the LLM response cache (app/llm_cache.py): key normalization, TTL, LRU, record/replay.
+# ABOUTME: Uses a fake clock and tmp files; client integration is covered in test_llm_client.py.
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from llm_cache import LLMCache, cache_key
+
+RESPONSE = {"choices": [{"message": {"content": "cached answer"}}]}
+
+
+def request(content="What is a token?", **params):
+    payload = {"model": "m1", "messages": [{"role": "user", "content": content}], "temperature": 0.7,
+               "max_tokens": 4096}
+    payload.update(params)
+    return payload
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCacheKey:
+    def test_formatting_differences_share_a_key(self):
+        a = request("  What is a token?\n", temperature=0.70)
+        b = {"max_tokens": 4096.0, "temperature": 0.7, "model": "m1",
+             "messages": [{"content": "What is a token?", "role": "User"}]}
+        assert cache_key(a) == cache_key(b)
+
+    @pytest.mark.parametrize("change", [
+        {"model": "m2"},
+        {"temperature": 0.2},
+        {"max_tokens": 100},
+        {"top_p": 0.5},
+        {"messages": [{"role": "system", "content": "What is a token?"}]},
+    ])
+    def test_answer_relevant_changes_change_the_key(self, change):
+        assert cache_key(request(**change)) != cache_key(request())
+
+    def test_malformed_messages_still_hash(self):
+        assert cache_key({"messages": "not a list"}) != cache_key({"messages": []})
+
+
+class TestLLMCache:
+    def test_hit_after_put(self):
+        cache = LLMCache()
+        assert cache.get(request()) is None
+        cache.put(request(), RESPONSE)
+        assert cache.get(request(" What is a token? ")) == RESPONSE
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = LLMCache(ttl=60, clock=clock)
+        cache.put(request(), RESPONSE)
+        clock.now += 59
+        assert cache.get(request()) == RESPONSE
+        clock.now += 2
+        assert cache.get(request()) is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_evicted(self):
+        cache = LLMCache(max_entries=2)
+        cache.put(request("a"), RESPONSE)
+        cache.put(request("b"), RESPONSE)
+        cache.get(request("a"))
+        cache.put(request("c"), RESPONSE)
+        assert cache.get(request("a")) is not None
+        assert cache.get(request("b")) is None
+        assert len(cache) == 2
+
+    def test_off_mode_stores_nothing(self):
+        cache = LLMCache(mode="off")
+        cache.put(request(), RESPONSE)
+        assert cache.get(request()) is None
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError, match="LLM_CACHE_MODE must be one of"):
+            LLMCache(mode="sometimes")
+
+    def test_record_then_replay(self, tmp_path):
+        path = str(tmp_path / "responses.jsonl")
+        recorder = LLMCache(mode="record", path=path)
+        recorder.put(request("a"), RESPONSE)
+        recorder.put(request("b"), {"choices": []})
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert [r["request"]["messages"][0]["content"] for r in records] == ["a", "b"]
+
+        clock = FakeClock()
+        replay = LLMCache(mode="replay", path=path, ttl=1, max_entries=1, clock=clock)
+        clock.now += 3600  # recordings never expire
+        assert replay.replay_only
+        assert replay.get(request("a")) == RESPONSE
+        assert replay.get(request("b")) == {"choices": []}
+        assert replay.get(request("c")) is None
+        replay.put(request("c"), RESPONSE)  # replay never learns new answers
+        assert replay.get(request("c")) is None
+
+    def test_bad_recording_lines_skipped(self, tmp_path):
+        path = tmp_path / "responses.jsonl"
+        good = {"key": cache_key(request()), "response": RESPONSE}
+        path.write_text("not json\n" + json.dumps({"key": "x"}) + "\n" + json.dumps(good) + "\n")
+        assert LLMCache(mode="replay", path=str(path)).get(request()) == RESPONSE
+
+    def test_missing_recording_is_empty(self, tmp_path):
+        assert len(LLMCache(mode="replay", path=str(tmp_path / "none.jsonl"))) == 0
+
+    def test_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("LLM_CACHE_MODE", "record")
+        monkeypatch.setenv("LLM_CACHE_SIZE", "7")
+        monkeypatch.setenv("LLM_CACHE_TTL", "90")
+        monkeypatch.setenv("LLM_CACHE_FILE", str(tmp_path / "r.jsonl"))
+        cache = LLMCache.from_env()
+        assert (cache.mode, cache.max_entries, cache.ttl, cache.path) == ("record", 7, 90, str(tmp_path / "r.jsonl"))
@@ -0,0 +1,450 @@
+# ABOUTME: Tests for the pooled LLM API client (app/llm_client.py) against a local stub HTTP server.
+# ABOUTME: Covers keep-alive, bounded concurrency, retries on 429/5xx, timeouts, streaming and output formatting.
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from llm_cache import LLMCache
+from llm_client import LLMClient
+from grader_schemas import CheckLogic
+from subprocess_manager import Sandbox, SandboxPool, SubprocessManager
+
+API_KEY = "sk-test-0123456789"
+
+CHAT_RESULT = {
+    "model": "stub-model",
+    "choices": [{"message": {"role": "assistant", "content": "Hello from the stub"}}],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 4, "total_tokens": 9},
+}
+
+# The same answer as CHAT_RESULT, as streamed chat.completion.chunk events
+STREAM_CHUNKS = [
+    {"model": "stub-model", "choices": [{"delta": {"role": "assistant"}}]},
+    {"model": "stub-model", "choices": [{"delta": {"content": "Hello"}}]},
+    {"model": "stub-model", "choices": [{"delta": {"content": " from"}}]},
+    {"model": "stub-model", "choices": [{"delta": {"content": " the stub"}, "finish_reason": "stop"}]},
+    {"model": "stub-model", "choices": [], "usage": CHAT_RESULT["usage"]},
+]
+
+
+class StubProvider:
+    """OpenAI-compatible stub: replies from a script of (status, body, headers, delay) steps."""
+
+    def __init__(self):
+        self.script = []
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with stub.lock:
+                    stub.requests.append((dict(self.headers), json.loads(body)))
+                    stub.connections.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    step = stub.script.pop(0) if stub.script else (200, CHAT_RESULT, {}, 0)
+                status, payload, headers, delay = step
+                time.sleep(delay)
+                content_type = "application/json"
+                if isinstance(payload, list):
+                    # Server-Sent Events, as sent for "stream": true
+                    content_type = "text/event-stream"
+                    payload = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in payload) + "data: [DONE]\n\n"
+                data = json.dumps(payload).encode() if isinstance(payload, dict) else payload.encode()
+                with stub.lock:
+                    stub.in_flight -= 1
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(data)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout tests)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def reply(self, status, body=CHAT_RESULT, headers=None, delay=0):
+        self.script.append((status, body, headers or {}, delay))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    provider = StubProvider()
+    yield provider
+    provider.close()
+
+
+def make_client(url, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    kwargs.setdefault("backoff_max", 0.05)
+    return LLMClient(url, kwargs.pop("api_key", API_KEY), **kwargs)
+
+
+class TestLLMClient:
+
+    @pytest.mark.asyncio
+    async def test_call_llm_output_and_request(self, stub):
+        client = make_client(stub.url)
+        try:
+            output = await client.call_llm("Hi there", system_prompt="Be brief")
+        finally:
+            await client.aclose()
+        assert output.startswith("Hello from the stub\n\n--- API Response Metadata ---\n")
+        assert "Model: stub-model\nPrompt tokens: 5\nResponse tokens: 4\nTotal tokens: 9" in output
+        headers, payload = stub.requests[0]
+        assert headers["Authorization"] == f"Bearer {API_KEY}"
+        assert [m["role"] for m in payload["messages"]] == ["system", "user"]
+        assert payload["messages"][1]["content"] == "Hi there"
+
+    @pytest.mark.asyncio
+    async def test_connections_are_kept_alive(self, stub):
+        client = make_client(stub.url)
+        try:
+            for _ in range(3):
+                await client.call_llm("again")
+        finally:
+            await client.aclose()
+        assert len(stub.requests) == 3
+        assert len(stub.connections) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, stub):
+        for _ in range(6):
+            stub.reply(200, delay=0.1)
+        client = make_client(stub.url, max_concurrency=2)
+        try:
+            outputs = await asyncio.gather(*(client.call_llm(f"q{i}") for i in range(6)))
+        finally:
+            await client.aclose()
+        assert all(o.startswith("Hello from the stub") for o in outputs)
+        assert stub.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_then_succeeds(self, stub):
+        stub.reply(429, {"error": "slow down"}, {"Retry-After": "0"})
+        stub.reply(503, {"error": "busy"})
+        client = make_client(stub.url)
+        try:
+            output = await client.call_llm("hi")
+        finally:
+            await client.aclose()
+        assert output.startswith("Hello from the stub")
+        assert len(stub.requests) == 3
+        assert client.retries == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, stub):
+        for _ in range(3):
+            stub.reply(502, "bad gateway")
+        client = make_client(stub.url, max_retries=2)
+        try:
+            output = await client.call_llm("hi")
+        finally:
+            await client.aclose()
+        assert output == "API Error (502): bad gateway"
+        assert len(stub.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, stub):
+        stub.reply(401, {"error": "bad key"})
+        client = make_client(stub.url)
+        try:
+            output = await client.call_llm("hi")
+        finally:
+            await client.aclose()
+        assert output.startswith("API Error (401): Authentication failed. Key: sk-tes...6789.")
+        assert len(stub.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_read_timeout_is_not_retried(self, stub):
+        stub.reply(200, delay=1)
+        client = make_client(stub.url, read_timeout=0.2)
+        try:
+            output = await client.call_llm("hi")
+        finally:
+            await client.aclose()
+        assert output == "Error: LLM API request timed out"
+        assert len(stub.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_connect_failures_are_retried_then_reported(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]  # closed once the block exits: nothing listens
+        client = make_client(f"http://127.0.0.1:{port}/v1/chat/completions", max_retries=1)
+        try:
+            output = await client.call_llm("hi")
+        finally:
+            await client.aclose()
+        assert output.startswith("Connection Error:")
+        assert client.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_call_llm_from_json(self, stub):
+        client = make_client(stub.url)
+        try:
+            output = await client.call_llm_from_json('{"messages": [{"role": "user", "content": "hi"}]}')
+            invalid = await client.call_llm_from_json("{not json")
+            not_object = await client.call_llm_from_json("[1,2]")
+        finally:
+            await client.aclose()
+        assert json.loads(output) == CHAT_RESULT
+        assert stub.requests[0][1]["model"]  # default model filled in
+        assert invalid.startswith("Invalid JSON:")
+        assert not_object.startswith("Invalid JSON:")
+        assert len(stub.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key(self, stub):
+        client = make_client(stub.url, api_key="")
+        try:
+            output = await client.call_llm("hi")
+        finally:
+            await client.aclose()
+        assert output == "Error: No API key configured. Please set LLM_API_KEY environment variable."
+        assert stub.requests == []
+
+
+async def collect(events):
+    tokens, output = [], None
+    async for kind, text in events:
+        if kind == "token":
+            tokens.append(text)
+        else:
+            output = text
+    return tokens, output
+
+
+class TestLLMClientStreaming:
+
+    @pytest.mark.asyncio
+    async def test_tokens_then_same_output_as_call_llm(self, stub):
+        stub.reply(200, STREAM_CHUNKS)
+        client = make_client(stub.url)
+        try:
+            tokens, output = await collect(client.stream_llm("Hi there"))
+            expected = await client.call_llm("Hi there")
+        finally:
+            await client.aclose()
+        assert tokens == ["Hello", " from", " the stub"]
+        assert output == expected
+        assert stub.requests[0][1]["stream"] is True
+        assert "stream" not in stub.requests[1][1]
+
+    @pytest.mark.asyncio
+    async def test_retries_before_the_stream_starts(self, stub):
+        stub.reply(429, {"error": "slow down"}, {"Retry-After": "0"})
+        stub.reply(200, STREAM_CHUNKS)
+        client = make_client(stub.url)
+        try:
+            tokens, output = await collect(client.stream_llm("hi"))
+        finally:
+            await client.aclose()
+        assert "".join(tokens) == "Hello from the stub"
+        assert client.retries == 1
+
+    @pytest.mark.asyncio
+    async def test_error_status_is_the_output(self, stub):
+        stub.reply(401, {"error": "bad key"})
+        client = make_client(stub.url)
+        try:
+            tokens, output = await collect(client.stream_llm("hi"))
+        finally:
+            await client.aclose()
+        assert tokens == []
+        assert output.startswith("API Error (401): Authentication failed.")
+
+    @pytest.mark.asyncio
+    async def test_streamed_answer_is_cached(self, stub):
+        stub.reply(200, STREAM_CHUNKS)
+        client = make_client(stub.url, cache=LLMCache())
+        try:
+            streamed = await collect(client.stream_llm("What is a token?"))
+            cached = await client.call_llm("What is a token?")
+            restreamed = await collect(client.stream_llm("What is a token?"))
+        finally:
+            await client.aclose()
+        assert cached == streamed[1] == restreamed[1]
+        assert restreamed[0] == ["Hello from the stub"]
+        assert len(stub.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_streamed_result_keeps_finish_reason(self, stub):
+        length_cut = [dict(chunk) for chunk in STREAM_CHUNKS]
+        length_cut[3] = {"model": "stub-model", "choices": [{"delta": {"content": " the stub"}, "finish_reason": "length"}]}
+        stub.reply(200, length_cut)
+        cache = LLMCache()
+        client = make_client(stub.url, cache=cache)
+        try:
+            await collect(client.stream_llm("What is a token?"))
+            result = cache.get(client.tools.chat_payload("What is a token?", None))
+        finally:
+            await client.aclose()
+        assert result["choices"][0]["finish_reason"] == "length"
+        assert result["choices"][0]["message"]["content"] == "Hello from the stub"
+
+    @pytest.mark.asyncio
+    async def test_cut_off_stream_is_not_cached(self, stub):
+        cut_off = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in STREAM_CHUNKS[:3])  # no [DONE]
+        stub.reply(200, cut_off)
+        client = make_client(stub.url, cache=LLMCache())
+        try:
+            tokens, output = await collect(client.stream_llm("What is a token?"))
+            again = await client.call_llm("What is a token?")
+        finally:
+            await client.aclose()
+        assert tokens == ["Hello", " from"]
+        assert output.startswith("Hello from\n\n")
+        assert again.startswith("Hello from the stub\n\n")  # fetched again, not the cut-off answer
+        assert len(stub.requests) == 2
+
+
+class TestLLMClientCache:
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_served_from_cache(self, stub):
+        client = make_client(stub.url, cache=LLMCache())
+        try:
+            first = await client.call_llm("What is a token?")
+            second = await client.call_llm("  What is a token?  ")
+            other = await client.call_llm("What is an embedding?")
+        finally:
+            await client.aclose()
+        assert first == second == other
+        assert len(stub.requests) == 2
+        assert client.cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, stub):
+        stub.reply(400, {"error": "bad request"})
+        client = make_client(stub.url, cache=LLMCache())
+        try:
+            error = await client.call_llm("hi")
+            output = await client.call_llm("hi")
+        finally:
+            await client.aclose()
+        assert error.startswith("API Error (400)")
+        assert output.startswith("Hello from the stub")
+        assert len(stub.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_replay_without_provider_or_key(self, stub, tmp_path):
+        path = str(tmp_path / "responses.jsonl")
+        recorder = make_client(stub.url, cache=LLMCache(mode="record", path=path))
+        try:
+            recorded = await recorder.call_llm_from_json('{"messages": [{"role": "user", "content": "hi"}]}')
+        finally:
+            await recorder.aclose()
+
+        replayer = make_client("http://127.0.0.1:9/unreachable", api_key="", cache=LLMCache(mode="replay", path=path))
+        try:
+            replayed = await replayer.call_llm_from_json('{"messages": [{"role": "user", "content": "hi"}]}')
+            missing = await replayer.call_llm("never recorded")
+        finally:
+            await replayer.aclose()
+        assert replayed == recorded
+        assert missing == "Error: No recorded LLM response for this request (LLM_CACHE_MODE=replay)"
+        assert replayer.requests == 0
+
+
+class TestSubprocessManagerLLMCalls:
+
+    @pytest.mark.asyncio
+    async def test_call_llm_uses_shared_client(self, stub, tmp_path):
+        manager = SubprocessManager(sandbox_root=str(tmp_path))
+        manager._llm = make_client(stub.url)
+        sandbox = Sandbox(0, str(tmp_path))
+        os.makedirs(sandbox.root, exist_ok=True)
+        with open(sandbox.input_path, "w") as f:
+            f.write("  What is a token?  \n")
+        try:
+            code, output = await manager._execute_llm("call-llm /tmp/user_input", sandbox)
+            with open(sandbox.llm_mode_path, "w") as f:
+                f.write("call-llm\n")
+            await manager._execute_llm("Explain embeddings", sandbox)
+        finally:
+            await manager.shutdown()
+        assert code == 0
+        assert output.startswith("Hello from the stub")
+        assert [r[1]["messages"][-1]["content"] for r in stub.requests] == ["What is a token?", "Explain embeddings"]
+        assert manager._llm is None
+
+    @pytest.mark.asyncio
+    async def test_chat_lesson_streams_tokens(self, stub, tmp_path):
+        stub.reply(200, STREAM_CHUNKS)
+        manager = SubprocessManager(sandbox_root=str(tmp_path))
+        sandbox = Sandbox(0, str(tmp_path))
+        await manager._init_sandbox(sandbox)
+        manager.sandboxes = SandboxPool([sandbox], manager._reset_state)
+        manager._llm = make_client(stub.url)
+        check_logic = CheckLogic(
+            setup_commands=["echo call-llm > /tmp/llm_mode"],
+            expected_result={"type": "user_output_contains", "value": "Model:"},
+        )
+        try:
+            events = [e async for e in manager.stream_code_in_container("llm", "Say hello", check_logic)]
+        finally:
+            await manager.shutdown()
+        assert [text for kind, text in events if kind == "token"] == ["Hello", " from", " the stub"]
+        kind, result = events[-1]
+        assert kind == "result"
+        assert result.is_correct
+        assert result.output.startswith("Hello from the stub\n\n--- API Response Metadata ---")
+
+    @pytest.mark.asyncio
+    async def test_provider_call_runs_after_sandbox_and_slot_are_released(self, stub, tmp_path):
+        manager = SubprocessManager(sandbox_root=str(tmp_path))
+        sandbox = Sandbox(0, str(tmp_path))
+        await manager._init_sandbox(sandbox)
+        manager.sandboxes = SandboxPool([sandbox], manager._reset_state)
+        manager._llm = client = make_client(stub.url)
+        released, seen = [], []
+        call_llm = client.call_llm
+
+        async def tracking_call_llm(text):
+            seen.append((manager.sandboxes.available, list(released)))
+            return await call_llm(text)
+
+        client.call_llm = tracking_call_llm
+        check_logic = CheckLogic(
+            setup_commands=["echo call-llm > /tmp/llm_mode"],
+            expected_result={"type": "user_output_contains", "value": "Model:"},
+        )
+        try:
+            result = await manager.execute_code_in_container(
+                "llm", "Say hello", check_logic, release_slot=lambda: released.append(True))
+        finally:
+            await manager.shutdown()
+        assert result.is_correct, result.output
+        assert seen == [(1, [True])]
@@ -0,0 +1,278 @@
+# ABOUTME: Tests for the LLM tutorial's grading tools in docker/llm (tokenizer, similarity).
+# ABOUTME: The tokenizer tests use a small byte-level encoding so no vocabulary download is needed.
+
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+LLM_DIR = os.path.join(os.path.dirname(__file__), '..', 'docker', 'llm')
+sys.path.insert(0, LLM_DIR)
+
+try:
+    import tiktoken
+    import tokenize_text
+except ImportError:  # tiktoken/numpy are installed in the grader images only
+    tiktoken = None
+try:
+    import numpy as np
+    import compute_similarity
+except ImportError:
+    np = None
+
+requires_tiktoken = pytest.mark.skipif(tiktoken is None, reason="tiktoken not installed")
+requires_numpy = pytest.mark.skipif(np is None, reason="numpy not installed")
+
+
+class CountingEncoding:
+    """Wraps a tiktoken Encoding and counts how often it is used."""
+
+    def __init__(self):
+        ranks = {bytes([i]): i for i in range(256)}
+        ranks.update({b"th": 256, b"he": 257, b"the": 258})
+        self.encoding = tiktoken.Encoding(
+            name="test_bytes", pat_str=r"""\s?\S+|\s+""", mergeable_ranks=ranks, special_tokens={}
+        )
+        self.encode_calls = 0
+
+    def encode(self, text):
+        self.encode_calls += 1
+        return self.encoding.encode(text)
+
+    def decode(self, tokens):
+        return self.encoding.decode(tokens)
+
+    def decode_tokens_bytes(self, tokens):
+        return self.encoding.decode_tokens_bytes(tokens)
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    enc = CountingEncoding()
+    loads = []
+
+    def get_encoding(name):
+        loads.append(name)
+        return enc
+
+    monkeypatch.setattr(tokenize_text.tiktoken, "get_encoding", get_encoding)
+    monkeypatch.setattr(tokenize_text, "_encoding", None)
+    tokenize_text._tokenize_cached.cache_clear()
+    enc.loads = loads
+    yield enc
+    tokenize_text._tokenize_cached.cache_clear()
+
+
+@requires_tiktoken
+class TestTokenize:
+    def test_output_format(self, encoding):
+        output = tokenize_text.tokenize("the cat")
+        assert output.startswith('Input text: "the cat"\n\nToken splits:\n')
+        assert '  [0] "the" (ID: 258)\n' in output
+        assert '  [1] "▁" (ID: 32)\n' in output
+        assert "Total tokens: 5\n" in output
+        assert "Characters: 7\n" in output
+
+    def test_split_multibyte_characters_match_per_token_decode(self, encoding):
+        text = "café ü"
+        tokens = encoding.encode(text)
+        output = tokenize_text.tokenize(text)
+        for i, token in enumerate(tokens):
+            visible = encoding.decode([token]).replace(" ", "▁")
+            assert f'  [{i}] "{visible}" (ID: {token})\n' in output
+
+    def test_encoding_loaded_once(self, encoding):
+        tokenize_text.warm_up()
+        tokenize_text.tokenize("one")
+        tokenize_text.tokenize("two")
+        assert encoding.loads == [tokenize_text.ENCODING_NAME]
+
+    def test_repeated_input_is_cached(self, encoding):
+        first = tokenize_text.tokenize("hello there")
+        second = tokenize_text.tokenize("hello there")
+        assert first == second
+        assert encoding.encode_calls == 1
+
+    def test_long_input_is_not_cached(self, encoding):
+        text = "x " * tokenize_text.CACHE_MAX_CHARS
+        tokenize_text.tokenize(text)
+        tokenize_text.tokenize(text)
+        assert encoding.encode_calls == 2
+        assert tokenize_text._tokenize_cached.cache_info().currsize == 0
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    vectors = [[3.0, 4.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, -5.0]]
+    store = compute_similarity.EmbeddingStore.from_vectors(vectors, ["alpha", "beta", "gamma"])
+    path = str(tmp_path / "embeddings.npy")
+    store.save(path)
+    return path
+
+
+@requires_numpy
+class TestEmbeddingStore:
+    def test_saved_as_normalized_float32(self, store_path):
+        store = compute_similarity.EmbeddingStore.load(store_path)
+        assert store.vectors.dtype == np.float32
+        assert np.allclose(np.linalg.norm(store.vectors, axis=1), 1.0)
+        assert store.texts == ["alpha", "beta", "gamma"]
+        assert store.dim == 3 and len(store) == 3
+
+    def test_loaded_memory_mapped(self, store_path):
+        store = compute_similarity.EmbeddingStore.load(store_path)
+        assert isinstance(store.vectors, np.memmap)
+        assert not store.vectors.flags.writeable
+
+    def test_similarity_is_cosine(self, store_path):
+        store = compute_similarity.EmbeddingStore.load(store_path)
+        assert store.similarity(0, 1) == pytest.approx(0.8)
+        assert store.similarity(1, 2) == pytest.approx(0.0)
+        assert store.similarity(2, 2) == pytest.approx(1.0)
+
+    def test_sentence_count_must_match(self):
+        with pytest.raises(ValueError, match="2 vectors but 1 sentences"):
+            compute_similarity.EmbeddingStore.from_vectors([[1.0], [2.0]], ["only one"])
+
+    def test_lesson_embeddings(self, monkeypatch):
+        monkeypatch.setattr(compute_similarity, "EMBEDDINGS_FILE", os.path.join(LLM_DIR, "embeddings.npy"))
+        monkeypatch.setattr(compute_similarity, "_embeddings", None)
+        output = compute_similarity.compute("0 1")
+        assert 'Sentence A [0]: "The cat sat on the warm windowsill"' in output
+        assert "Cosine similarity: 0.8966" in output
+        assert "vector of 64 numbers" in output
+        assert compute_similarity.compute("0 99").startswith("Error: Sentence numbers must be between 0 and 16")
+
+
+@pytest.fixture
+def lesson_store(monkeypatch):
+    monkeypatch.setattr(compute_similarity, "EMBEDDINGS_FILE", os.path.join(LLM_DIR, "embeddings.npy"))
+    monkeypatch.setattr(compute_similarity, "_embeddings", None)
+    return compute_similarity.load_embeddings()
+
+
+@requires_numpy
+class TestSimilarityQueries:
+    def test_top_k_matches_brute_force(self, store_path):
+        store = compute_similarity.EmbeddingStore.load(store_path)
+        ranked = store.top_k(store.vectors[0], 2, exclude=[0])
+        assert [i for i, _ in ranked] == [1, 2]
+        assert ranked[0][1] == pytest.approx(store.similarity(0, 1))
+
+    def test_top_k_is_capped_at_store_size(self, store_path):
+        store = compute_similarity.EmbeddingStore.load(store_path)
+        assert len(store.top_k(store.vectors[0], 10, exclude=[0])) == 2
+
+    def test_matrix_is_pairwise_similarity(self, store_path):
+        store = compute_similarity.EmbeddingStore.load(store_path)
+        matrix = store.matrix([0, 1, 2])
+        assert matrix.shape == (3, 3)
+        assert matrix[0, 1] == pytest.approx(store.similarity(0, 1))
+        assert np.allclose(np.diag(matrix), 1.0)
+
+    @pytest.mark.parametrize("query", ["top 3 similar to 0", "top3 to 0", "top 3 0", "TOP 3 similar to 0"])
+    def test_top_command(self, lesson_store, query):
+        output = compute_similarity.compute(query)
+        assert output.startswith('Top 3 sentences by cosine similarity to [0]: "The cat sat on the warm windowsill"')
+        assert '  1. [1] 0.8966  "A kitten was sleeping on the couch"' in output
+        assert "  4. " not in output
+
+    def test_similar_to_defaults_to_five(self, lesson_store):
+        output = compute_similarity.compute("similar to 3")
+        assert "Top 5 sentences" in output
+        assert "  5. " in output and "[3] " not in output.split("\n\n")[1]
+
+    def test_top_command_after_list_line(self, lesson_store):
+        assert compute_similarity.compute("list\ntop 2 similar to 3").startswith("Top 2 sentences")
+
+    def test_top_out_of_range(self, lesson_store):
+        assert compute_similarity.compute("top 5 similar to 40").startswith("Error: Sentence numbers")
+
+    def test_matrix_command(self, lesson_store):
+        output = compute_similarity.compute("matrix")
+        lines = output.splitlines()
+        assert lines[0] == "Cosine similarity matrix:"
+        assert lines[2].split() == [str(i) for i in range(17)]
+        assert lines[3].split()[:3] == ["0", "1.00", "0.90"]
+
+    def test_matrix_of_chosen_sentences(self, lesson_store):
+        lines = compute_similarity.compute("matrix 0, 3 8").splitlines()
+        assert lines[2].split() == ["0", "3", "8"]
+        assert lines[4].split()[0] == "3" and lines[4].split()[2] == "1.00"
+
+    def test_search_ranks_by_shared_words(self, lesson_store):
+        output = compute_similarity.compute("search: rain and storms")
+        assert "Words used: rain (raining), storms (storm)" in output
+        ranked = [line.split()[1] for line in output.splitlines() if line.startswith("  1. ") or line.startswith("  2. ")]
+        assert sorted(ranked) == ["[8]", "[9]"]
+
+    def test_search_with_unknown_words(self, lesson_store):
+        output = compute_similarity.compute("find xyzzy")
+        assert output.startswith('None of the words in "xyzzy" appear in the sentence set')
+
+    def test_list_shows_query_modes(self, lesson_store):
+        output = compute_similarity.compute("list")
+        assert "Type two numbers to compare, e.g.: 0 3" in output
+        assert "top 5 similar to 3" in output and "matrix" in output and "search:" in output
+
+    def test_advertised_searches_find_sentences(self, lesson_store):
+        # Every "search: ..." the tool suggests must work on the shipped sentences
+        source = Path(compute_similarity.__file__).read_text()
+        examples = set(re.findall(r"search: [a-z]+(?: [a-z]+)*", source))
+        assert "search: kitten dogs" in examples
+        for example in examples:
+            output = compute_similarity.compute(example)
+            assert output.startswith("Query:"), example
+            assert "  1. [" in output
+
+
+@pytest.fixture
+def corpus():
+    from generate_embeddings import generate_corpus
+    return generate_corpus(3000, 32)
+
+
+@requires_numpy
+class TestIVFIndex:
+    def test_lists_partition_the_corpus(self, corpus):
+        index = compute_similarity.IVFIndex.build(corpus.vectors, 20)
+        assert index.n_lists == 20
+        assert index.offsets[-1] == len(corpus)
+        assert sorted(index.ids.tolist()) == list(range(len(corpus)))
+        assert not index.contiguous
+
+    def test_probing_every_list_is_exact(self, corpus):
+        corpus.index = compute_similarity.IVFIndex.build(corpus.vectors, 20)
+        query = corpus.vectors[7]
+        assert corpus.top_k(query, 10, nprobe=20) == corpus.top_k(query, 10, exact=True)
+
+    def test_recall_against_brute_force(self, corpus):
+        store = corpus.grouped_by(compute_similarity.IVFIndex.build(corpus.vectors, 50))
+        hits = 0
+        for i in range(0, len(store), 100):
+            exact = {j for j, _ in store.top_k(store.vectors[i], 10, exact=True)}
+            hits += len(exact & {j for j, _ in store.top_k(store.vectors[i], 10, nprobe=8)})
+        assert hits / (len(range(0, len(store), 100)) * 10) > 0.9
+
+    def test_grouped_store_keeps_texts_with_vectors(self, corpus):
+        index = compute_similarity.IVFIndex.build(corpus.vectors, 20)
+        grouped = corpus.grouped_by(index)
+        assert grouped.index.contiguous
+        old = int(index.ids[0])
+        assert grouped.texts[0] == corpus.texts[old]
+        assert np.array_equal(grouped.vectors[0], corpus.vectors[old])
+
+    def test_saved_and_loaded_with_store(self, corpus, tmp_path):
+        store = corpus.grouped_by(compute_similarity.IVFIndex.build(corpus.vectors, 20))
+        path = str(tmp_path / "corpus.npy")
+        store.save(path)
+        assert os.path.exists(tmp_path / "corpus.ivf.npz")
+        loaded = compute_similarity.EmbeddingStore.load(path)
+        assert loaded.index.contiguous and loaded.index.n_lists == 20
+        assert loaded.top_k(loaded.vectors[5], 5) == store.top_k(store.vectors[5], 5)
+
+    def test_lesson_store_has_no_index(self, lesson_store):
+        assert lesson_store.index is None
+        assert "One matrix-vector product scores all 17 sentences" in compute_similarity.compute("similar to 0")
@@ -0,0 +1,193 @@
+# ABOUTME: Tests for the simulated docker CLI (docker/docker/mock_docker.py) and its use in grading.
+# ABOUTME: Covers argument parsing, container/image state across commands, errors and the CLI state file.
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DOCKER_DIR = os.path.join(os.path.dirname(__file__), '..', 'docker', 'docker')
+sys.path.insert(0, DOCKER_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from mock_docker import MockDocker
+from catalog import LessonCatalog
+from subprocess_manager import Sandbox, SandboxPool, SubprocessManager, sanitize_input
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def engine(clock):
+    return MockDocker(clock=clock)
+
+
+def docker(engine, command):
+    return engine.execute(command.split())
+
+
+class TestMockDocker:
+
+    def test_version_and_unknown_command(self, engine):
+        assert docker(engine, "--version") == (0, "Docker version 24.0.7, build afdd53b")
+        code, output = docker(engine, "frobnicate")
+        assert code == 1
+        assert output.startswith("docker: 'frobnicate' is not a docker command.")
+
+    def test_run_pulls_once_then_reuses_image(self, engine):
+        code, first = docker(engine, "run hello-world")
+        assert code == 0
+        assert "Unable to find image 'hello-world:latest' locally" in first
+        assert "Hello from Docker!" in first
+        code, second = docker(engine, "run hello-world")
+        assert "Unable to find image" not in second
+        assert "Hello from Docker!" in second
+
+    def test_containers_persist_across_commands(self, engine, clock):
+        code, output = docker(engine, "run -d -p 8080:80 --name web nginx")
+        container_id = output.splitlines()[-1]
+        assert code == 0 and len(container_id) == 64
+        clock.now += 120
+
+        ps = docker(engine, "ps")[1].splitlines()
+        assert ps[0].split() == ["CONTAINER", "ID", "IMAGE", "COMMAND", "CREATED", "STATUS", "PORTS", "NAMES"]
+        assert ps[1].startswith(container_id[:12])
+        assert "Up 2 minutes" in ps[1]
+        assert "0.0.0.0:8080->80/tcp" in ps[1]
+        assert ps[1].endswith("web")
+
+        assert docker(engine, "stop web") == (0, "web")
+        assert len(docker(engine, "ps")[1].splitlines()) == 1
+        assert "Exited (0) Less than a second ago" in docker(engine, "ps -a")[1]
+        assert docker(engine, f"rm {container_id[:4]}") == (0, container_id[:4])
+        assert len(docker(engine, "ps -a")[1].splitlines()) == 1
+
+    def test_combined_short_flags(self, engine):
+        code, output = docker(engine, "run -dp 9000:80 nginx")
+        assert code == 0
+        assert "0.0.0.0:9000->80/tcp" in docker(engine, "ps")[1]
+
+    def test_conflicts(self, engine):
+        docker(engine, "run -d -p 8080:80 --name web nginx")
+        code, output = docker(engine, "run -d --name web nginx")
+        assert code == 125
+        assert 'The container name "/web" is already in use' in output
+        code, output = docker(engine, "run -d -p 8080:80 nginx")
+        assert code == 125
+        assert "port is already allocated" in output
+        code, output = docker(engine, "rm web")
+        assert code == 1
+        assert "container is running" in output
+        assert docker(engine, "rm -f web") == (0, "web")
+
+    def test_unknown_image_and_bad_flags(self, engine):
+        code, output = docker(engine, "run no-such-image")
+        assert code == 125
+        assert "pull access denied for no-such-image" in output
+        code, output = docker(engine, "run --bogus nginx")
+        assert code == 125
+        assert "unrecognized arguments: --bogus" in output
+        assert docker(engine, "stop ghost") == (1, "Error response from daemon: No such container: ghost")
+
+    def test_run_command_and_auto_remove(self, engine):
+        assert docker(engine, "run --rm alpine echo hi")[1].endswith("hi")
+        assert len(docker(engine, "ps -a")[1].splitlines()) == 1
+
+    def test_database_needs_password(self, engine):
+        code, output = docker(engine, "run --name db postgres")
+        assert code == 1
+        assert "You must specify POSTGRES_PASSWORD" in output
+        docker(engine, "rm db")
+        assert docker(engine, "run -d --name db -e POSTGRES_PASSWORD=secret postgres")[0] == 0
+        assert "Up" in docker(engine, "ps")[1]
+
+    def test_build_uses_dockerfile_and_tags_image(self, clock):
+        dockerfile = "FROM eclipse-temurin:21\nWORKDIR /app\nCOPY App.java .\nRUN javac App.java\nEXPOSE 8080\nCMD [\"java\", \"App\"]\n"
+        engine = MockDocker(clock=clock, read_dockerfile=lambda path: dockerfile)
+        code, output = docker(engine, "build -t my-app .")
+        assert code == 0
+        assert "Step 1/6 : FROM eclipse-temurin:21" in output
+        assert output.endswith("Successfully tagged my-app:latest")
+        images = docker(engine, "images")[1]
+        assert "my-app" in images and "eclipse-temurin" in images
+
+        docker(engine, "run -d -p 8080:8080 my-app")
+        ps = docker(engine, "ps")[1]
+        assert '"java App"' in ps
+        code, output = docker(engine, "rmi my-app")
+        assert code == 1
+        assert "must force" in output
+
+    def test_cli_keeps_state_in_file(self, tmp_path):
+        state = tmp_path / "state.json"
+        env = {**os.environ, "MOCK_DOCKER_STATE": str(state)}
+        script = os.path.join(DOCKER_DIR, "mock_docker.py")
+
+        run = subprocess.run([sys.executable, script, "run", "-d", "--name", "web", "nginx"],
+                             capture_output=True, text=True, env=env)
+        assert run.returncode == 0
+        ps = subprocess.run([sys.executable, script, "ps"], capture_output=True, text=True, env=env)
+        assert ps.stdout.splitlines()[1].endswith("web")
+        assert json.loads(state.read_text())["containers"][0]["name"] == "web"
+
+
+class TestDockerLessonGrading:
+
+    @staticmethod
+    async def _manager(tmp_path):
+        manager = SubprocessManager(sandbox_root=str(tmp_path))
+        sandbox = Sandbox(0, str(tmp_path))
+        await manager._init_sandbox(sandbox)
+        manager.sandboxes = SandboxPool([sandbox], manager._reset_state)
+        return manager, sandbox
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("lesson,command", [
+        ("00_containers", "docker --version"),
+        ("01_running", "docker run hello-world"),
+        ("04_volumes_ports", "docker run -d -p 8080:80 nginx"),
+    ])
+    async def test_lessons_pass(self, tmp_path, lesson, command):
+        manager, _ = await self._manager(tmp_path)
+        check_logic = LessonCatalog(BASE_DIR).check_logic("docker", lesson)
+        result = await manager.execute_code_in_container("docker", command, check_logic)
+        assert result.is_correct, result.output
+
+    @pytest.mark.asyncio
+    async def test_chained_commands_share_state(self, tmp_path):
+        manager, sandbox = await self._manager(tmp_path)
+        code, output = await manager._execute_docker(
+            "docker run -d --name web nginx && docker stop web\ndocker ps -a", sandbox)
+        assert code == 0
+        assert "Exited (0)" in output.splitlines()[-1]
+        code, output = await manager._execute_docker("docker ps && ls", sandbox)
+        assert code == 1
+        assert output.endswith("Only docker commands can be chained.")
+
+    @pytest.mark.asyncio
+    async def test_engine_is_reset_between_grades(self, tmp_path):
+        manager, sandbox = await self._manager(tmp_path)
+        check_logic = LessonCatalog(BASE_DIR).check_logic("docker", "04_volumes_ports")
+        await manager.execute_code_in_container("docker", "docker run -d --name web nginx", check_logic)
+        assert sandbox.docker is None
+        result = await manager.execute_code_in_container("docker", "docker run -d --name web nginx", check_logic)
+        assert result.is_correct
+
+    def test_docker_ps_flags_are_allowed(self):
+        assert sanitize_input("docker", "docker ps -a") == (True, "")
+        assert sanitize_input("bash", "ps aux")[0] is False
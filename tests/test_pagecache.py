@@ -0,0 +1,53 @@
+# ABOUTME: Tests for the rendered-page cache in app/pagecache.py.
+# ABOUTME: Covers render-once behaviour, version invalidation and the LRU bound.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from pagecache import PageCache
+
+
+class Renderer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"<html>{self.calls}</html>"
+
+
+class TestPageCache:
+
+    def test_renders_once_per_key(self):
+        cache, render = PageCache(), Renderer()
+        first = cache.get_or_render(("lesson", "redis", "00", "en", "noir"), 1, render)
+        second = cache.get_or_render(("lesson", "redis", "00", "en", "noir"), 1, render)
+        assert first is second
+        assert render.calls == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_new_version_rerenders(self):
+        cache, render = PageCache(), Renderer()
+        old = cache.get_or_render(("menu", "redis", "en", "noir"), 1, render)
+        new = cache.get_or_render(("menu", "redis", "en", "noir"), 2, render)
+        assert render.calls == 2
+        assert old.etag != new.etag
+
+    def test_lru_bound(self):
+        cache, render = PageCache(max_entries=2), Renderer()
+        for key in ["a", "b"]:
+            cache.get_or_render(("menu", key), 1, render)
+        cache.get_or_render(("menu", "a"), 1, render)  # a is most recently used
+        cache.get_or_render(("menu", "c"), 1, render)
+        assert len(cache) == 2
+        cache.get_or_render(("menu", "a"), 1, render)
+        assert render.calls == 3
+
+    def test_disabled_always_renders(self):
+        cache, render = PageCache(enabled=False), Renderer()
+        for _ in range(3):
+            cache.get_or_render(("menu", "redis"), 1, render)
+        assert render.calls == 3
+        assert len(cache) == 0
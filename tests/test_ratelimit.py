@@ -0,0 +1,106 @@
+# ABOUTME: Tests for the GCRA rate limiter in app/ratelimit.py.
+# ABOUTME: Covers bursts, refill, LRU key bounds and per-route/per-topic budgets.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from ratelimit import Limit, MemoryBackend, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestMemoryBackend:
+
+    @pytest.mark.asyncio
+    async def test_burst_then_reject(self, clock):
+        backend = MemoryBackend(clock=clock)
+        limit = Limit(30, 60)
+        for _ in range(30):
+            assert await backend.hit("ip", limit) == 0
+        wait = await backend.hit("ip", limit)
+        assert wait == pytest.approx(2.0)
+
+    @pytest.mark.asyncio
+    async def test_budget_refills_over_time(self, clock):
+        backend = MemoryBackend(clock=clock)
+        limit = Limit(3, 60)
+        for _ in range(3):
+            await backend.hit("ip", limit)
+        assert await backend.hit("ip", limit) > 0
+        clock.now += 20
+        assert await backend.hit("ip", limit) == 0
+        assert await backend.hit("ip", limit) > 0
+
+    @pytest.mark.asyncio
+    async def test_rejected_requests_do_not_spend_budget(self, clock):
+        backend = MemoryBackend(clock=clock)
+        limit = Limit(1, 10)
+        await backend.hit("ip", limit)
+        for _ in range(5):
+            assert await backend.hit("ip", limit) > 0
+        clock.now += 10
+        assert await backend.hit("ip", limit) == 0
+
+    @pytest.mark.asyncio
+    async def test_non_integer_interval_allows_full_burst(self, clock):
+        backend = MemoryBackend(clock=clock)
+        limit = Limit(7, 60)
+        for _ in range(7):
+            assert await backend.hit("ip", limit) == 0
+
+    @pytest.mark.asyncio
+    async def test_key_table_is_lru_bounded(self, clock):
+        backend = MemoryBackend(max_keys=3, clock=clock)
+        limit = Limit(1, 60)
+        for ip in ["a", "b", "c"]:
+            await backend.hit(ip, limit)
+        clock.now += 60
+        await backend.hit("a", limit)  # a is now most recently used
+        await backend.hit("d", limit)
+        assert len(backend) == 3
+        assert "b" not in backend._tat
+        assert "a" in backend._tat
+
+
+class TestRateLimiter:
+
+    @pytest.mark.asyncio
+    async def test_topic_budget_applies_on_top_of_route(self, clock):
+        limiter = RateLimiter(
+            MemoryBackend(clock=clock),
+            route_limits={"check-answer": Limit(10, 60)},
+            topic_limits={"llm": Limit(2, 60)},
+        )
+        assert await limiter.check("ip", "check-answer", "llm") == 0
+        assert await limiter.check("ip", "check-answer", "llm") == 0
+        assert await limiter.check("ip", "check-answer", "llm") > 0
+        # Other topics still have route budget left
+        assert await limiter.check("ip", "check-answer", "redis") == 0
+
+    @pytest.mark.asyncio
+    async def test_clients_are_independent(self, clock):
+        limiter = RateLimiter(MemoryBackend(clock=clock), route_limits={"check-answer": Limit(1, 60)})
+        assert await limiter.check("a", "check-answer") == 0
+        assert await limiter.check("a", "check-answer") > 0
+        assert await limiter.check("b", "check-answer") == 0
+
+    @pytest.mark.asyncio
+    async def test_unlimited_route(self, clock):
+        limiter = RateLimiter(MemoryBackend(clock=clock), route_limits={}, topic_limits={})
+        for _ in range(100):
+            assert await limiter.check("ip", "anything", "llm") == 0
@@ -0,0 +1,171 @@
+# ABOUTME: Tests for the embedded Redis emulator (app/redis_emulator.py) and redis grading without a server.
+# ABOUTME: Replies are compared with what redis-cli prints in non-interactive (raw) mode.
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from catalog import LessonCatalog
+from redis_emulator import Keyspace, split_args
+from subprocess_manager import REDIS_COMMANDS, Sandbox, SandboxPool, SubprocessManager
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def redis(clock):
+    return Keyspace(clock=clock)
+
+
+class TestSplitArgs:
+
+    def test_quotes_and_escapes(self):
+        assert split_args('SET motto "hello world"') == ["SET", "motto", "hello world"]
+        assert split_args("HSET s height \"5'9\"") == ["HSET", "s", "height", "5'9"]
+        assert split_args(r"SET k 'it\'s' ") == ["SET", "k", "it's"]
+        assert split_args(r'SET k "a\nb\x41"') == ["SET", "k", "a\nbA"]
+
+    def test_unbalanced_quotes(self):
+        with pytest.raises(ValueError):
+            split_args('SET k "open')
+        with pytest.raises(ValueError):
+            split_args('SET k "closed"tail')
+
+
+class TestKeyspace:
+
+    def test_every_whitelisted_command_is_implemented(self, redis):
+        assert set(redis.commands) == REDIS_COMMANDS
+
+    def test_strings(self, redis):
+        assert redis.run("PING") == (0, "PONG")
+        assert redis.run('SET suspect "Valdez"') == (0, "OK")
+        assert redis.run("GET suspect") == (0, "Valdez")
+        assert redis.run("GET missing") == (0, "")
+        assert redis.run("APPEND suspect _jr") == (0, "9")
+        assert redis.run("MSET a 1 b 2") == (0, "OK")
+        assert redis.run("MGET a b missing") == (0, "1\n2\n")
+        assert redis.run("INCR a") == (0, "2")
+        assert redis.run("DECR counter") == (0, "-1")
+        assert redis.run("INCR suspect") == (1, "ERR value is not an integer or out of range")
+        assert redis.run("SET a 1 NX") == (0, "")
+
+    def test_ttl_and_expiry(self, redis, clock):
+        redis.run('SETEX online:user456 120 "active"')
+        clock.now += 5
+        assert redis.run("TTL online:user456") == (0, "115")
+        assert redis.run("TTL nothing") == (0, "-2")
+        redis.run("SET plain x")
+        assert redis.run("TTL plain") == (0, "-1")
+        assert redis.run("EXPIRE plain 10") == (0, "1")
+        clock.now += 10
+        assert redis.run("GET plain") == (0, "")
+        assert redis.run("EXISTS plain online:user456") == (0, "1")
+        assert redis.run("SETEX k 0 v") == (1, "ERR invalid expire time in 'setex' command")
+
+    def test_lists(self, redis):
+        assert redis.run("RPUSH q suspect_alpha suspect_bravo suspect_charlie") == (0, "3")
+        assert redis.run("LPOP q") == (0, "suspect_alpha")
+        assert redis.run("LRANGE q 0 -1") == (0, "suspect_bravo\nsuspect_charlie")
+        assert redis.run("LINDEX q -1") == (0, "suspect_charlie")
+        assert redis.run("LPUSH q first") == (0, "3")
+        assert redis.run("RPOP q 5") == (0, "suspect_charlie\nsuspect_bravo\nfirst")
+        assert redis.run("LLEN q") == (0, "0")
+        assert redis.run("TYPE q") == (0, "none")
+
+    def test_sets(self, redis):
+        redis.run('SADD known_associates:alpha "murphy" "valdez" "chen"')
+        redis.run("SADD known_associates:bravo murphy torres kim")
+        assert redis.run("SINTER known_associates:alpha known_associates:bravo") == (0, "murphy")
+        assert redis.run("SDIFF known_associates:alpha known_associates:bravo") == (0, "valdez\nchen")
+        assert redis.run("SCARD known_associates:alpha") == (0, "3")
+        assert redis.run("SISMEMBER known_associates:bravo kim") == (0, "1")
+        assert redis.run("SADD known_associates:bravo kim") == (0, "0")
+        assert redis.run("SREM known_associates:bravo kim nobody") == (0, "1")
+        redis.run("SADD numbers 3 1 2")
+        assert redis.run("SMEMBERS numbers") == (0, "1\n2\n3")
+
+    def test_hashes(self, redis):
+        assert redis.run("HSET suspect:delta age 28 height \"5'7\" occupation lawyer") == (0, "3")
+        assert redis.run("HGET suspect:delta occupation") == (0, "lawyer")
+        assert redis.run("HSET suspect:delta occupation judge last_seen courthouse") == (0, "1")
+        assert redis.run("HGETALL suspect:delta") == (
+            0, "age\n28\nheight\n5'7\noccupation\njudge\nlast_seen\ncourthouse")
+        assert redis.run("HMGET suspect:delta age missing") == (0, "28\n")
+        assert redis.run("HDEL suspect:delta age") == (0, "1")
+        assert redis.run("HKEYS suspect:delta") == (0, "height\noccupation\nlast_seen")
+        assert redis.run("HEXISTS suspect:delta age") == (0, "0")
+        assert redis.run("HSET suspect:delta odd") == (1, "ERR wrong number of arguments for 'hset' command")
+
+    def test_keyspace_commands_and_errors(self, redis):
+        redis.run("SET user:1 a")
+        redis.run("SET user:2 b")
+        redis.run("LPUSH queue x")
+        assert redis.run("KEYS user:*") == (0, "user:1\nuser:2")
+        assert redis.run("KEYS user:[^1]") == (0, "user:2")
+        assert redis.run('KEYS "[]"') == (0, "")
+        assert redis.run("KEYS [z-a]") == (0, "")
+        assert redis.run("KEYS [z-a]ueue") == (0, "queue")  # reversed ranges are swapped, as in Redis
+        assert redis.run(r"KEYS user:[\]2]") == (0, "user:2")
+        assert redis.run("DBSIZE") == (0, "3")
+        assert redis.run("GET queue") == (1, "WRONGTYPE Operation against a key holding the wrong kind of value")
+        assert redis.run("GET") == (1, "ERR wrong number of arguments for 'get' command")
+        assert redis.run("INFO keyspace")[1].startswith("# Keyspace\r\ndb0:keys=3,")
+        assert redis.run("DEL user:1 user:9") == (0, "1")
+        assert redis.run("FLUSHALL") == (0, "OK")
+        assert redis.run("DBSIZE") == (0, "0")
+
+
+class TestEmbeddedRedisGrading:
+
+    @staticmethod
+    async def _manager(tmp_path, count=2):
+        manager = SubprocessManager(sandbox_count=count, sandbox_root=str(tmp_path), redis_engine="embedded")
+        sandboxes = [Sandbox(slot, str(tmp_path)) for slot in range(count)]
+        for sandbox in sandboxes:
+            await manager._init_sandbox(sandbox)
+        manager.sandboxes = SandboxPool(sandboxes, manager._reset_state)
+        return manager
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("lesson,command", [
+        ("00_setup", "PING"),
+        ("01_strings", 'SETEX online:user456 120 "online"'),
+        ("04_hashes", "HSET suspect:delta age 28 height \"5'7\" occupation lawyer last_seen courthouse"),
+    ])
+    async def test_lessons_pass(self, tmp_path, lesson, command):
+        manager = await self._manager(tmp_path)
+        check_logic = LessonCatalog(BASE_DIR).check_logic("redis", lesson)
+        result = await manager.execute_code_in_container("redis", command, check_logic)
+        assert result.is_correct, result.output
+
+    @pytest.mark.asyncio
+    async def test_sandboxes_have_separate_keyspaces(self, tmp_path):
+        manager = await self._manager(tmp_path)
+        first = await manager.sandboxes.checkout()
+        second = await manager.sandboxes.checkout()
+        await manager._execute_redis("SET case open", first)
+        assert await manager._execute_redis("GET case", second) == (0, "")
+        await manager.sandboxes.checkin(first, "redis")
+        assert await manager._execute_redis("DBSIZE", first) == (0, "0")
+
+    def test_sandbox_limit_only_applies_to_server(self, tmp_path):
+        assert SubprocessManager(sandbox_count=32, redis_engine="embedded")._sandbox_count == 32
+        assert SubprocessManager(sandbox_count=32, redis_engine="server")._sandbox_count == 15
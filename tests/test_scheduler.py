@@ -0,0 +1,103 @@
+# ABOUTME: Tests for grading admission control in app/scheduler.py.
+# ABOUTME: Covers per-topic limits, bounded queues, queue deadlines and metrics.
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from scheduler import GradingScheduler, SchedulerBusy, OTHER_LANE
+
+
+async def _hold(scheduler, topic, release: asyncio.Event, entered: asyncio.Event = None):
+    async with scheduler.slot(topic):
+        if entered:
+            entered.set()
+        await release.wait()
+
+
+class TestGradingScheduler:
+
+    @pytest.mark.asyncio
+    async def test_admits_up_to_limit(self):
+        scheduler = GradingScheduler({"llm": 2}, queue_size=4, queue_timeout=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(scheduler, "llm", release)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        metrics = scheduler.metrics()["llm"]
+        assert metrics["running"] == 2
+        assert metrics["queued"] == 1
+        release.set()
+        await asyncio.gather(*tasks)
+        assert scheduler.metrics()["llm"]["admitted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_topics_do_not_block_each_other(self):
+        scheduler = GradingScheduler({"llm": 1, "sql": 1}, queue_size=4, queue_timeout=0.1)
+        release = asyncio.Event()
+        held = asyncio.create_task(_hold(scheduler, "llm", release))
+        await asyncio.sleep(0.01)
+        async with scheduler.slot("sql"):
+            pass
+        release.set()
+        await held
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_raises_busy(self):
+        scheduler = GradingScheduler({"llm": 1}, queue_size=4, queue_timeout=0.05)
+        release = asyncio.Event()
+        held = asyncio.create_task(_hold(scheduler, "llm", release))
+        await asyncio.sleep(0.01)
+        with pytest.raises(SchedulerBusy) as exc_info:
+            async with scheduler.slot("llm"):
+                pass
+        assert exc_info.value.reason == "queue timeout"
+        assert exc_info.value.retry_after >= 1
+        assert scheduler.metrics()["llm"]["rejected_timeout"] == 1
+        release.set()
+        await held
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_immediately(self):
+        scheduler = GradingScheduler({"llm": 1}, queue_size=1, queue_timeout=5)
+        release = asyncio.Event()
+        held = asyncio.create_task(_hold(scheduler, "llm", release))
+        queued = asyncio.create_task(_hold(scheduler, "llm", release))
+        await asyncio.sleep(0.01)
+        with pytest.raises(SchedulerBusy) as exc_info:
+            async with scheduler.slot("llm"):
+                pass
+        assert exc_info.value.reason == "queue full"
+        assert scheduler.metrics()["llm"]["rejected_queue_full"] == 1
+        release.set()
+        await asyncio.gather(held, queued)
+
+    @pytest.mark.asyncio
+    async def test_slot_released_on_error(self):
+        scheduler = GradingScheduler({"llm": 1}, queue_size=1, queue_timeout=0.05)
+        with pytest.raises(RuntimeError):
+            async with scheduler.slot("llm"):
+                raise RuntimeError("grader crashed")
+        async with scheduler.slot("llm"):
+            pass
+        assert scheduler.metrics()["llm"]["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_early_release_admits_the_next_grade(self):
+        scheduler = GradingScheduler({"llm": 1}, queue_size=1, queue_timeout=0.2)
+        async with scheduler.slot("llm") as slot:
+            slot.release()
+            slot.release()  # idempotent; leaving the block doesn't release twice
+            async with scheduler.slot("llm"):
+                assert scheduler.metrics()["llm"]["running"] == 1
+        assert scheduler.metrics()["llm"]["running"] == 0
+        assert not scheduler._lane("llm").semaphore.locked()
+        assert scheduler._lane("llm").semaphore._value == 1
+
+    def test_unknown_topics_share_fallback_lane(self):
+        scheduler = GradingScheduler({"llm": 1})
+        assert scheduler._lane("made-up") is scheduler._lane("also-made-up")
+        assert set(scheduler.metrics()) == {"llm", OTHER_LANE}
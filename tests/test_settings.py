@@ -0,0 +1,62 @@
+# ABOUTME: Tests for tutorial visibility settings in app/settings.py.
+# ABOUTME: Covers schema setup, the in-memory cache and invalidation on updates.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+import settings
+
+
+@pytest.fixture
+def settings_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_PATH", str(tmp_path / "data" / "settings.db"))
+    settings.init_db()
+    yield settings
+    settings.close_db()
+
+
+def _count_queries(conn):
+    queries = []
+    conn.set_trace_callback(queries.append)
+    return queries
+
+
+class TestVisibility:
+
+    def test_all_topics_enabled_by_default(self, settings_db):
+        assert settings_db.get_enabled_tutorials() == sorted(settings.ALL_TUTORIALS)
+        assert all(settings_db.get_all_tutorial_states().values())
+
+    def test_wal_mode(self, settings_db):
+        mode = settings_db._get_db().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_reads_served_from_cache(self, settings_db):
+        settings_db.get_enabled_tutorials()
+        queries = _count_queries(settings_db._get_db())
+        for _ in range(5):
+            settings_db.get_enabled_tutorials()
+            settings_db.get_all_tutorial_states()
+        assert queries == []
+
+    def test_update_invalidates_cache(self, settings_db):
+        assert "git" in settings_db.get_enabled_tutorials()
+        settings_db.update_tutorial_states({"git": False, "sql": False})
+        enabled = settings_db.get_enabled_tutorials()
+        assert "git" not in enabled and "sql" not in enabled
+        settings_db.set_tutorial_enabled("git", True)
+        assert "git" in settings_db.get_enabled_tutorials()
+
+    def test_states_persist_across_connections(self, settings_db):
+        settings_db.update_tutorial_states({"llm": False})
+        settings_db.close_db()
+        settings_db.init_db()
+        assert settings_db.get_all_tutorial_states()["llm"] is False
+
+    def test_returned_state_is_a_copy(self, settings_db):
+        settings_db.get_all_tutorial_states()["redis"] = False
+        assert settings_db.get_all_tutorial_states()["redis"] is True
@@ -0,0 +1,60 @@
+# ABOUTME: Tests for the static site export in app/static_export.py.
+# ABOUTME: Checks the file layout, parity with live responses and the output-directory guard.
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from static_export import StaticExporter
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    out = tmp_path_factory.mktemp("export") / "dist"
+    exporter = StaticExporter(BASE_DIR, out, topics=["redis"])
+    exporter.export()
+    return exporter
+
+
+class TestStaticExport:
+
+    def test_layout(self, exported):
+        out = exported.out_dir
+        assert (out / "index.html").is_file()
+        assert (out / "promo" / "index.html").is_file()
+        for lang in exported.catalog.languages:
+            assert (out / "tutorial" / "redis" / lang / "index.html").is_file()
+            for lesson in exported.catalog.topics["redis"]:
+                assert (out / "tutorial" / "redis" / lesson / lang / "detective_noir.html").is_file()
+        assert not (out / "tutorial" / "sql").exists()
+
+    def test_assets_fingerprinted_and_precompressed(self, exported):
+        static = exported.out_dir / "static"
+        asset = exported.assets.assets["interactive.js"]
+        assert (static / asset.hashed_name).read_bytes() == asset.path.read_bytes()
+        assert (static / f"{asset.hashed_name}.gz").is_file()
+        assert (static / "og-image.png").is_file()
+
+    def test_pages_match_live_app(self, exported, app_client):
+        page = exported.out_dir / "tutorial" / "redis" / "00_setup" / "sl" / "sci_fi.html"
+        live = app_client.get("/tutorial/redis/00_setup?lang=sl&style=sci_fi")
+        # Both sides hash the same static/ files, so asset URLs agree too
+        assert page.read_text(encoding="utf-8") == live.text
+
+    def test_refuses_to_replace_other_directories(self, tmp_path):
+        (tmp_path / "notes.txt").write_text("keep me")
+        with pytest.raises(ValueError, match="Refusing"):
+            StaticExporter(BASE_DIR, tmp_path, topics=["redis"]).export()
+        assert (tmp_path / "notes.txt").exists()
+
+    def test_reexport_replaces_previous_output(self, exported):
+        stale = exported.out_dir / "tutorial" / "stale.html"
+        stale.write_text("old")
+        StaticExporter(BASE_DIR, exported.out_dir, topics=["redis"]).export()
+        assert not stale.exists()
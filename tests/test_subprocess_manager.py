@@ -0,0 +1,208 @@
+# ABOUTME: Tests for the asyncio-based subprocess grader backend (app/subprocess_manager.py).
+# ABOUTME: Covers non-blocking execution, timeouts, process-group cleanup, and sandbox leasing.
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from grader_schemas import CheckLogic, ExpectedResult
+from subprocess_manager import Sandbox, SandboxPool, SchedulerBusy, SubprocessManager
+
+
+@pytest.fixture
+def manager():
+    return SubprocessManager()
+
+
+class TestRunCmd:
+
+    @pytest.mark.asyncio
+    async def test_captures_stdout(self, manager):
+        exit_code, output = await manager._run_cmd(["sh", "-c", "echo hello"])
+        assert exit_code == 0
+        assert output == "hello"
+
+    @pytest.mark.asyncio
+    async def test_stdin_is_passed(self, manager):
+        exit_code, output = await manager._run_cmd(["cat"], input_data="from stdin")
+        assert exit_code == 0
+        assert output == "from stdin"
+
+    @pytest.mark.asyncio
+    async def test_stderr_appended_on_failure(self, manager):
+        exit_code, output = await manager._run_cmd(["sh", "-c", "echo out; echo oops >&2; exit 3"])
+        assert exit_code == 3
+        assert output == "out\noops"
+
+    @pytest.mark.asyncio
+    async def test_command_not_found(self, manager):
+        exit_code, output = await manager._run_cmd(["definitely-not-a-real-binary"])
+        assert exit_code == 1
+        assert "command not found" in output
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process_group(self, manager, tmp_path):
+        """A timed-out pipeline must not leave grandchildren running."""
+        marker = tmp_path / "marker"
+        cmd = ["sh", "-c", f"(sleep 1 && touch {marker}) & sleep 5"]
+        exit_code, output = await manager._run_cmd(cmd, timeout=0.2)
+        assert exit_code == 1
+        assert "timed out" in output
+        await asyncio.sleep(1.2)
+        assert not marker.exists()
+
+    @pytest.mark.asyncio
+    async def test_does_not_block_event_loop(self, manager):
+        """Slow commands run concurrently instead of serializing the loop."""
+        start = time.monotonic()
+        results = await asyncio.gather(
+            *(manager._run_cmd(["sleep", "0.5"]) for _ in range(4))
+        )
+        elapsed = time.monotonic() - start
+        assert all(code == 0 for code, _ in results)
+        assert elapsed < 1.5
+
+
+class TestSandboxPool:
+
+    def test_localize_rewrites_lesson_paths(self, tmp_path):
+        sandbox = Sandbox(2, str(tmp_path))
+        cmd = sandbox.localize("echo tokenize > /tmp/llm_mode && cat /tmp/user_input")
+        assert "/tmp/llm_mode" not in cmd
+        assert "/tmp/user_input" not in cmd
+        assert sandbox.llm_mode_path in cmd
+        assert sandbox.input_path in cmd
+
+    def test_sandboxes_have_distinct_state(self, tmp_path):
+        a, b = Sandbox(0, str(tmp_path)), Sandbox(1, str(tmp_path))
+        assert a.git_repo_dir != b.git_repo_dir
+        assert a.sql_db_path != b.sql_db_path
+        assert a.bash_workspace != b.bash_workspace
+        assert a.redis_db != b.redis_db
+
+    def test_sandbox_dbs_leave_the_rate_limit_db_alone(self):
+        from ratelimit import DEFAULT_REDIS_URL
+        limiter_db = int(DEFAULT_REDIS_URL.rsplit("/", 1)[1])
+        manager = SubprocessManager(sandbox_count=64)
+        assert limiter_db not in range(manager._sandbox_count)
+
+    @pytest.mark.asyncio
+    async def test_lease_resets_and_returns_sandbox(self, tmp_path):
+        resets = []
+
+        async def reset(language, sandbox):
+            resets.append((language, sandbox.slot))
+
+        pool = SandboxPool([Sandbox(0, str(tmp_path))], reset)
+        async with pool.lease("bash") as sandbox:
+            assert pool.available == 0
+        assert pool.available == 1
+        assert resets == [("bash", sandbox.slot)]
+
+    @pytest.mark.asyncio
+    async def test_checkout_waits_when_exhausted(self, tmp_path):
+        async def reset(language, sandbox):
+            pass
+
+        pool = SandboxPool([Sandbox(0, str(tmp_path))], reset)
+        held = await pool.checkout()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.checkout(), timeout=0.1)
+        await pool.checkin(held, "bash")
+        assert await asyncio.wait_for(pool.checkout(), timeout=0.1) is held
+
+    @pytest.mark.asyncio
+    async def test_checkout_timeout_rejects_as_busy(self, tmp_path):
+        async def reset(language, sandbox):
+            pass
+
+        pool = SandboxPool([Sandbox(0, str(tmp_path))], reset, timeout=0.05)
+        async with pool.lease("redis"):
+            with pytest.raises(SchedulerBusy) as busy:
+                async with pool.lease("sql"):
+                    pass
+        assert busy.value.topic == "sql"
+        assert busy.value.retry_after == 1
+        assert pool.available == 1
+
+    @pytest.mark.asyncio
+    async def test_workspace_reset_runs_off_the_event_loop(self, tmp_path, monkeypatch):
+        manager = SubprocessManager(sandbox_root=str(tmp_path))
+        sandbox = Sandbox(0, str(tmp_path))
+        await manager._init_sandbox(sandbox)
+        monkeypatch.setattr(manager, "_init_bash_workspace", lambda ws: time.sleep(0.5))
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await manager._reset_state("bash", sandbox)
+        finally:
+            task.cancel()
+        assert ticks >= 5  # the loop kept running during the slow reset
+
+
+class TestSandboxedGrading:
+
+    @staticmethod
+    async def _started(tmp_path, count=2):
+        mgr = SubprocessManager(sandbox_count=count, sandbox_root=str(tmp_path))
+        await mgr.startup()
+        return mgr
+
+    @pytest.mark.asyncio
+    async def test_concurrent_bash_grades_are_isolated(self, tmp_path):
+        """Two students creating the same directory must not see each other's work."""
+        mgr = await self._started(tmp_path)
+        check = CheckLogic(
+            validation_command="ls -d camp 2>/dev/null",
+            expected_result=ExpectedResult(type="exact_match", value="camp"),
+        )
+        try:
+            results = await asyncio.gather(
+                mgr.execute_code_in_container("bash", "mkdir camp && sleep 0.3", check),
+                mgr.execute_code_in_container("bash", "mkdir camp && sleep 0.3", check),
+            )
+        finally:
+            await mgr.shutdown()
+        assert all(r.is_correct for r in results), [r.output for r in results]
+
+    @pytest.mark.asyncio
+    async def test_bash_workspace_reset_after_grade(self, tmp_path):
+        mgr = await self._started(tmp_path, count=1)
+        check = CheckLogic(
+            validation_command="find . -name '*.tmp'",
+            expected_result=ExpectedResult(type="exact_match", value=""),
+        )
+        try:
+            first = await mgr.execute_code_in_container("bash", "find . -name '*.tmp' | xargs rm", check)
+            second = await mgr.execute_code_in_container("bash", "true", check)
+        finally:
+            await mgr.shutdown()
+        assert first.is_correct is True
+        assert second.is_correct is False
+
+    @pytest.mark.asyncio
+    async def test_git_setup_runs_inside_sandbox_repo(self, tmp_path):
+        mgr = await self._started(tmp_path, count=1)
+        check = CheckLogic(
+            setup_commands=["echo 'initial' > README.md && git add README.md && git commit -m 'Initial commit'"],
+            validation_command="git log --oneline",
+            expected_result=ExpectedResult(type="user_output_contains", value="Initial commit"),
+        )
+        try:
+            result = await mgr.execute_code_in_container("git", "git log --oneline", check)
+        finally:
+            await mgr.shutdown()
+        assert result.is_correct is True
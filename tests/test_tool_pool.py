@@ -0,0 +1,166 @@
+# ABOUTME: Tests for the warm tool worker pool (app/tool_pool.py) and its use by the subprocess grader.
+# ABOUTME: Uses a throwaway tool module so the tests don't depend on tiktoken or network access.
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from tool_pool import ToolPool
+from subprocess_manager import Sandbox, SubprocessManager
+
+TOOL_SOURCE = '''
+import os
+import signal
+import time
+
+WARM = []
+
+def warm_up():
+    WARM.append(os.getpid())
+
+def state():
+    return os.getpid(), list(WARM), os.environ.get("TOOL_SETTING")
+
+def slow(seconds):
+    time.sleep(seconds)
+    return "done"
+
+def stuck(seconds):
+    # Like a call blocked in C code: the timeout alarm never gets through
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(seconds)
+    return "done"
+
+def fail():
+    raise ValueError("bad input")
+'''
+
+
+@pytest.fixture
+def tool_dir(tmp_path):
+    (tmp_path / "sample_tool.py").write_text(TOOL_SOURCE)
+    return tmp_path
+
+
+class TestToolPool:
+
+    @pytest.mark.asyncio
+    async def test_workers_are_warmed_once_and_reused(self, tool_dir):
+        pool = ToolPool(workers=1, tool_dirs=[tool_dir], env={"TOOL_SETTING": "on"}, modules=["sample_tool"])
+        try:
+            first = await pool.call("sample_tool", "state")
+            second = await pool.call("sample_tool", "state")
+        finally:
+            pool.shutdown()
+        pid, warmed, setting = first
+        assert warmed == [pid]
+        assert setting == "on"
+        assert second == first
+        assert pid != os.getpid()
+
+    @pytest.mark.asyncio
+    async def test_tool_exceptions_propagate(self, tool_dir):
+        pool = ToolPool(workers=1, tool_dirs=[tool_dir], modules=["sample_tool"])
+        try:
+            with pytest.raises(ValueError, match="bad input"):
+                await pool.call("sample_tool", "fail")
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, tool_dir):
+        pool = ToolPool(workers=1, tool_dirs=[tool_dir], modules=["sample_tool"])
+        try:
+            await pool.call("sample_tool", "state")  # let the worker start
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.call("sample_tool", "slow", 2, timeout=0.2)
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_interrupts_the_call_and_keeps_the_worker(self, tool_dir):
+        pool = ToolPool(workers=1, tool_dirs=[tool_dir], modules=["sample_tool"])
+        try:
+            pid = (await pool.call("sample_tool", "state"))[0]
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.call("sample_tool", "slow", 60, timeout=0.2)
+            # The only worker was free again straight away
+            assert (await pool.call("sample_tool", "state", timeout=1))[0] == pid
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_other_calls_survive_a_timeout(self, tool_dir):
+        pool = ToolPool(workers=2, tool_dirs=[tool_dir], modules=["sample_tool"])
+        try:
+            await asyncio.gather(pool.call("sample_tool", "state"), pool.call("sample_tool", "state"))
+            hung, other = await asyncio.gather(
+                pool.call("sample_tool", "slow", 60, timeout=0.2),
+                pool.call("sample_tool", "slow", 0.6, timeout=5),
+                return_exceptions=True,
+            )
+        finally:
+            pool.shutdown()
+        assert isinstance(hung, asyncio.TimeoutError)
+        assert other == "done"
+
+    @pytest.mark.asyncio
+    async def test_stuck_worker_exits_and_broken_calls_are_retried(self, tool_dir):
+        pool = ToolPool(workers=2, tool_dirs=[tool_dir], modules=["sample_tool"], kill_grace=0.3)
+        try:
+            first = await asyncio.gather(pool.call("sample_tool", "state"), pool.call("sample_tool", "state"))
+            stuck, other = await asyncio.gather(
+                pool.call("sample_tool", "stuck", 60, timeout=0.2),
+                pool.call("sample_tool", "slow", 1, timeout=10),
+                return_exceptions=True,
+            )
+            after = await pool.call("sample_tool", "state", timeout=5)
+        finally:
+            pool.shutdown()
+        assert isinstance(stuck, asyncio.TimeoutError)
+        assert other == "done"  # broken along with the stuck worker, then run again
+        assert after[0] not in {pid for pid, _, _ in first}
+        assert after[1] == [after[0]]  # served by a fresh, warmed worker
+
+
+class TestLlmToolsInWorkers:
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        mgr = SubprocessManager(sandbox_root=str(tmp_path))
+        mgr.tools = ToolPool(workers=1, modules=["validate_api_request", "llm_dispatch"])
+        yield mgr
+        mgr.tools.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_validate_api_request(self, manager, tmp_path):
+        sandbox = Sandbox(0, str(tmp_path))
+        os.makedirs(sandbox.root, exist_ok=True)
+        with open(sandbox.input_path, "w") as f:
+            f.write('{"model": "m", "messages": [{"role": "user", "content": "hi"}]}')
+        assert await manager._execute_llm("validate-api-request /tmp/user_input basic", sandbox) == (0, "PASS")
+        code, output = await manager._execute_llm("validate-api-request /tmp/user_input roles", sandbox)
+        assert code == 1
+        assert output == "FAIL: Missing message with role 'system'"
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_echo_mode(self, manager, tmp_path):
+        sandbox = Sandbox(0, str(tmp_path))
+        os.makedirs(sandbox.root, exist_ok=True)
+        with open(sandbox.llm_mode_path, "w") as f:
+            f.write("echo\n")
+        assert await manager._execute_llm("  hello model  ", sandbox) == (0, "hello model")
+        with open(sandbox.input_path) as f:
+            assert f.read() == "  hello model  "
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_without_mode(self, manager, tmp_path):
+        sandbox = Sandbox(0, str(tmp_path))
+        os.makedirs(sandbox.root, exist_ok=True)
+        code, output = await manager._execute_llm("hello", sandbox)
+        assert code == 1
+        assert "No mode set" in output
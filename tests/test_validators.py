@@ -0,0 +1,90 @@
+# ABOUTME: Tests for the in-process lesson validators (app/validators.py) and their use in grading.
+# ABOUTME: Checks results match the CLI scripts and that user text never goes through a file.
+
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+import validators
+from catalog import LessonCatalog
+from grader_schemas import CheckLogic
+from subprocess_manager import Sandbox, SandboxPool, SubprocessManager
+
+DOCKERFILE = "FROM python:3.12-slim\nWORKDIR /app\nCOPY . .\nRUN pip install -r requirements.txt\nCMD [\"python\", \"app.py\"]\n"
+COMPOSE = "services:\n  web:\n    image: nginx\n    ports:\n      - '80:80'\n  db:\n    image: postgres\n"
+API_REQUEST = '{"model": "m", "messages": [{"role": "user", "content": "hi"}]}'
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+CASES = [
+    ("validate-dockerfile", DOCKERFILE, "FROM,RUN,CMD"),
+    ("validate-dockerfile", DOCKERFILE, "FROM,EXPOSE"),
+    ("validate-dockerfile", "RUN echo hi\n", "FROM"),
+    ("validate-compose", COMPOSE, "services,service:web,ports:web"),
+    ("validate-compose", COMPOSE, "environment:db"),
+    ("validate-compose", "services: [unclosed", "services"),
+    ("validate-api-request", API_REQUEST, "basic"),
+    ("validate-api-request", API_REQUEST, "roles"),
+]
+
+
+class TestValidators:
+
+    @pytest.mark.parametrize("command,content,checks", CASES)
+    def test_matches_cli(self, command, content, checks, tmp_path):
+        path = tmp_path / "user-input"
+        path.write_text(content)
+        cli = subprocess.run(
+            [sys.executable, str(validators.VALIDATOR_SCRIPTS[command]), str(path), checks],
+            capture_output=True, text=True,
+        )
+        assert validators.validate(command, content, checks) == (cli.returncode, cli.stdout.strip())
+
+    def test_missing_input_and_checks(self):
+        assert validators.run("validate-compose", ["services"], None) == (1, "FAIL: No input provided")
+        assert validators.run("validate-compose", [], COMPOSE) == (1, "Usage: validate-compose <file> <checks>")
+
+
+class TestInMemoryGrading:
+
+    @pytest.mark.asyncio
+    async def test_dockerfile_lesson_skips_the_input_file(self, tmp_path):
+        manager = SubprocessManager(sandbox_root=str(tmp_path))
+        sandbox = Sandbox(0, str(tmp_path))
+        await manager._init_sandbox(sandbox)
+        manager.sandboxes = SandboxPool([sandbox], manager._reset_state)
+        check_logic = CheckLogic(
+            validation_command="validate-dockerfile /tmp/user_input FROM,WORKDIR,COPY,RUN,CMD",
+            expected_result={"type": "exact_match", "value": "PASS"},
+        )
+
+        result = await manager.execute_code_in_container("docker", DOCKERFILE, check_logic)
+
+        assert result.is_correct
+        assert not os.path.exists(sandbox.input_path)
+        assert sandbox.user_input is None  # cleared when the sandbox is returned
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("topic,lesson,content", [
+        ("docker", "05_compose", "services:\n"),
+        ("llm", "05_enhanced_prompts",
+         '{"model": "m", "temperature": 0.2, "max_tokens": 100,'
+         ' "messages": [{"role": "system", "content": 5}, {"role": "user", "content": "hi"}]}'),
+    ])
+    async def test_crashing_validator_fails_the_answer(self, tmp_path, topic, lesson, content):
+        manager = SubprocessManager(sandbox_root=str(tmp_path))
+        sandbox = Sandbox(0, str(tmp_path))
+        await manager._init_sandbox(sandbox)
+        manager.sandboxes = SandboxPool([sandbox], manager._reset_state)
+        check_logic = LessonCatalog(BASE_DIR).check_logic(topic, lesson)
+
+        result = await manager.execute_code_in_container(topic, content, check_logic)
+
+        assert not result.is_correct
+        assert "is not iterable" in result.feedback_message